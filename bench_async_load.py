@@ -0,0 +1,63 @@
+"""
+Load test for the async chat path against the local fake server.
+
+Starts fake_openai_server.py in-process with a fixed per-request latency,
+then sends the same number of requests through one pooled AsyncChatClient
+with more and more concurrent sessions, and prints requests/second for
+each level. With 50 ms of server latency one session manages ~20 req/s;
+throughput should grow with concurrency until the pool limit is reached.
+
+Run:
+    python bench_async_load.py
+    python bench_async_load.py --requests 400 --latency 0.05 --concurrency 1 8 64 --max-connections 64
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from chat_async import AsyncChatClient
+from fake_openai_server import start_server
+
+
+async def run_level(chat, concurrency, requests):
+    """`concurrency` sessions share `requests` prompts; returns requests/second."""
+    remaining = iter(range(requests))
+
+    async def user(session):
+        for i in remaining:
+            await session.ask(f"prompt {i}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(chat.session()) for _ in range(concurrency)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main(args):
+    server = start_server(latency=args.latency)
+    results = []
+    try:
+        async with AsyncChatClient(api_key="fake", base_url=server.base_url,
+                                   max_connections=args.max_connections,
+                                   max_keepalive=args.max_connections) as chat:
+            await chat.session().ask("warm up")
+            for concurrency in args.concurrency:
+                rps = await run_level(chat, concurrency, args.requests)
+                results.append({"concurrency": concurrency, "requests": args.requests, "requests_per_second": rps})
+                if not args.json:
+                    print(f"concurrency {concurrency:>4}: {rps:8.1f} req/s")
+    finally:
+        server.shutdown()
+    if args.json:
+        print(json.dumps({"latency": args.latency, "max_connections": args.max_connections, "levels": results}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Async chat load test against a local fake server")
+    parser.add_argument("--requests", type=int, default=200, help="requests per concurrency level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake server seconds per request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--max-connections", type=int, default=100, help="connection pool size")
+    parser.add_argument("--json", action="store_true", help="print one JSON object instead of a table")
+    main_args = parser.parse_args()
+    asyncio.run(main(main_args))
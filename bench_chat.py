@@ -0,0 +1,193 @@
+"""
+Latency benchmark for the chat path against the local fake server.
+
+Starts fake_openai_server.py in-process (latency, jitter and error rate are
+configurable) and times each way of asking:
+
+    sync          mainn.chat_with_gpt, one call at a time
+    sync_stream   the same with stream=True
+    async         AsyncChatClient, --concurrency sessions at once
+    async_stream  the same with stream=True
+    cached        chat_with_gpt for prompts already in the response cache
+
+For each it reports p50/p95/p99 latency, time to first token and
+requests/second, printed as one JSON object (a short table goes to stderr).
+Save the JSON and pass it back with --compare to see how a change moved
+the numbers:
+
+    python bench_chat.py --out before.json
+    ...change something...
+    python bench_chat.py --compare before.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+
+from fake_openai_server import start_server
+
+VARIANTS = ["sync", "sync_stream", "async", "async_stream", "cached"]
+
+
+def percentiles(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "p50_ms": at(0.50),
+        "p95_ms": at(0.95),
+        "p99_ms": at(0.99),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def summary(name, latencies, ttfts, errors, seconds, requests):
+    return {
+        "variant": name,
+        "requests": requests,
+        "errors": errors,
+        "seconds": seconds,
+        "requests_per_second": requests / seconds if seconds else 0.0,
+        "latency": percentiles(latencies),
+        "ttft": percentiles(ttfts),
+    }
+
+
+def run_sync(mainn, name, requests, stream=False, cached=False):
+    """Sequential chat_with_gpt calls; TTFT comes from mainn.call_timings."""
+    prompts = [f"{name} prompt {i}" for i in range(requests)]
+    if cached:
+        for prompt in prompts:
+            mainn.chat_with_gpt(prompt, memory=None)
+    latencies, ttfts, errors = [], [], 0
+    start = time.perf_counter()
+    for prompt in prompts:
+        before = time.perf_counter()
+        try:
+            mainn.chat_with_gpt(prompt, stream=stream, out=io.StringIO(), use_cache=cached, memory=None)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - before)
+        ttfts.append(mainn.call_timings[-1]["ttft"])
+    return summary(name, latencies, ttfts, errors, time.perf_counter() - start, requests)
+
+
+async def run_async(name, requests, concurrency, stream, resilience):
+    from chat_async import AsyncChatClient
+
+    latencies, ttfts, errors = [], [], 0
+    remaining = iter(range(requests))
+
+    async def user(chat):
+        nonlocal errors
+        for i in remaining:
+            before = time.perf_counter()
+            try:
+                await chat.complete([{"role": "user", "content": f"{name} prompt {i}"}],
+                                    stream=stream, out=io.StringIO() if stream else None)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - before)
+            ttfts.append(chat.timings[-1]["ttft"])
+
+    async with AsyncChatClient(max_connections=concurrency, max_keepalive=concurrency,
+                               history_tokens=0, resilience=resilience) as chat:
+        await chat.complete([{"role": "user", "content": "warm up"}])
+        start = time.perf_counter()
+        await asyncio.gather(*(user(chat) for _ in range(concurrency)))
+        seconds = time.perf_counter() - start
+    return summary(name, latencies, ttfts, errors, seconds, requests)
+
+
+def compare(before, after):
+    """Lines like 'sync p95 52.1 -> 48.3 ms (-7%)' for the variants in both runs."""
+    old = {result["variant"]: result for result in before["results"]}
+    lines = []
+    for result in after["results"]:
+        previous = old.get(result["variant"])
+        if not previous or not previous["latency"] or not result["latency"]:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            a, b = previous["latency"][key], result["latency"][key]
+            change = (b - a) / a * 100 if a else 0.0
+            lines.append(f"{result['variant']:>12} {key[:3]} {a:8.2f} -> {b:8.2f} ms ({change:+.0f}%)")
+    return lines
+
+
+def main(args):
+    server = start_server(latency=args.latency, jitter=args.jitter, token_delay=args.token_delay,
+                          error_rate=args.error_rate, seed=args.seed)
+    # mainn reads these when it is imported
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["CHAT_CACHE_PATH"] = ""
+    import mainn
+
+    results = []
+    try:
+        mainn.chat_with_gpt("warm up", use_cache=False, memory=None)
+        for name in args.variants:
+            if name == "sync":
+                result = run_sync(mainn, name, args.requests)
+            elif name == "sync_stream":
+                result = run_sync(mainn, name, args.requests, stream=True)
+            elif name == "cached":
+                result = run_sync(mainn, name, args.requests, cached=True)
+            else:
+                result = asyncio.run(run_async(name, args.requests, args.concurrency,
+                                               name == "async_stream", mainn.resilience))
+            results.append(result)
+            latency = result["latency"] or {}
+            print(f"{name:>12}: p50 {latency.get('p50_ms', 0):8.2f}  p95 {latency.get('p95_ms', 0):8.2f}  "
+                  f"p99 {latency.get('p99_ms', 0):8.2f} ms  {result['requests_per_second']:8.1f} req/s  "
+                  f"{result['errors']} errors", file=sys.stderr)
+    finally:
+        server.shutdown()
+
+    report = {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "token_delay": args.token_delay,
+            "error_rate": args.error_rate,
+        },
+        "results": results,
+        "resilience": mainn.resilience.stats(),
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(json.load(f), report):
+                print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat path latency benchmark against a local fake server")
+    parser.add_argument("--requests", type=int, default=200, help="requests per variant")
+    parser.add_argument("--concurrency", type=int, default=16, help="sessions for the async variants")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.01, help="random extra server seconds, up to this")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests the server fails")
+    parser.add_argument("--seed", type=int, default=1, help="fake server random seed")
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=VARIANTS)
+    parser.add_argument("--out", help="write the JSON here instead of stdout")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="print the change against an earlier run")
+    main_args = parser.parse_args()
+    main(main_args)
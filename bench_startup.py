@@ -0,0 +1,92 @@
+"""
+Startup benchmark: how long does `import mainn` take in a fresh process?
+
+Runs `python -X importtime -c "import mainn"` a few times (without an API
+key in the environment, like a worker that never calls the API), takes the
+median of the cumulative import time of mainn, lists the slowest top-level
+imports and fails (exit status 1) if the median is over the budget, or if
+a module that should only load on first use (openai, dotenv) was imported.
+
+Run:
+    python bench_startup.py
+    python bench_startup.py --runs 10 --budget-ms 30 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# imported on the first API call, never at startup
+LAZY_MODULES = ["openai", "dotenv", "httpx"]
+
+
+def import_times(module):
+    """One fresh `import module`; returns (cumulative µs of module,
+    {module's direct imports: cumulative µs}, names of everything imported)."""
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    children = {}
+    names = set()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", nesting shown by 2 spaces a level;
+        # a module's imports are listed (indented) just before it
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        names.add(name)
+        if depth == 1:
+            children[name] = int(cumulative)
+        elif depth == 0:
+            if name == module:
+                return int(cumulative), children, names
+            children = {}  # those belonged to something imported at interpreter startup
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def main(args):
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    total_ms = statistics.median(total for total, children, names in runs) / 1000
+    total, children, names = runs[-1]
+    slowest = sorted(((name, us / 1000) for name, us in children.items()),
+                     key=lambda item: -item[1])[:args.top]
+    eager = [name for name in LAZY_MODULES if name in names]
+    ok = total_ms <= args.budget_ms and not eager
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "runs": args.runs,
+            "import_ms": total_ms,
+            "budget_ms": args.budget_ms,
+            "slowest_ms": dict(slowest),
+            "eager_lazy_modules": eager,
+            "ok": ok,
+        }))
+    else:
+        print(f"import {args.module}: {total_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+        for name, ms in slowest:
+            print(f"  {ms:8.1f} ms  {name}")
+        if eager:
+            print(f"imported at startup but should load lazily: {', '.join(eager)}")
+        print("OK" if ok else "OVER BUDGET")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the import time of mainn.py")
+    parser.add_argument("--module", default="mainn")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="fail if the median import is slower")
+    parser.add_argument("--top", type=int, default=8, help="how many of the slowest imports to list")
+    parser.add_argument("--json", action="store_true", help="print one JSON object instead of text")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,204 @@
+"""
+Async chat path: one pooled client, many conversations at once.
+
+AsyncChatClient wraps a single AsyncOpenAI client and its HTTP connection
+pool (max_connections caps how many requests are in flight; max_keepalive
+how many idle connections are kept). get_chat_client() hands out one
+process-wide client, made on first use like mainn.get_client(), so every
+session in the process shares the same pool. ChatSession is one user's
+conversation on top of it:
+
+    async with get_chat_client(api_key=key, max_connections=50) as chat:
+        session = chat.session()
+        reply = await session.ask("Hello!")
+
+An AsyncChatClient(...) of its own (e.g. a benchmark with its own limits)
+opens a separate pool.
+
+Any number of sessions can await ask() concurrently from one event loop.
+Each session remembers its own conversation, up to history_tokens tokens
+(see chat_memory.py).
+"""
+import asyncio
+import sys
+import time
+import uuid
+from collections import deque
+
+import httpx
+from openai import AsyncOpenAI, AsyncStream, DefaultAsyncHttpxClient
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from chat_memory import ConversationMemory
+
+DEFAULT_MODEL = "gpt-4o"
+
+
+class AsyncChatClient:
+    """A pooled AsyncOpenAI client; get_chat_client() gives the one shared by the whole process."""
+
+    def __init__(self, api_key=None, base_url=None, model=DEFAULT_MODEL,
+                 max_connections=100, max_keepalive=20, timeout=60.0, cache=None,
+                 history_tokens=3000, system=None, resilience=None):
+        self.model = model
+        self.cache = cache  # optional chat_cache.ResponseCache
+        self.resilience = resilience  # optional chat_resilience.Resilience (retries, hedging)
+        self.history_tokens = history_tokens  # per-session memory budget; 0 = no memory
+        self.system = system
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            timeout=timeout,
+        )
+        # api_key/base_url fall back to OPENAI_API_KEY/OPENAI_BASE_URL like the sync client;
+        # with a Resilience in front, it does the retrying instead of the SDK
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client,
+                                  max_retries=0 if resilience else 2)
+        # same shape as mainn.call_timings: {"stream", "cached", "ttft", "total"}
+        self.timings = deque(maxlen=1000)
+        self.requests = 0
+        self.closed = False
+
+    async def complete(self, messages, stream=False, out=None, **params):
+        """Send one chat completion and return the reply text.
+        With stream=True the tokens are written to `out` (if given) as they arrive."""
+        start = time.perf_counter()
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(messages, self.model, **params)
+            reply = self.cache.get(key)
+            if reply is not None:
+                if stream and out is not None:
+                    out.write(reply + "\n")
+                    out.flush()
+                self.record(stream, start, None, cached=True)
+                return reply
+
+        self.requests += 1
+        if not stream:
+            response = await self.create(messages, False, params)
+            self.record(False, start, None)
+            return self.remember(key, response.choices[0].message.content.strip())
+
+        pieces = []
+        first_token_at = None
+        response = await self.create(messages, True, params)
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                if out is not None:
+                    out.write(token)
+                    out.flush()
+                pieces.append(token)
+        if out is not None:
+            out.write("\n")
+        self.record(True, start, first_token_at)
+        return self.remember(key, "".join(pieces).strip())
+
+    async def create(self, messages, stream, params):
+        # Same request as client.chat.completions.create, but posted as is: create()
+        # re-checks every message dict against the SDK's types on each call, which
+        # takes longer than the request itself once a session has a long history.
+        # With a Resilience, failed or slow attempts are retried/hedged up to the
+        # point where the reply starts; an error halfway through a stream is not.
+        body = dict(params, model=self.model, messages=messages, stream=stream)
+
+        def post(timeout=None):
+            options = {"timeout": timeout} if timeout else {}
+            return self.client.post("/chat/completions", body=body, cast_to=ChatCompletion, options=options,
+                                    stream=stream, stream_cls=AsyncStream[ChatCompletionChunk])
+
+        if self.resilience is None:
+            return await post()
+        return await self.resilience.call(post)
+
+    def remember(self, key, reply):
+        if key is not None:
+            self.cache.put(key, reply)
+        return reply
+
+    def record(self, stream, start, first_token_at, cached=False):
+        end = time.perf_counter()
+        self.timings.append({
+            "stream": stream,
+            "cached": cached,
+            "ttft": (first_token_at if first_token_at is not None else end) - start,
+            "total": end - start,
+        })
+
+    def session(self, session_id=None):
+        """A new conversation that uses this client's connection pool."""
+        return ChatSession(self, session_id)
+
+    async def aclose(self):
+        self.closed = True
+        await self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+# the process-wide client handed out by get_chat_client()
+shared_client = None
+
+
+def get_chat_client(**settings):
+    """The AsyncChatClient shared by the whole process, made on first use with
+    `settings` (AsyncChatClient arguments); later calls get the same client and
+    their settings are ignored. Once it is closed the next call makes a new one.
+    Use it from one event loop: its connections belong to the loop that opened them."""
+    global shared_client
+    if shared_client is None or shared_client.closed:
+        shared_client = AsyncChatClient(**settings)
+    return shared_client
+
+
+class ChatSession:
+    """One user's conversation on a shared AsyncChatClient."""
+
+    def __init__(self, chat, session_id=None):
+        self.chat = chat
+        self.session_id = session_id or uuid.uuid4().hex
+        self.turns = 0
+        self.memory = None
+        if chat.history_tokens:
+            self.memory = ConversationMemory(budget=chat.history_tokens, system=chat.system)
+
+    async def ask(self, prompt, stream=False, out=None):
+        """Send a prompt and return the reply (streamed to `out` if stream=True)."""
+        if self.memory is not None:
+            messages = self.memory.prompt(prompt)
+        else:
+            messages = [{"role": "user", "content": prompt}]
+        reply = await self.chat.complete(messages, stream=stream, out=out)
+        if self.memory is not None:
+            self.memory.add("user", prompt)
+            self.memory.add("assistant", reply)
+        self.turns += 1
+        return reply
+
+
+async def read_input(prompt):
+    """input() without blocking the event loop."""
+    return await asyncio.to_thread(input, prompt)
+
+
+async def repl(chat, read_line=read_input, out=sys.stdout):
+    """The interactive loop: read prompts with `read_line` (an async function)
+    and stream the replies to `out` until the user says quit/exit/bye."""
+    session = chat.session()
+    while True:
+        user_input = await read_line("You: ")
+        if user_input.lower() in ["quit", "exit", "bye"]:
+            break
+
+        out.write("Chatbot: ")
+        out.flush()
+        await session.ask(user_input, stream=True, out=out)
+    out.write("Session ended. Goodbye!\n")
@@ -0,0 +1,180 @@
+"""
+Batch mode: run a file of prompts through the chat API, many at a time.
+
+The input is JSONL, one prompt per line:
+    {"id": "q1", "prompt": "What is a robot?"}
+    {"prompt": "..."}                              (id defaults to the line number)
+    {"id": "q3", "messages": [{"role": "user", "content": "..."}]}
+
+Each result is appended to the output JSONL as soon as it arrives:
+    {"id": "q1", "line": 0, "reply": "...", "seconds": 0.41}
+    {"id": "q2", "line": 1, "error": "RateLimitError: ..."}
+
+Up to `concurrency` requests are in flight at once, throttled by two token
+buckets: requests per second and (estimated) tokens per minute. The input
+is read a few lines ahead of the workers, never all at once, so memory does
+not depend on the file size.
+
+Running again with the same output file resumes: lines that already have a
+reply are skipped, failed ones are tried again (the last record for an id wins).
+
+    python mainn.py --batch prompts.jsonl --out replies.jsonl --concurrency 16 --rps 5 --tpm 30000
+"""
+import asyncio
+import json
+import os
+import time
+
+from chat_memory import estimate_tokens, message_tokens
+
+
+class TokenBucket:
+    """Allows `rate` units per second on average, in bursts of up to `capacity`.
+    acquire() waits for room; charge() takes units after the fact (the level
+    may go below zero, which makes the next callers wait longer)."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()  # waiters go in FIFO order
+        self.waited = 0.0
+
+    def refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        async with self.lock:
+            # a request bigger than the whole bucket waits for a full bucket
+            need = min(amount, self.capacity)
+            self.refill()
+            while self.level < need:
+                wait = (need - self.level) / self.rate
+                self.waited += wait
+                await asyncio.sleep(wait)
+                self.refill()
+            self.level -= amount
+
+    def charge(self, amount):
+        self.refill()
+        self.level -= amount
+
+
+class DoneLines:
+    """Which input lines already have a reply, kept as a high watermark (no line
+    at or above it is done) plus the lines below it that are not done. Only the
+    failed or missing lines are stored, so a resume stays small however long
+    the file is and however the done lines are spread out."""
+
+    def __init__(self):
+        self.watermark = 0
+        self.missing = set()
+
+    def add(self, line):
+        if line >= self.watermark:
+            # everything skipped over on the way up is not done (yet)
+            self.missing.update(range(self.watermark, line))
+            self.watermark = line + 1
+        else:
+            self.missing.discard(line)
+
+    def __contains__(self, line):
+        return line < self.watermark and line not in self.missing
+
+    def __len__(self):
+        return self.watermark - len(self.missing)
+
+
+def load_done(path):
+    """Scan an earlier output file for the lines that got a reply."""
+    done = DoneLines()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for text in f:
+            try:
+                record = json.loads(text)
+            except ValueError:
+                continue  # a half-written last line from a killed run
+            if "reply" in record:
+                done.add(record["line"])
+    return done
+
+
+def read_prompts(path):
+    """Yield (line, id, messages) for every prompt in a JSONL file."""
+    with open(path, encoding="utf-8") as f:
+        for line, text in enumerate(f):
+            text = text.strip()
+            if not text:
+                continue
+            item = json.loads(text)
+            messages = item.get("messages") or [{"role": "user", "content": item["prompt"]}]
+            yield line, item.get("id", line), messages
+
+
+async def run_batch(chat, in_path, out_path, concurrency=8, rps=0.0, tpm=0.0,
+                    reply_tokens=256, progress=None):
+    """Send every prompt in `in_path` through `chat` (an AsyncChatClient) and
+    append the results to `out_path`. rps / tpm of 0 mean no limit.
+    `reply_tokens` is the guess charged up front for each reply; the real
+    size is settled when the reply arrives. Returns a dict of counts."""
+    requests_bucket = TokenBucket(rps) if rps else None
+    tokens_bucket = TokenBucket(tpm / 60.0, capacity=tpm) if tpm else None
+    done = load_done(out_path)
+    stats = {"sent": 0, "ok": 0, "failed": 0, "skipped": 0, "seconds": 0.0}
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    start = time.perf_counter()
+
+    out = open(out_path, "a", encoding="utf-8")
+
+    def write(record):
+        out.write(json.dumps(record) + "\n")
+        out.flush()  # a killed run keeps everything that finished
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            line, item_id, messages = item
+            guess = sum(message_tokens(m["content"]) for m in messages) + reply_tokens
+            if requests_bucket:
+                await requests_bucket.acquire()
+            if tokens_bucket:
+                await tokens_bucket.acquire(guess)
+            stats["sent"] += 1
+            sent_at = time.perf_counter()
+            try:
+                reply = await chat.complete(messages)
+            except Exception as e:
+                stats["failed"] += 1
+                write({"id": item_id, "line": line, "error": f"{type(e).__name__}: {e}"})
+                continue
+            if tokens_bucket:
+                tokens_bucket.charge(estimate_tokens(reply) - reply_tokens)
+            stats["ok"] += 1
+            write({"id": item_id, "line": line, "reply": reply,
+                   "seconds": round(time.perf_counter() - sent_at, 3)})
+            if progress and stats["ok"] % 100 == 0:
+                progress(stats)
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for item in read_prompts(in_path):
+            if item[0] in done:
+                stats["skipped"] += 1
+                continue
+            await queue.put(item)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        out.close()
+    stats["seconds"] = time.perf_counter() - start
+    return stats
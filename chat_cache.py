@@ -0,0 +1,168 @@
+"""
+Response cache for chat completions: a fast in-memory LRU in front of a
+SQLite file that survives restarts.
+
+Replies are stored under a key made from the normalized messages (extra
+whitespace removed), the model and any other request parameters, so
+"Hello  world" and "Hello world " share one entry but a different model or
+temperature does not. Entries expire after `ttl` seconds.
+
+    cache = ResponseCache("chat_cache.sqlite3", max_entries=1024, ttl=3600)
+    key = cache.make_key(messages, "gpt-4o")
+    reply = cache.get(key)
+    if reply is None:
+        reply = ...call the API...
+        cache.put(key, reply)
+
+cache.stats() reports hits (memory and disk), misses, evictions and expirations.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize(text):
+    """Collapse runs of whitespace and trim the ends."""
+    return " ".join(text.split())
+
+
+class ResponseCache:
+    """Two-tier LRU + TTL cache of reply texts."""
+
+    def __init__(self, path=None, max_entries=1024, max_disk_entries=100000, ttl=3600.0):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.memory = OrderedDict()  # key -> (expires_at, reply)
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # the file is opened on first use, so making a cache costs nothing
+        self.path = path
+        self.db = None
+        self.disk_entries = 0
+
+    def connect(self):
+        """Open the SQLite file if there is one and it isn't open yet; returns
+        the connection or None. Call with self.lock held."""
+        if self.db is None and self.path:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, reply TEXT NOT NULL,"
+                " created_at REAL NOT NULL, expires_at REAL NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created_at)")
+            self.db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self.db.commit()
+            self.disk_entries = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self.db
+
+    @staticmethod
+    def make_key(messages, model, **params):
+        """Cache key for a request: normalized messages + model + parameters."""
+        request = {
+            "messages": [{"role": m["role"], "content": normalize(m["content"])} for m in messages],
+            "model": model,
+            "params": params,
+        }
+        return hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """The cached reply, or None on a miss."""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self.memory[key]
+                self.expirations += 1
+
+            db = self.connect()
+            if db is not None:
+                row = db.execute(
+                    "SELECT reply, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    reply, expires_at = row
+                    if expires_at > now:
+                        self.disk_hits += 1
+                        self._remember(key, expires_at, reply)
+                        return reply
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    db.commit()
+                    self.disk_entries -= 1
+                    self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key, reply, ttl=None):
+        """Store a reply in both tiers."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self._remember(key, expires_at, reply)
+            db = self.connect()
+            if db is not None:
+                exists = db.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, reply, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, reply, now, expires_at))
+                if exists is None:
+                    self.disk_entries += 1
+                if self.disk_entries > self.max_disk_entries:
+                    # drop the oldest rows to get back under the limit
+                    excess = self.disk_entries - self.max_disk_entries
+                    db.execute(
+                        "DELETE FROM responses WHERE key IN"
+                        " (SELECT key FROM responses ORDER BY created_at LIMIT ?)", (excess,))
+                    self.disk_entries -= excess
+                    self.evictions += excess
+                db.commit()
+
+    def _remember(self, key, expires_at, reply):
+        self.memory[key] = (expires_at, reply)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Forget everything in both tiers."""
+        with self.lock:
+            self.memory.clear()
+            db = self.connect()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                db.commit()
+                self.disk_entries = 0
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "disk_entries": self.disk_entries,
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,142 @@
+"""
+Conversation memory with a token budget.
+
+ConversationMemory keeps the turns of one conversation so the model can see
+what was said before, but never more than `budget` tokens of it: once a new
+message pushes the total over the budget, the oldest messages are dropped
+and folded into a short running summary that is sent in their place.
+
+    memory = ConversationMemory(budget=2000, system="You are a helpful assistant.")
+    messages = memory.prompt("What is a robot?")   # history + the new question
+    reply = ...call the API with messages...
+    memory.add("user", "What is a robot?")
+    memory.add("assistant", reply)
+
+Every message's token count is worked out once, when it is added, and a
+running total is kept, so a turn costs the same whether the conversation is
+3 or 3000 turns long.
+"""
+from collections import deque
+
+MESSAGE_OVERHEAD = 4  # tokens the API adds around every message (role, separators)
+
+
+def estimate_tokens(text):
+    """Rough token count: about 4 characters per token for English text."""
+    return (len(text) + 3) // 4
+
+
+def message_tokens(content, count_tokens=estimate_tokens):
+    return count_tokens(content) + MESSAGE_OVERHEAD
+
+
+def brief_summary(summary, dropped, max_chars=120):
+    """The default summarizer: one short line per dropped message, added to
+    the previous summary. No API call, so it is cheap enough to run every turn."""
+    lines = [summary] if summary else []
+    for message in dropped:
+        text = " ".join(message["content"].split())
+        if len(text) > max_chars:
+            text = text[:max_chars - 3] + "..."
+        lines.append(f"{message['role']}: {text}")
+    return "\n".join(lines)
+
+
+def summary_text(summary):
+    return "Summary of the earlier conversation:\n" + summary
+
+
+class ConversationMemory:
+    """The history of one conversation, trimmed to a token budget."""
+
+    def __init__(self, budget=3000, system=None, summary_budget=500, keep_recent=2,
+                 summarize=brief_summary, count_tokens=estimate_tokens):
+        self.budget = budget                  # max tokens of system + summary + history
+        # max tokens of the summary alone (0 = just drop old turns); at most a quarter of the budget
+        self.summary_budget = min(summary_budget, budget // 4)
+        self.keep_recent = keep_recent        # never trim the newest messages below this
+        self.summarize = summarize            # summarize(previous_summary, dropped_messages) -> text
+        self.count_tokens = count_tokens
+        self.system = system
+        self.system_tokens = message_tokens(system, count_tokens) if system else 0
+        self.history = deque()  # (message, tokens), oldest first
+        self.history_tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+        self.dropped = 0
+
+    @property
+    def tokens(self):
+        """Tokens the current context will take up (without a new prompt)."""
+        return self.system_tokens + self.summary_tokens + self.history_tokens
+
+    def add(self, role, content):
+        """Append a message and trim the oldest ones if over budget."""
+        tokens = message_tokens(content, self.count_tokens)
+        self.history.append(({"role": role, "content": content}, tokens))
+        self.history_tokens += tokens
+        self.trim()
+
+    def trim(self, reserve=0):
+        """Drop the oldest messages until the context (plus `reserve` tokens
+        for a message about to be sent) fits the budget. Folding them in makes
+        the summary bigger, so this goes round until it really fits; if only
+        the keep_recent newest messages are left, the summary is cut instead."""
+        while self.tokens + reserve > self.budget and len(self.history) > self.keep_recent:
+            dropped = []
+            while self.tokens + reserve > self.budget and len(self.history) > self.keep_recent:
+                message, tokens = self.history.popleft()
+                self.history_tokens -= tokens
+                dropped.append(message)
+            self.dropped += len(dropped)
+            self.fold(dropped)
+        over = self.tokens + reserve - self.budget
+        if over > 0 and self.summary:
+            self.shorten(self.summary, self.summary_tokens - over)
+
+    def fold(self, dropped):
+        """Work the dropped messages into the summary, keeping it under summary_budget."""
+        if not self.summary_budget or self.summarize is None:
+            return
+        self.shorten(self.summarize(self.summary, dropped), self.summary_budget)
+
+    def shorten(self, summary, limit):
+        """Make `summary` the summary, dropping its oldest lines until it takes at most `limit` tokens."""
+        tokens = message_tokens(summary_text(summary), self.count_tokens)
+        while summary and tokens > limit:
+            cut = summary.find("\n")
+            summary = summary[cut + 1:] if cut >= 0 else ""
+            tokens = message_tokens(summary_text(summary), self.count_tokens)
+        self.summary = summary
+        self.summary_tokens = tokens if summary else 0
+
+    def messages(self):
+        """The context to send: system prompt, summary, then the kept turns."""
+        messages = []
+        if self.system:
+            messages.append({"role": "system", "content": self.system})
+        if self.summary:
+            messages.append({"role": "system", "content": summary_text(self.summary)})
+        messages.extend(message for message, tokens in self.history)
+        return messages
+
+    def prompt(self, text):
+        """messages() plus a new user message, trimmed so the whole request fits."""
+        self.trim(reserve=message_tokens(text, self.count_tokens))
+        return self.messages() + [{"role": "user", "content": text}]
+
+    def clear(self):
+        self.history.clear()
+        self.history_tokens = 0
+        self.summary = ""
+        self.summary_tokens = 0
+
+    def stats(self):
+        return {
+            "messages": len(self.history),
+            "tokens": self.tokens,
+            "history_tokens": self.history_tokens,
+            "summary_tokens": self.summary_tokens,
+            "dropped": self.dropped,
+            "budget": self.budget,
+        }
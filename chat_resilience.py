@@ -0,0 +1,274 @@
+"""
+Retries and hedged requests for the chat API.
+
+Resilience wraps one request (a function taking the per-attempt timeout in
+seconds) and:
+
+- retries it on errors that are worth retrying (timeouts, dropped
+  connections, 429 and 5xx replies) with exponential backoff and full
+  jitter, honouring a Retry-After header when the server sends one;
+- gives every attempt its own timeout, so one hung call can't take the
+  whole time budget;
+- optionally hedges: if an attempt hasn't answered after the p95 of recent
+  latencies, a duplicate is sent and whichever answers first wins. This
+  trims the slow tail for roughly 5% extra requests.
+
+    resilience = Resilience(RetryPolicy(max_attempts=4, attempt_timeout=20), hedge=True)
+    response = await resilience.call(lambda timeout: client.post(..., options={"timeout": timeout}))
+    response = resilience.call_sync(lambda timeout: sync_client.post(...))
+
+resilience.stats() counts calls, attempts, retries, hedges (and how many
+the hedge won), timeouts and calls that gave up.
+
+The OpenAI clients retry on their own too; create them with max_retries=0
+when they sit behind a Resilience, or the two will multiply.
+"""
+import random
+import time
+from collections import deque
+
+# asyncio, concurrent.futures and openai are imported where they are used:
+# they cost ~60 ms at startup and the plain sync path needs none of them.
+
+
+class AttemptTimeout(Exception):
+    """An attempt took longer than RetryPolicy.attempt_timeout."""
+
+
+class RetryPolicy:
+    """How often and how patiently to retry."""
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=8.0, attempt_timeout=30.0):
+        self.max_attempts = max_attempts        # including the first try
+        self.base_delay = base_delay            # backoff before the 2nd attempt, doubled each time
+        self.max_delay = max_delay              # backoff never longer than this
+        self.attempt_timeout = attempt_timeout  # seconds for one attempt (hedge included)
+
+
+def is_retryable(error):
+    import openai  # only needed once something has failed; keeps imports cheap
+
+    if isinstance(error, (AttemptTimeout, openai.APIConnectionError)):
+        return True  # includes openai.APITimeoutError
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def is_timeout(error):
+    import openai
+
+    return isinstance(error, (AttemptTimeout, openai.APITimeoutError))
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait (Retry-After header), or None."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def close_quietly(result):
+    """Close a reply nobody will read (e.g. the stream that lost a hedge race)."""
+    import asyncio
+
+    close = getattr(result, "close", None)
+    if close is None:
+        return
+    closing = close()
+    if asyncio.iscoroutine(closing):
+        asyncio.ensure_future(closing)
+
+
+class Resilience:
+    """Retry / timeout / hedging wrapper around single API requests."""
+
+    def __init__(self, policy=None, hedge=False, min_hedge_delay=0.05, min_samples=20,
+                 window=200, seed=None):
+        self.policy = policy or RetryPolicy()
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay  # never hedge sooner than this
+        self.min_samples = min_samples          # latencies needed before hedging starts
+        self.latencies = deque(maxlen=window)   # seconds, recent successful attempts
+        self.random = random.Random(seed)
+        self.pool = None  # threads for call_sync attempts, made on first use
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def percentile(self, fraction):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def hedge_delay(self):
+        """Seconds to wait before sending a duplicate, or None for no hedge."""
+        if not self.hedge or len(self.latencies) < self.min_samples:
+            return None
+        delay = max(self.min_hedge_delay, self.percentile(0.95))
+        return delay if delay < self.policy.attempt_timeout else None
+
+    def backoff(self, attempt, error):
+        """Full jitter: a random wait up to base_delay * 2^attempt (capped)."""
+        cap = min(self.policy.max_delay, self.policy.base_delay * 2 ** attempt)
+        delay = self.random.uniform(0, cap)
+        asked = retry_after(error)
+        if asked is not None:
+            delay = max(delay, min(asked, self.policy.max_delay))
+        return delay
+
+    def should_retry(self, attempt, error):
+        if is_timeout(error):
+            self.timeouts += 1
+        if attempt + 1 >= self.policy.max_attempts or not is_retryable(error):
+            self.failures += 1
+            return False
+        self.retries += 1
+        return True
+
+    # ASYNC
+
+    async def call(self, request):
+        """Run `await request(timeout)` with retries and hedging; returns its result."""
+        import asyncio
+
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                return await self.attempt(request)
+            except Exception as error:
+                if not self.should_retry(attempt, error):
+                    raise
+                await asyncio.sleep(self.backoff(attempt, error))
+                attempt += 1
+
+    async def attempt(self, request):
+        import asyncio
+
+        timeout = self.policy.attempt_timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        self.attempts += 1
+        first = asyncio.ensure_future(request(timeout))
+        tasks = {first}
+
+        delay = self.hedge_delay()
+        if delay is not None:
+            await asyncio.wait(tasks, timeout=delay)
+            if not first.done():
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(request(deadline - time.perf_counter())))
+
+        error = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, timeout=deadline - time.perf_counter(),
+                                             return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                error = AttemptTimeout(f"no reply within {timeout}s")
+                break
+            for task in done:
+                if task.exception() is None:
+                    if task is not first:
+                        self.hedge_wins += 1
+                    self.latencies.append(time.perf_counter() - start)
+                    for other in tasks | done - {task}:
+                        self.discard(other)
+                    return task.result()
+                error = task.exception()
+        for task in tasks:
+            self.discard(task)
+        raise error
+
+    def discard(self, task):
+        task.cancel()
+        task.add_done_callback(self.forget)
+
+    def forget(self, task):
+        if not task.cancelled() and task.exception() is None:
+            close_quietly(task.result())
+
+    # SYNC
+
+    def call_sync(self, request):
+        """Blocking version of call(): `request(timeout)` is a plain function.
+        Attempts (and hedged duplicates) run on a small thread pool, so the
+        caller can stop waiting at the deadline."""
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                return self.attempt_sync(request)
+            except Exception as error:
+                if not self.should_retry(attempt, error):
+                    raise
+                time.sleep(self.backoff(attempt, error))
+                attempt += 1
+
+    def attempt_sync(self, request):
+        from concurrent import futures
+
+        timeout = self.policy.attempt_timeout
+        start = time.perf_counter()
+        deadline = start + timeout
+        self.attempts += 1
+        if self.pool is None:
+            self.pool = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="attempt")
+        # even without a hedge the request runs on the pool: httpx's timeout only
+        # bounds each read, so a reply trickling in slowly could outlast it by far
+        first = self.pool.submit(request, timeout)
+        pending = {first}
+        done = set()
+        delay = self.hedge_delay()
+        if delay is not None:
+            done, pending = futures.wait(pending, timeout=delay)
+            if not done:
+                self.hedges += 1
+                pending.add(self.pool.submit(request, deadline - time.perf_counter()))
+
+        error = None
+        while pending or done:
+            if not done:
+                done, pending = futures.wait(pending, timeout=deadline - time.perf_counter(),
+                                             return_when=futures.FIRST_COMPLETED)
+                if not done:
+                    error = AttemptTimeout(f"no reply within {timeout}s")
+                    break
+            future = done.pop()
+            if future.exception() is None:
+                if future is not first:
+                    self.hedge_wins += 1
+                self.latencies.append(time.perf_counter() - start)
+                for other in pending | done:
+                    other.add_done_callback(self.forget_sync)
+                return future.result()
+            error = future.exception()
+        for other in pending:
+            other.add_done_callback(self.forget_sync)
+        raise error
+
+    def forget_sync(self, future):
+        if future.exception() is None:
+            close_quietly(future.result())
+
+    def stats(self):
+        p95 = self.percentile(0.95)
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "p95": p95,
+        }
@@ -0,0 +1,221 @@
+"""
+A small stand-in for the OpenAI chat completions API, for local testing.
+
+It answers POST /v1/chat/completions with a made-up reply (it echoes the
+last user message), either as one JSON body or streamed token by token
+(stream=True), with configurable delays so latency can be measured.
+It can also fail on purpose: a share of requests get an error status
+(--error-rate) or an extra long delay (--slow-rate / --slow-delay), to test
+retries and hedging.
+
+Run it on its own:
+    python fake_openai_server.py --port 8000 --latency 0.2 --token-delay 0.02
+
+then point the chatbot at it:
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8000/v1 python mainn.py
+
+Or start it from Python with start_server(), which returns the server and
+its base URL and serves from a background thread.
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeConfig:
+    """How the fake server behaves. Change the fields while it runs if needed."""
+
+    def __init__(self, latency=0.0, jitter=0.0, token_delay=0.0, reply=None, seed=None,
+                 error_rate=0.0, error_status=503, slow_rate=0.0, slow_delay=1.0):
+        self.latency = latency          # seconds before the first byte of every reply
+        self.jitter = jitter            # up to this many extra seconds, at random
+        self.token_delay = token_delay  # seconds between streamed tokens
+        self.reply = reply              # fixed reply text; None echoes the prompt
+        self.error_rate = error_rate    # share of requests answered with error_status
+        self.error_status = error_status
+        self.slow_rate = slow_rate      # share of requests that wait slow_delay extra seconds
+        self.slow_delay = slow_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+
+    def delay(self):
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            if self.slow_rate and self.random.random() < self.slow_rate:
+                self.slow += 1
+                delay += self.slow_delay
+            return delay
+
+    def should_fail(self):
+        with self.lock:
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def reply_for(self, messages):
+        if self.reply is not None:
+            return self.reply
+        prompt = messages[-1]["content"] if messages else ""
+        return f"You said: {prompt}"
+
+
+def split_tokens(text):
+    """Cut a reply into word-sized pieces, keeping the spaces, like a token stream."""
+    words = text.split(" ")
+    return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can pool connections
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def log_message(self, format, *args):
+        pass  # keep test output quiet
+
+    def do_POST(self):
+        config = self.server.config
+        with config.lock:
+            config.requests += 1
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        time.sleep(config.delay())
+        if config.should_fail():
+            self.send_json(config.error_status, {"error": {"message": "injected failure", "type": "server_error"}})
+            return
+        model = body.get("model", "gpt-4o")
+        text = config.reply_for(body.get("messages", []))
+        if body.get("stream"):
+            self.send_stream(model, text, config.token_delay)
+        else:
+            self.send_json(200, completion(model, text, body.get("messages", [])))
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, model, text, token_delay):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk_id = "chatcmpl-" + uuid.uuid4().hex[:12]
+        tokens = split_tokens(text)
+        for i, token in enumerate(tokens):
+            if i and token_delay:
+                time.sleep(token_delay)
+            delta = {"content": token}
+            if i == 0:
+                delta["role"] = "assistant"
+            self.write_chunk(chunk(chunk_id, model, delta, None))
+        self.write_chunk(chunk(chunk_id, model, {}, "stop"))
+        self.write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def write_chunk(self, payload):
+        self.write_event(json.dumps(payload))
+
+    def write_event(self, data):
+        event = f"data: {data}\n\n".encode()
+        self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+        self.wfile.flush()
+
+
+def completion(model, text, messages):
+    prompt_tokens = sum(len(m.get("content", "").split()) for m in messages)
+    return {
+        "id": "chatcmpl-" + uuid.uuid4().hex[:12],
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(split_tokens(text)),
+            "total_tokens": prompt_tokens + len(split_tokens(text)),
+        },
+    }
+
+
+def chunk(chunk_id, model, delta, finish_reason):
+    return {
+        "id": chunk_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 drops bursts of new connections (1s SYN retry)
+
+    def __init__(self, address, config):
+        super().__init__(address, FakeOpenAIHandler)
+        self.config = config
+
+    def handle_error(self, request, client_address):
+        # a client that hangs up mid-reply (e.g. a killed batch run) is
+        # normal here, not worth a traceback
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(host="127.0.0.1", port=0, **settings):
+    """Start a fake server in a background thread (port 0 picks a free port).
+    Returns the server; use server.base_url and server.shutdown()."""
+    server = FakeOpenAIServer((host, port), FakeConfig(**settings))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake OpenAI chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every reply")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra seconds, up to this")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    parser.add_argument("--reply", default=None, help="fixed reply text (default: echo the prompt)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of the failures")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of requests that are extra slow")
+    parser.add_argument("--slow-delay", type=float, default=1.0, help="extra seconds for the slow ones")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer((args.host, args.port), FakeConfig(
+        latency=args.latency, jitter=args.jitter, token_delay=args.token_delay, reply=args.reply,
+        error_rate=args.error_rate, error_status=args.error_status,
+        slow_rate=args.slow_rate, slow_delay=args.slow_delay))
+    print(f"Fake OpenAI server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
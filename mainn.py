@@ -1,33 +1,193 @@
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
+import sys
+import threading
+import time
+from collections import deque
 
-# Load environment variables from .env file
-load_dotenv()
+from chat_cache import ResponseCache
+from chat_memory import ConversationMemory
+from chat_resilience import Resilience, RetryPolicy
+
+# openai and dotenv are only imported when the first request is made (see get_client):
+# importing openai alone takes over half a second, which short-lived workers and
+# code that never calls the API shouldn't pay for.
+
+# Failed calls are retried with backoff, each attempt gets CHAT_TIMEOUT seconds,
+# and with CHAT_HEDGE=1 a slow call gets a duplicate sent after the p95 latency.
+resilience = Resilience(
+    RetryPolicy(max_attempts=int(os.getenv("CHAT_ATTEMPTS", 4)),
+                attempt_timeout=float(os.getenv("CHAT_TIMEOUT", 60))),
+    hedge=os.getenv("CHAT_HEDGE", "0") == "1",
+)
+
+client = None  # the process's one OpenAI client, made by get_client()
+client_lock = threading.Lock()
 
-# Get the API key
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("API key not found. Make sure it's set in the .env file.")
 
-# Initialize client
-client = OpenAI(api_key=api_key)
 # This code will work if your .env file contains a line like:
 # OPENAI_API_KEY=your_actual_api_key_here
 # Make sure the .env file is in the same directory as main.py and contains your valid API key.
-def chat_with_gpt(prompt):
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return response.choices[0].message.content.strip()
+def get_api_key():
+    # Load environment variables from .env file
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Get the API key
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("API key not found. Make sure it's set in the .env file.")
+    return api_key
+
+
+def get_client():
+    # Initialize client on first use; every later call gets the same one
+    # (set OPENAI_BASE_URL to talk to a local stand-in such as fake_openai_server.py)
+    global client
+    if client is None:
+        with client_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(api_key=get_api_key(), max_retries=0)  # retries are left to `resilience`
+    return client
+
+
+MODEL = "gpt-4o"
+
+# Repeated prompts are answered from this cache instead of the API.
+# Replies are kept on disk in CHAT_CACHE_PATH (set it empty to keep them in memory only)
+# for CHAT_CACHE_TTL seconds.
+response_cache = ResponseCache(
+    path=os.getenv("CHAT_CACHE_PATH", "chat_cache.sqlite3"),
+    ttl=float(os.getenv("CHAT_CACHE_TTL", 24 * 3600)),
+)
+
+# The conversation so far, trimmed/summarized to CHAT_HISTORY_TOKENS tokens.
+conversation = ConversationMemory(budget=int(os.getenv("CHAT_HISTORY_TOKENS", 3000)))
+
+# Timing of the most recent calls, newest last. Each entry is a dict with
+# "stream", "cached", "ttft" (seconds until the first token arrived) and "total" (seconds for the whole reply).
+call_timings = deque(maxlen=1000)
+
+
+def record_timing(stream, start, first_token_at, end, cached=False):
+    timing = {
+        "stream": stream,
+        "cached": cached,
+        "ttft": (first_token_at if first_token_at is not None else end) - start,
+        "total": end - start,
+    }
+    call_timings.append(timing)
+    return timing
+
+
+def create_completion(messages, stream=False):
+    # Same as client.chat.completions.create(model=MODEL, messages=messages, stream=stream),
+    # minus the SDK re-checking every history message on each call (slow for long chats).
+    # Goes through `resilience`, so it is retried/hedged until the reply starts.
+    from openai import Stream
+    from openai.types.chat import ChatCompletion, ChatCompletionChunk
+    client = get_client()
+
+    def post(timeout):
+        return client.post(
+            "/chat/completions",
+            body={"model": MODEL, "messages": messages, "stream": stream},
+            cast_to=ChatCompletion,
+            options={"timeout": timeout},
+            stream=stream,
+            stream_cls=Stream[ChatCompletionChunk],
+        )
+    return resilience.call_sync(post)
+
+
+def chat_with_gpt(prompt, stream=False, out=sys.stdout, use_cache=True, memory=conversation):
+    # With stream=True the reply is printed to `out` token by token as it arrives;
+    # either way the whole reply text is returned.
+    # The earlier turns in `memory` are sent along; pass memory=None for a one-off question.
+    start = time.perf_counter()
+    if memory is not None:
+        messages = memory.prompt(prompt)
+    else:
+        messages = [{"role": "user", "content": prompt}]
+
+    key = None
+    if use_cache:
+        key = response_cache.make_key(messages, MODEL)
+        reply = response_cache.get(key)
+        if reply is not None:
+            if stream:
+                out.write(reply + "\n")
+                out.flush()
+            record_timing(stream, start, None, time.perf_counter(), cached=True)
+            remember_turn(memory, prompt, reply)
+            return reply
+
+    if not stream:
+        response = create_completion(messages)
+        record_timing(False, start, None, time.perf_counter())
+        reply = response.choices[0].message.content.strip()
+    else:
+        pieces = []
+        first_token_at = None
+        for chunk in create_completion(messages, stream=True):
+            if not chunk.choices:
+                continue
+            token = chunk.choices[0].delta.content
+            if token:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                out.write(token)
+                out.flush()
+                pieces.append(token)
+        out.write("\n")
+        record_timing(True, start, first_token_at, time.perf_counter())
+        reply = "".join(pieces).strip()
+
+    if key is not None:
+        response_cache.put(key, reply)
+    remember_turn(memory, prompt, reply)
+    return reply
+
+
+def remember_turn(memory, prompt, reply):
+    if memory is not None:
+        memory.add("user", prompt)
+        memory.add("assistant", reply)
 
 if __name__ == "__main__":
-    while True:
-        user_input = input("You: ")
-        if user_input.lower() in ["quit", "exit", "bye"]:
-            break
-
-        response = chat_with_gpt(user_input)
-        print("Chatbot:", response)
-        print("Session ended. Goodbye!")
\ No newline at end of file
+    # The REPL runs on the async path: one pooled client, one session.
+    # With --batch, a JSONL file of prompts is run instead (see chat_batch.py).
+    import argparse
+    import asyncio
+    from chat_async import get_chat_client, repl
+    from chat_batch import run_batch
+
+    parser = argparse.ArgumentParser(description="Chat with GPT")
+    parser.add_argument("--batch", metavar="PROMPTS_JSONL", help="run every prompt in this file")
+    parser.add_argument("--out", default="replies.jsonl", help="batch output file (appended; reruns resume)")
+    parser.add_argument("--concurrency", type=int, default=8, help="batch requests in flight")
+    parser.add_argument("--rps", type=float, default=0, help="batch requests per second (0 = no limit)")
+    parser.add_argument("--tpm", type=float, default=0, help="batch tokens per minute (0 = no limit)")
+    args = parser.parse_args()
+
+    def show_progress(stats):
+        print(f"{stats['ok']} done, {stats['failed']} failed", file=sys.stderr)
+
+    async def main():
+        api_key = get_api_key()
+        if args.batch:
+            async with get_chat_client(api_key=api_key, cache=response_cache, history_tokens=0,
+                                       resilience=resilience,
+                                       max_connections=args.concurrency,
+                                       max_keepalive=args.concurrency) as chat:
+                stats = await run_batch(chat, args.batch, args.out, concurrency=args.concurrency,
+                                        rps=args.rps, tpm=args.tpm, progress=show_progress)
+            print(f"{stats['ok']} replies, {stats['failed']} failed, {stats['skipped']} already done, "
+                  f"{stats['seconds']:.1f}s -> {args.out}")
+        else:
+            async with get_chat_client(api_key=api_key, cache=response_cache,
+                                       history_tokens=conversation.budget,
+                                       resilience=resilience) as chat:
+                await repl(chat)
+
+    asyncio.run(main())
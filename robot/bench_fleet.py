@@ -0,0 +1,95 @@
+"""
+BENCHMARK: auto-mode steps, Robot objects vs NumPy Fleet
+
+Puts thousands of robots on a random map, sends them all to one goal and
+times a step of the object loop (move_towards_goal per robot) against one
+vectorized Fleet.step. Both use the same shared distance fields, and the
+final states are compared so the speed-up isn't bought with different rules.
+
+HOW TO RUN:
+    python bench_fleet.py
+    python bench_fleet.py --robots 10000 100000 --map-size 512 --steps 20
+"""
+
+import argparse
+import random
+import time
+
+import day2_engine
+from day2_engine import Robot, FastRobot, StrongRobot, ScoutRobot
+from fleet import Fleet
+from occupancy import OccupancyGrid
+from pathfinding import DistanceFieldCache
+
+ROBOT_CLASSES = {
+    "Robot": Robot,
+    "FastRobot": FastRobot,
+    "StrongRobot": StrongRobot,
+    "ScoutRobot": ScoutRobot,
+}
+
+
+def random_grid(size, density, seed):
+    """a size x size OccupancyGrid with a `density` fraction of obstacles"""
+    rng = random.Random(seed)
+    grid = OccupancyGrid(size, size)
+    for cell in rng.sample(range(size * size), int(size * size * density)):
+        grid.add(cell % size, cell // size)
+    return grid
+
+
+def robots_like(fleet):
+    """Robot objects with the same starting state as the fleet"""
+    robots = []
+    for i in range(len(fleet)):
+        robot = ROBOT_CLASSES[fleet.kinds[i]](fleet.names[i], int(fleet.x[i]), int(fleet.y[i]))
+        robot.grid_size = fleet.grid_size
+        robots.append(robot)
+    return robots
+
+
+def run(robot_counts, map_size, density, steps, seed):
+    day2_engine.VERBOSE = False
+    grid = random_grid(map_size, density, seed)
+    planner = DistanceFieldCache(grid)
+    goal_x, goal_y = next((x, y) for y in range(map_size // 2, map_size)
+                          for x in range(map_size // 2, map_size) if grid.is_free(x, y))
+    # build the fields once so neither side pays for the search
+    for speed in (1, 2):
+        planner.field(goal_x, goal_y, speed)
+
+    print(f"map {map_size}x{map_size}, goal ({goal_x}, {goal_y}), {steps} steps")
+    print(f"{'robots':>8} {'objects ms/step':>16} {'fleet ms/step':>14} {'speedup':>8} {'same state':>11}")
+    for count in robot_counts:
+        fleet = Fleet.spawn(count, grid, seed=seed)
+        robots = robots_like(fleet)
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            for robot in robots:
+                robot.move_towards_goal(goal_x, goal_y, planner)
+        objects = (time.perf_counter() - start) / steps
+
+        start = time.perf_counter()
+        for _ in range(steps):
+            fleet.step(goal_x, goal_y, planner)
+        vectorized = (time.perf_counter() - start) / steps
+
+        same = all(fleet[i].get_info() == robots[i].get_info() for i in range(count))
+        print(f"{count:>8} {objects * 1000:>16.2f} {vectorized * 1000:>14.2f} "
+              f"{objects / vectorized:>7.1f}x {str(same):>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="object vs vectorized fleet stepping")
+    parser.add_argument("--robots", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--map-size", type=int, default=256)
+    parser.add_argument("--density", type=float, default=0.25, help="fraction of cells that are obstacles")
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.robots, args.map_size, args.density, args.steps, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+BENCHMARK: opening a map, parsed lists vs a memory-mapped map file
+
+For warehouse maps of growing size, writes the map in the old list format
+(JSON with goal and obstacle [x, y] lists) and as a .rmap file, then times
+- parsing the JSON and building the OccupancyGrid from the obstacle list
+- load_map(): header, goals and a memory map of the cells, nothing read yet
+- load_map() and then touching every cell (all pages read in)
+
+Then starts a few processes that each load the biggest map and walk all of
+it, and prints how much each one's memory grew in the shared file mapping
+(RssFile, the same page cache pages for all of them) and in private memory
+(RssAnon); Linux only.
+
+HOW TO RUN:
+    python bench_map_load.py
+    python bench_map_load.py --sizes 100 1000 4000 --processes 4
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from maps import load_map, save_map, warehouse
+from occupancy import OccupancyGrid
+
+
+def best_of(runs, work):
+    """the fastest of `runs` calls of work(), in ms"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        work()
+        ms = (time.perf_counter() - start) * 1000
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def load_json(path):
+    with open(path) as f:
+        level = json.load(f)
+    return OccupancyGrid.from_obstacles(level["obstacles"], level["size"], level["size"]), level["goals"]
+
+
+def touch_all(path):
+    grid, _ = load_map(path)
+    return grid.count()
+
+
+def memory_of_child(path):
+    """how much RssFile and RssAnon (kB) grew in a fresh process while it loaded the map and read all of it"""
+    code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import numpy\n"
+        "from maps import load_map\n"
+        "def rss():\n"
+        "    status = dict(line.split(':', 1) for line in open('/proc/self/status'))\n"
+        "    return int(status['RssFile'].split()[0]), int(status['RssAnon'].split()[0])\n"
+        "before = rss()\n"
+        "grid, goals = load_map(%r)\n"
+        "grid.count()\n"
+        "after = rss()\n"
+        "print(after[0] - before[0], after[1] - before[1])\n"
+    ) % (os.path.dirname(os.path.abspath(__file__)), path)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    file_kb, anon_kb = output.split()
+    return int(file_kb), int(anon_kb)
+
+
+def run(sizes, runs, processes):
+    folder = tempfile.mkdtemp(prefix="maps_")
+    try:
+        measure(folder, sizes, runs, processes)
+    finally:
+        shutil.rmtree(folder)
+
+
+def measure(folder, sizes, runs, processes):
+    print(f"{'map':>11} {'json MB':>8} {'rmap MB':>8} {'parse ms':>9} {'mmap ms':>8} {'mmap+read ms':>13}")
+    for size in sizes:
+        grid, goals = warehouse(size)
+        json_path = os.path.join(folder, f"w{size}.json")
+        map_path = os.path.join(folder, f"w{size}.rmap")
+        obstacles = [[x, y] for y in range(size) for x in range(size) if grid.cells[y * size + x]]
+        with open(json_path, "w") as f:
+            json.dump({"size": size, "goals": goals, "obstacles": obstacles}, f)
+        del obstacles
+        save_map(map_path, grid, goals)
+
+        parse_ms = best_of(runs, lambda: load_json(json_path))
+        mmap_ms = best_of(runs, lambda: load_map(map_path))
+        read_ms = best_of(runs, lambda: touch_all(map_path))
+        print(f"{size:>5}x{size:<5} {os.path.getsize(json_path) / 1e6:>8.1f} {os.path.getsize(map_path) / 1e6:>8.1f} "
+              f"{parse_ms:>9.1f} {mmap_ms:>8.3f} {read_ms:>13.1f}")
+
+    if processes and os.path.exists("/proc/self/status"):
+        print(f"\n{processes} processes reading the {sizes[-1]}x{sizes[-1]} map:")
+        for i in range(processes):
+            file_kb, anon_kb = memory_of_child(map_path)
+            print(f"  process {i + 1}: +{file_kb / 1024:.1f} MB file-backed (shared page cache), "
+                  f"+{anon_kb / 1024:.1f} MB private")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time loading maps from JSON lists and from map files")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--runs", type=int, default=3, help="best of this many loads")
+    parser.add_argument("--processes", type=int, default=3, help="processes for the shared memory check")
+    args = parser.parse_args()
+    run(args.sizes, args.runs, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+BENCHMARK: obstacle lookup, list scan vs occupancy grid
+
+Compares the old is_obstacle (walk the whole [x, y] list) with
+OccupancyGrid.is_blocked (one byte lookup) as the grid and the number of
+obstacles grow. About a third of the cells are obstacles, like day 1.
+
+HOW TO RUN:
+    python bench_occupancy.py
+    python bench_occupancy.py --sizes 10 50 200 --density 0.35
+"""
+
+import argparse
+import random
+import time
+
+from occupancy import OccupancyGrid
+
+
+def is_obstacle_scan(obstacles, x, y):
+    """the original day 1 lookup: check every obstacle"""
+    for obstacle in obstacles:
+        if obstacle[0] == x and obstacle[1] == y:
+            return True
+    return False
+
+
+def random_obstacles(rng, grid_size, density):
+    """a density-sized sample of the cells as [x, y] lists"""
+    count = int(grid_size * grid_size * density)
+    cells = rng.sample(range(grid_size * grid_size), count)
+    return [[cell % grid_size, cell // grid_size] for cell in cells]
+
+
+def time_lookups(lookup, points):
+    """seconds per lookup over all points"""
+    start = time.perf_counter()
+    for x, y in points:
+        lookup(x, y)
+    return (time.perf_counter() - start) / len(points)
+
+
+def run(sizes, density, lookups, seed):
+    rng = random.Random(seed)
+    print(f"{'grid':>9} {'obstacles':>10} {'scan ns':>12} {'grid ns':>9} {'speedup':>9}")
+    for grid_size in sizes:
+        obstacles = random_obstacles(rng, grid_size, density)
+        grid = OccupancyGrid.from_obstacles(obstacles, grid_size, grid_size)
+        points = [(rng.randrange(grid_size), rng.randrange(grid_size)) for _ in range(lookups)]
+
+        # the scan gets slow fast, so give it fewer points on big maps
+        scan_points = points[:max(10, lookups * 100 // max(1, len(obstacles)))]
+        scan = time_lookups(lambda x, y: is_obstacle_scan(obstacles, x, y), scan_points)
+        fast = time_lookups(grid.is_blocked, points)
+
+        # both lookups must agree
+        for x, y in scan_points:
+            assert is_obstacle_scan(obstacles, x, y) == grid.is_blocked(x, y)
+
+        print(f"{grid_size:>4}x{grid_size:<4} {len(obstacles):>10} {scan * 1e9:>12.0f} "
+              f"{fast * 1e9:>9.0f} {scan / fast:>8.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="obstacle lookup benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument("--density", type=float, default=0.35, help="fraction of cells that are obstacles")
+    parser.add_argument("--lookups", type=int, default=100000, help="lookups per grid size")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.density, args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
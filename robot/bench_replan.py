@@ -0,0 +1,78 @@
+"""
+BENCHMARK: replanning after a push, searching again vs repairing the fields
+
+For warehouse maps of growing size, builds the distance fields for a few
+goals (walking and jumping), then pushes obstacles one cell at a time onto
+free cells, the way StrongRobot.push_obstacle does, and times
+- searching every field again from scratch (what a push used to cost)
+- DistanceFieldCache.update(): repairing each field around the two cells
+  that changed
+The repair time and the number of cells it searched again follow the size
+of the region whose distances changed, so they stay about flat as the map
+grows; the full search grows with the map area. At the end every repaired
+field is checked against a fresh search.
+
+HOW TO RUN:
+    python bench_replan.py
+    python bench_replan.py --sizes 250 1000 2000 --pushes 500 --goals 2
+"""
+
+import argparse
+import random
+import time
+
+from maps import warehouse
+from pathfinding import DIRECTIONS, DistanceFieldCache, distance_field
+
+
+def random_push(grid, goals, rng):
+    """(old_x, old_y, new_x, new_y) of an obstacle that can be pushed one cell onto a free cell"""
+    while True:
+        x = rng.randrange(grid.width)
+        y = rng.randrange(grid.height)
+        if not grid.is_blocked(x, y):
+            continue
+        _, dx, dy = rng.choice(DIRECTIONS)
+        if grid.is_free(x + dx, y + dy) and [x + dx, y + dy] not in goals:
+            return x, y, x + dx, y + dy
+
+
+def run(sizes, goal_count, pushes, seed):
+    print(f"{goal_count} goals x speeds 1 and 2, {pushes} pushes per map")
+    print(f"{'map':>11} {'full search ms':>15} {'repair ms':>10} {'cells searched':>15} {'speedup':>8} {'same':>5}")
+    for size in sizes:
+        grid, goals = warehouse(size, seed=seed, goal_count=goal_count)
+        keys = [(x, y, speed) for x, y in goals for speed in (1, 2)]
+        cache = DistanceFieldCache(grid)
+
+        start = time.perf_counter()
+        for key in keys:
+            cache.field(*key)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(seed)
+        repair_s = 0
+        for _ in range(pushes):
+            grid.move(*random_push(grid, goals, rng))
+            start = time.perf_counter()
+            cache.update()
+            repair_s += time.perf_counter() - start
+        repair_ms = repair_s / pushes * 1000
+
+        same = all(cache.field(*key) == distance_field(grid, *key) for key in keys)
+        print(f"{size:>5}x{size:<5} {full_ms:>15.1f} {repair_ms:>10.3f} {cache.repaired / pushes:>15.0f} "
+              f"{full_ms / repair_ms:>7.0f}x {str(same):>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time replanning after obstacle pushes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000])
+    parser.add_argument("--goals", type=int, default=3)
+    parser.add_argument("--pushes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.goals, args.pushes, args.seed)
+
+
+if __name__ == "__main__":
+    main()
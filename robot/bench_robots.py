@@ -0,0 +1,113 @@
+"""
+BENCHMARK: memory and build time of a million robots, __slots__ vs __dict__
+
+Builds N robots of the four types (round robin) twice: with the robot
+classes of day2_engine.py, which keep their attributes in __slots__, and
+with copies of the classes the way they were before, an attribute
+__dict__ per robot, type and scan_range set in __init__ and a print per
+robot. It reports the bytes each robot takes (tracemalloc, names and
+positions are shared so only the robot objects count) and how many robots
+per second get built. The old print goes to os.devnull, which is the
+cheapest it ever gets; in a terminal it is far slower.
+
+HOW TO RUN:
+    python bench_robots.py
+    python bench_robots.py --robots 100000
+"""
+
+import argparse
+import contextlib
+import gc
+import os
+import time
+import tracemalloc
+
+from day2_engine import GRID_SIZE, RED, SKY_BLUE, INDIGO, GOLDEN, Robot, FastRobot, StrongRobot, ScoutRobot
+
+SLOTTED = [Robot, FastRobot, StrongRobot, ScoutRobot]
+
+
+# THE ROBOT CLASSES BEFORE __slots__
+
+class DictRobot():
+    grid_size = GRID_SIZE
+    occupancy = None
+
+    def __init__(self, name, x, y, speed=1, battery=100, color=RED):
+        self.name = name
+        self.color = color
+        self.speed = speed
+        self.x = x
+        self.y = y
+        self.max_battery = battery
+        self.battery = battery
+        self.moves = 0
+        print(f"Robot {self.name} at position ({self.x}, {self.y})")
+
+
+class DictFastRobot(DictRobot):
+    def __init__(self, name, x, y, speed=2, battery=80, color=SKY_BLUE):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+        self.type = "FAST ROBOT"
+
+
+class DictStrongRobot(DictRobot):
+    def __init__(self, name, x, y, speed=1, battery=120, color=INDIGO):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+        self.type = "STRONG ROBOT"
+
+
+class DictScoutRobot(DictRobot):
+    def __init__(self, name, x, y, speed=2, battery=100, color=GOLDEN):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+        self.type = "SCOUT ROBOT"
+        self.scan_range = 2
+
+
+WITH_DICT = [DictRobot, DictFastRobot, DictStrongRobot, DictScoutRobot]
+
+
+def build(classes, count, names):
+    """`count` robots, the classes taking turns, on cells (0..99, 0..99)"""
+    kinds = len(classes)
+    return [classes[i % kinds](names[i % len(names)], i % 100, i // 100 % 100) for i in range(count)]
+
+
+def measure(classes, count, names):
+    """(bytes per robot, robots built per second)"""
+    gc.collect()
+    tracemalloc.start()
+    robots = build(classes, count, names)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del robots
+    gc.collect()
+
+    start = time.perf_counter()
+    robots = build(classes, count, names)
+    seconds = time.perf_counter() - start
+    del robots
+    return size / count, count / seconds
+
+
+def run(count):
+    names = [f"R{i}" for i in range(1000)]
+    print(f"{count} robots, the four types in turn")
+    print(f"{'layout':>22} {'bytes/robot':>12} {'robots/sec':>12}")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        dict_bytes, dict_rate = measure(WITH_DICT, count, names)
+    slot_bytes, slot_rate = measure(SLOTTED, count, names)
+    print(f"{'__dict__ + print':>22} {dict_bytes:>12.0f} {dict_rate:>12,.0f}")
+    print(f"{'__slots__, no print':>22} {slot_bytes:>12.0f} {slot_rate:>12,.0f}")
+    print(f"{slot_bytes / dict_bytes:.2f}x the memory, {slot_rate / dict_rate:.1f}x the build rate")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bytes per robot and build rate of the robot classes")
+    parser.add_argument("--robots", type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.robots)
+
+
+if __name__ == "__main__":
+    main()
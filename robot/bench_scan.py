@@ -0,0 +1,82 @@
+"""
+BENCHMARK: ScoutRobot.scan_area with plain lists vs a SpatialIndex
+
+Scans from random cells of growing maps, once over the obstacle/goal lists
+(every item checked) and once over SpatialIndex buckets (only the buckets
+around the scout), then times moving obstacles in the index the way
+StrongRobot.push_obstacle does.
+
+HOW TO RUN:
+    python bench_scan.py
+    python bench_scan.py --sizes 100 1000 --scans 2000
+"""
+
+import argparse
+import random
+import time
+
+import day2_engine
+from day2_engine import ScoutRobot
+from spatial_index import SpatialIndex
+
+
+def run(sizes, density, scans, seed):
+    day2_engine.VERBOSE = False
+    rng = random.Random(seed)
+    print(f"{'map':>11} {'obstacles':>10} {'list us/scan':>13} {'index us/scan':>14} {'speedup':>8} {'push us':>8}")
+    for size in sizes:
+        cells = rng.sample(range(size * size), int(size * size * density))
+        obstacles = [[cell % size, cell // size] for cell in cells]
+        goals = [[rng.randrange(size), rng.randrange(size)] for _ in range(max(3, size // 10))]
+        obstacle_index = SpatialIndex.from_items(obstacles)
+        goal_index = SpatialIndex.from_items(goals)
+
+        scout = ScoutRobot("REX", 0, 0)
+        scout.grid_size = size
+        spots = [(rng.randrange(size), rng.randrange(size)) for _ in range(scans)]
+        # the list scan walks every obstacle, so give it fewer spots on big maps
+        list_spots = spots[:max(5, scans * 1000 // len(obstacles))]
+
+        start = time.perf_counter()
+        for scout.x, scout.y in list_spots:
+            scout.battery = 100
+            scout.scan_area(obstacles, goals)
+        with_lists = (time.perf_counter() - start) / len(list_spots)
+
+        start = time.perf_counter()
+        for scout.x, scout.y in spots:
+            scout.battery = 100
+            scout.scan_area(obstacle_index, goal_index)
+        with_index = (time.perf_counter() - start) / len(spots)
+
+        # both must see the same things
+        for scout.x, scout.y in list_spots:
+            by_list = scout.scan_area(obstacles, goals)
+            by_index = scout.scan_area(obstacle_index, goal_index)
+            assert sorted(by_list[0]) == sorted(by_index[0]) and sorted(by_list[1]) == sorted(by_index[1])
+
+        # push random obstacles one cell and refile them
+        pushes = [rng.choice(obstacles) for _ in range(scans)]
+        start = time.perf_counter()
+        for obstacle in pushes:
+            old_x, old_y = obstacle
+            obstacle[0] = min(size - 1, old_x + 1)
+            obstacle_index.move(obstacle, old_x, old_y)
+        push = (time.perf_counter() - start) / len(pushes)
+
+        print(f"{size:>5}x{size:<5} {len(obstacles):>10} {with_lists * 1e6:>13.1f} {with_index * 1e6:>14.1f} "
+              f"{with_lists / with_index:>7.0f}x {push * 1e6:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="scout scan benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 300, 1000])
+    parser.add_argument("--density", type=float, default=0.35, help="fraction of cells that are obstacles")
+    parser.add_argument("--scans", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.density, args.scans, args.seed)
+
+
+if __name__ == "__main__":
+    main()
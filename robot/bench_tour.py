@@ -0,0 +1,61 @@
+"""
+BENCHMARK: TourPlanner on random maps with more and more goals
+
+For each goal count, builds a random map, then times the distance matrix
+(one breadth-first search per goal) and the search for the visiting order
+(Held-Karp up to tour_planner.EXACT_GOALS goals, branch-and-bound above),
+and checks the tour against the greedy nearest-neighbour one.
+
+HOW TO RUN:
+    python bench_tour.py
+    python bench_tour.py --goals 5 10 20 40 --size 80
+"""
+
+import argparse
+import random
+import time
+
+from occupancy import OccupancyGrid
+from pathfinding import DistanceFieldCache
+from tour_planner import TourPlanner, nearest_neighbour, path_length
+
+
+def random_map(size, density, rng):
+    grid = OccupancyGrid(size, size)
+    for cell in rng.sample(range(1, size * size), int(size * size * density)):
+        grid.add(cell % size, cell // size)
+    return grid
+
+
+def run(goal_counts, size, density, seed):
+    rng = random.Random(seed)
+    print(f"{'goals':>6} {'matrix ms':>10} {'order ms':>9} {'moves':>6} {'greedy':>7} {'optimal':>8}")
+    for count in goal_counts:
+        grid = random_map(size, density, rng)
+        free = [i for i in range(1, size * size) if grid.cells[i] == 0]
+        goals = [[cell % size, cell // size] for cell in rng.sample(free, count)]
+        planner = TourPlanner(DistanceFieldCache(grid))
+
+        start = time.perf_counter()
+        dist = planner.distances((0, 0), goals)
+        matrix_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        tour = planner.plan((0, 0), goals)
+        order_ms = (time.perf_counter() - start) * 1000
+
+        greedy = path_length(dist, nearest_neighbour(dist))
+        print(f"{count:>6} {matrix_ms:>10.1f} {order_ms:>9.1f} {tour['moves']:>6} {greedy:>7} {str(tour['optimal']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time the day 1 tour planner")
+    parser.add_argument("--goals", type=int, nargs="+", default=[3, 6, 10, 15, 20, 30, 50])
+    parser.add_argument("--size", type=int, default=60, help="the map is size x size cells")
+    parser.add_argument("--density", type=float, default=0.2, help="fraction of cells with an obstacle")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.goals, args.size, args.density, args.seed)
+
+
+if __name__ == "__main__":
+    main()
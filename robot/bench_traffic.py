@@ -0,0 +1,118 @@
+"""
+BENCHMARK: collision checks, spatial hash vs asking every robot
+
+Puts thousands of robots on a warehouse map, all in auto mode towards one
+goal, and times Simulation steps with the RobotOccupancy layer (a hash from
+cell to robot, one lookup per question) against a layer with the same
+interface that answers "is a robot on (x, y)?" by looking at every robot.
+Both give the same answers, so the final states are compared too: the hash
+must not change who ends up where.
+
+HOW TO RUN:
+    python bench_traffic.py
+    python bench_traffic.py --robots 1000 20000 --map-size 500 --steps 20
+"""
+
+import argparse
+import random
+import time
+
+import day2_engine
+from day2_engine import Simulation, Robot, FastRobot, StrongRobot, ScoutRobot
+from maps import warehouse
+from occupancy import RobotOccupancy
+
+ROBOT_CLASSES = [Robot, FastRobot, StrongRobot, ScoutRobot]
+PAIRWISE_LIMIT = 2000  # above this the pairwise steps take too long to bother timing
+
+
+class PairwiseOccupancy(RobotOccupancy):
+    """RobotOccupancy without the hash: a list of robots, scanned for every question"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.robots = []
+
+    def place(self, robot):
+        if self.robot_at(robot.x, robot.y) is not None:
+            raise ValueError(f"({robot.x}, {robot.y}) already has a robot on it")
+        self.robots.append(robot)
+
+    def remove(self, robot):
+        self.robots.remove(robot)
+
+    def robot_at(self, x, y):
+        for robot in self.robots:
+            if robot.x == x and robot.y == y:
+                return robot
+        return None
+
+    def is_free(self, x, y):
+        return self.grid.is_free(x, y) and self.robot_at(x, y) is None
+
+    def moved(self, robot, old_x, old_y):
+        pass  # the robots carry their own positions
+
+
+def make_simulation(grid, goal, count, seed):
+    """`count` robots of all types on distinct free cells, all heading for `goal`"""
+    rng = random.Random(seed)
+    cells = set()
+    while len(cells) < count:
+        x = rng.randrange(grid.width)
+        y = rng.randrange(grid.height)
+        if grid.is_free(x, y) and [x, y] != goal:
+            cells.add((x, y))
+    robots = [ROBOT_CLASSES[i % len(ROBOT_CLASSES)](f"R{i}", x, y) for i, (x, y) in enumerate(sorted(cells))]
+    return Simulation(goals=[goal], robots=robots, grid=grid)
+
+
+def time_steps(sim, steps):
+    """ms per step of `steps` auto-mode steps, and the robots moved in total"""
+    sim.auto_mode = True
+    moved = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        moved += sim.step()
+    return (time.perf_counter() - start) / steps * 1000, moved
+
+
+def run(robot_counts, map_size, steps, seed):
+    day2_engine.VERBOSE = False
+    grid, goals = warehouse(map_size, seed=seed, goal_count=1)
+    goal = goals[0]
+    print(f"warehouse {map_size}x{map_size}, goal {tuple(goal)}, {steps} steps")
+    print(f"{'robots':>8} {'pairwise ms/step':>17} {'hash ms/step':>13} {'speedup':>8} {'moves':>7} {'same state':>11}")
+    for count in robot_counts:
+        hashed = make_simulation(grid, goal, count, seed)
+        # build the fields once so neither side pays for the search
+        for speed in (1, 2):
+            hashed.planner.field(goal[0], goal[1], speed)
+        hash_ms, moved = time_steps(hashed, steps)
+
+        if count > PAIRWISE_LIMIT:
+            print(f"{count:>8} {'-':>17} {hash_ms:>13.2f} {'-':>8} {moved:>7} {'-':>11}")
+            continue
+        pairwise = make_simulation(grid, goal, count, seed)
+        pairwise.planner = hashed.planner
+        pairwise.traffic = PairwiseOccupancy(pairwise.grid)
+        pairwise.fit_robots()
+        pairwise_ms, _ = time_steps(pairwise, steps)
+
+        same = pairwise.state()["robots"] == hashed.state()["robots"]
+        print(f"{count:>8} {pairwise_ms:>17.2f} {hash_ms:>13.2f} {pairwise_ms / hash_ms:>7.1f}x "
+              f"{moved:>7} {str(same):>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time robot-robot collision checks in auto mode")
+    parser.add_argument("--robots", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--map-size", type=int, default=300)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run(args.robots, args.map_size, args.steps, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+BENCHMARK: drawing the map, every obstacle vs only the cells in view
+
+For warehouse maps of growing size, scrolls an 800x800 view across the map
+and times repainting the map each frame: once the old way (a rect per
+obstacle in the obstacle list, the whole map) and once through the Camera
+(the visible slice of the grid, scaled up in one blit). The culled time
+should stay flat as the map grows; the full one grows with the map area.
+
+HOW TO RUN:
+    python bench_viewport.py
+    python bench_viewport.py --sizes 100 1000 4000 --cell 4
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from camera import Camera, draw_cells
+from maps import warehouse
+
+VIEW = 800
+FULL_LIMIT = 500  # above this the full redraw takes too long to bother timing
+
+
+def run(sizes, cell_size, frames):
+    pygame.init()
+    screen = pygame.display.set_mode((VIEW, VIEW))
+    print(f"{'map':>11} {'obstacles':>10} {'full ms':>8} {'culled ms':>10} {'cells in view':>14}")
+    for size in sizes:
+        grid, _ = warehouse(size)
+        camera = Camera(size, size, VIEW, VIEW, cell_size)
+        camera.center_on(size // 2, size // 2)
+
+        full_ms = None
+        if size <= FULL_LIMIT:
+            cells = grid.array()
+            obstacles = [[x, y] for y, x in zip(*cells.nonzero())]
+            start = time.perf_counter()
+            for _ in range(frames):
+                camera.pan(cell_size, 0)
+                screen.fill((255, 255, 255))
+                for x, y in obstacles:
+                    pygame.draw.rect(screen, (0, 0, 0), (*camera.to_screen(x, y), cell_size, cell_size))
+            full_ms = (time.perf_counter() - start) / frames * 1000
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            camera.pan(cell_size, 0)
+            screen.fill((255, 255, 255))
+            looked_at = draw_cells(screen, grid, camera, (0, 0, 0))
+        culled_ms = (time.perf_counter() - start) / frames * 1000
+
+        full = f"{full_ms:8.2f}" if full_ms is not None else f"{'-':>8}"
+        print(f"{size:>5}x{size:<5} {grid.count():>10} {full} {culled_ms:>10.2f} {looked_at:>14}")
+    pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time map drawing with and without viewport culling")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000, 4000])
+    parser.add_argument("--cell", type=int, default=8, help="pixels per cell")
+    parser.add_argument("--frames", type=int, default=30)
+    args = parser.parse_args()
+    run(args.sizes, args.cell, args.frames)
+
+
+if __name__ == "__main__":
+    main()
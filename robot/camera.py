@@ -0,0 +1,129 @@
+"""
+CAMERA: show part of a map that is bigger than the window
+
+The camera knows how many pixels a cell is drawn with (the zoom) and which
+map pixel is at the top-left corner of the window (the scroll). Everything
+that draws the map asks it which cells are visible and where a cell lands
+on screen, and only draws those, so a frame costs the same on a 2000x2000
+map as on a 100x100 one.
+
+version is bumped whenever the view moves or zooms, so a StaticLayer built
+from the visible part of the map knows when to repaint.
+
+draw_cells() paints the blocked cells of an OccupancyGrid in view in one
+go: the visible slice of the grid's NumPy array becomes a one pixel per
+cell surface that pygame scales up to the cell size.
+"""
+
+import pygame
+
+
+class Camera():
+    """a window of view_width x view_height pixels onto a map of map_width x map_height cells"""
+
+    def __init__(self, map_width, map_height, view_width, view_height, cell_size, min_cell=1, max_cell=128):
+        self.map_width = map_width
+        self.map_height = map_height
+        self.view_width = view_width
+        self.view_height = view_height
+        self.min_cell = min_cell
+        self.max_cell = max_cell
+        self.cell_size = max(min_cell, min(max_cell, cell_size))
+        # map pixel at the top-left corner of the window
+        self.x = 0
+        self.y = 0
+        self.version = 0
+
+    def _moved(self, x, y):
+        """scroll to (x, y), kept inside the map; bumps version if anything changed"""
+        max_x = max(0, self.map_width * self.cell_size - self.view_width)
+        max_y = max(0, self.map_height * self.cell_size - self.view_height)
+        x = max(0, min(max_x, int(x)))
+        y = max(0, min(max_y, int(y)))
+        if (x, y) != (self.x, self.y):
+            self.x = x
+            self.y = y
+            self.version += 1
+
+    def pan(self, dx, dy):
+        """scroll by (dx, dy) pixels"""
+        self._moved(self.x + dx, self.y + dy)
+
+    def zoom(self, factor, anchor=None):
+        """change the cell size by `factor`, keeping the map point under `anchor`
+        (a window pixel, the middle of the window by default) where it is"""
+        cell_size = max(self.min_cell, min(self.max_cell, int(round(self.cell_size * factor))))
+        if cell_size == self.cell_size and factor != 1:
+            # small cells don't change size by rounding a fraction, step by one instead
+            cell_size = max(self.min_cell, min(self.max_cell, self.cell_size + (1 if factor > 1 else -1)))
+        if cell_size == self.cell_size:
+            return
+        if anchor is None:
+            anchor = (self.view_width // 2, self.view_height // 2)
+        # the map position under the anchor, in cells
+        map_x = (self.x + anchor[0]) / self.cell_size
+        map_y = (self.y + anchor[1]) / self.cell_size
+        self.cell_size = cell_size
+        self.version += 1
+        self._moved(map_x * cell_size - anchor[0], map_y * cell_size - anchor[1])
+
+    def center_on(self, cell_x, cell_y):
+        """scroll so the cell is in the middle of the window"""
+        self._moved((cell_x + 0.5) * self.cell_size - self.view_width // 2,
+                    (cell_y + 0.5) * self.cell_size - self.view_height // 2)
+
+    def follow(self, cell_x, cell_y, margin=0.2):
+        """scroll just enough to keep the cell `margin` (a fraction of the window) away from the edges"""
+        left = cell_x * self.cell_size
+        top = cell_y * self.cell_size
+        margin_x = int(self.view_width * margin)
+        margin_y = int(self.view_height * margin)
+        x = min(self.x, left - margin_x)
+        x = max(x, left + self.cell_size + margin_x - self.view_width)
+        y = min(self.y, top - margin_y)
+        y = max(y, top + self.cell_size + margin_y - self.view_height)
+        self._moved(x, y)
+
+    def visible_cells(self):
+        """(first_x, first_y, end_x, end_y): the cells at least partly in the window,
+        first_x <= x < end_x and first_y <= y < end_y"""
+        size = self.cell_size
+        first_x = self.x // size
+        first_y = self.y // size
+        end_x = min(self.map_width, -(-(self.x + self.view_width) // size))
+        end_y = min(self.map_height, -(-(self.y + self.view_height) // size))
+        return first_x, first_y, end_x, end_y
+
+    def is_visible(self, cell_x, cell_y):
+        first_x, first_y, end_x, end_y = self.visible_cells()
+        return first_x <= cell_x < end_x and first_y <= cell_y < end_y
+
+    def to_screen(self, cell_x, cell_y):
+        """window pixel of the top-left corner of a cell"""
+        return cell_x * self.cell_size - self.x, cell_y * self.cell_size - self.y
+
+    def cell_center(self, cell_x, cell_y):
+        """window pixel of the middle of a cell"""
+        return (cell_x * self.cell_size + self.cell_size // 2 - self.x,
+                cell_y * self.cell_size + self.cell_size // 2 - self.y)
+
+    def cell_at(self, pixel_x, pixel_y):
+        """the cell under a window pixel"""
+        return (self.x + pixel_x) // self.cell_size, (self.y + pixel_y) // self.cell_size
+
+
+def draw_cells(surface, grid, camera, color):
+    """paint every blocked cell of the grid that is in view with `color`; free cells are left alone
+    returns the number of cells looked at"""
+    first_x, first_y, end_x, end_y = camera.visible_cells()
+    if end_x <= first_x or end_y <= first_y:
+        return 0
+    view = grid.array()[first_y:end_y, first_x:end_x]
+    # surfarray wants [x, y]; one 8-bit pixel per cell, 1 where blocked
+    cells = pygame.surfarray.make_surface((view != 0).view("uint8").T)
+    cells.set_palette_at(1, color)
+    cells.set_colorkey(0)
+    size = camera.cell_size
+    scaled = pygame.transform.scale(cells, ((end_x - first_x) * size, (end_y - first_y) * size))
+    surface.blit(scaled, camera.to_screen(first_x, first_y))
+    return view.size
@@ -0,0 +1,213 @@
+"""
+DAY 1 ENGINE: the first robot game without a window
+
+The rules of day1_robot.py (one robot, a battery, three goals) with no
+pygame at all, so the game can be stepped headless, e.g. to replay a
+recorded session (see replay.py). day1_robot.py reads the keys and draws;
+this file decides what they do.
+
+Every frame the game gets the key presses of that frame (handle_key) and
+then one step(). The A key turns on the autopilot: it plans the shortest
+tour over the goals left (see tour_planner.py), says whether the battery
+will last, and then walks it, one move every AUTO_MOVE_FRAMES frames.
+Sounds are not played here: the names of what happened ("blocked",
+"goal", "won") are collected in `events` for the window to turn into beeps.
+"""
+
+from day2_engine import DEFAULT_GOALS, DEFAULT_OBSTACLES
+from occupancy import OccupancyGrid
+from pathfinding import DistanceFieldCache
+from tour_planner import TourPlanner, describe
+
+# GAME SETTINGS
+
+GRID_SIZE = 10  # 10x10 grid
+MAX_BATTERY = 100
+BATTERY_DRAIN_PER_MOVE = 1
+# a move drains the battery twice, as it always has in day 1
+BATTERY_PER_MOVE = 2 * BATTERY_DRAIN_PER_MOVE
+TOTAL_GOALS = 3  # on the default map; a map file brings its own number of goals
+
+# Movement speed (cells per key press)
+MOVE_SPEED = 1
+
+# the autopilot makes one move every this many frames (5 moves a second at the 30 FPS of day1_robot.py)
+AUTO_MOVE_FRAMES = 6
+
+# the keys handle_key understands (new keys go at the end: recordings store the index)
+KEYS = ("up", "down", "left", "right", "r", "a")
+
+# key name -> (dx, dy)
+MOVES = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
+
+
+class Simulation():
+    """the day 1 game state: where the robot is, its battery and the goals left"""
+
+    def __init__(self, goals=None, obstacles=None, grid=None):
+        """a map loaded from a file comes as an OccupancyGrid (see maps.py); its
+        obstacles then only live in the grid and self.obstacles is None"""
+        self.start_goals = [list(goal) for goal in (DEFAULT_GOALS if goals is None else goals)]
+        self.total_goals = len(self.start_goals)
+        if grid is None:
+            self.obstacles = [list(obstacle) for obstacle in (DEFAULT_OBSTACLES if obstacles is None else obstacles)]
+            # Same obstacles as a grid of cells, so checking a cell doesn't scan the list.
+            # Day 1 obstacles never move, so the two can't drift apart.
+            self.grid = OccupancyGrid.from_obstacles(self.obstacles, GRID_SIZE, GRID_SIZE)
+        else:
+            self.obstacles = None
+            self.grid = grid
+        # shortest-path fields and the goal tour for the autopilot
+        self.planner = DistanceFieldCache(self.grid)
+        self.tours = TourPlanner(self.planner)
+        self.events = []
+        # bumped whenever the goals change, so the window knows to redraw the map
+        self.map_version = 0
+        self.steps = 0
+        self.reset()
+
+    def reset(self):
+        """reset all variables to starting state"""
+        self.robot_x = 0
+        self.robot_y = 0
+        self.battery = MAX_BATTERY
+        self.moves_count = 0
+        self.goals_collected = 0
+        self.game_won = False
+        self.goals = [list(goal) for goal in self.start_goals]
+        self.auto_mode = False
+        self.route = []  # goals in the order the autopilot visits them
+        self.map_version += 1
+
+    def is_obstacle(self, x, y):
+        """Check if position (x, y) has an obstacle"""
+        return self.grid.is_blocked(x, y)
+
+    def is_valid_position(self, x, y):
+        """Check if position is within grid and not an obstacle"""
+        if not self.grid.in_bounds(x, y):
+            return False  # Outside grid
+        if self.is_obstacle(x, y):
+            return False  # Hit an obstacle
+        return True
+
+    def plan(self):
+        """the shortest tour over the goals left, from where the robot stands"""
+        return self.tours.plan((self.robot_x, self.robot_y), self.goals)
+
+    def handle_key(self, key):
+        """apply one key press ("up", "down", "left", "right", "r" or "a")
+        returns a message for the console, or None"""
+        if key == "r":
+            self.reset()
+            return "\n" + "=" * 50 + "\nGAME RESET!\n" + "=" * 50
+
+        # A - autopilot on/off
+        if key == "a":
+            if self.game_won:
+                return None
+            self.auto_mode = not self.auto_mode
+            if not self.auto_mode:
+                return "Autopilot: OFF"
+            tour = self.plan()
+            self.route = [list(goal) for goal in tour["order"]]
+            return "Autopilot: ON\n" + describe(tour, self.battery, BATTERY_PER_MOVE)
+
+        return self.move(key)
+
+    def move(self, key):
+        """move the robot one step in the direction of key, if it can
+        returns a message for the console, or None"""
+        # Only allow movement if game not won
+        if key not in MOVES or self.game_won or self.battery <= 0:
+            return None
+
+        dx, dy = MOVES[key]
+        new_x = self.robot_x + dx * MOVE_SPEED
+        new_y = self.robot_y + dy * MOVE_SPEED
+        message = f"Trying to move {key.upper()} to ({new_x}, {new_y})"
+
+        # Check if new position is valid
+        if not self.is_valid_position(new_x, new_y):
+            self.events.append("blocked")
+            return message + "\n✗ Cannot move there! (obstacle or out of bounds)"
+
+        self.robot_x = new_x
+        self.robot_y = new_y
+        self.moves_count += 1
+        self.battery -= BATTERY_PER_MOVE
+        if self.battery < 0:
+            self.battery = 0
+        return message + f"\n✓ Moved successfully! Now at ({self.robot_x}, {self.robot_y})\n Battery: {self.battery}%"
+
+    def step(self):
+        """advance the game by one frame: collect a goal the robot stands on and check for a win
+        returns a message for the console, or None"""
+        self.steps += 1
+        message = None
+
+        # the autopilot walks to the next goal of its route
+        if self.auto_mode and self.steps % AUTO_MOVE_FRAMES == 0:
+            message = self.auto_move()
+
+        # Check if robot reached any goal
+        for goal in self.goals[:]:
+            if self.robot_x == goal[0] and self.robot_y == goal[1]:
+                self.goals.remove(goal)
+                self.goals_collected += 1
+                self.events.append("goal")
+                self.map_version += 1  # repaint the map without this goal
+                message = f" Goal collected!({self.goals_collected}/{self.total_goals})"
+                if goal in self.route:
+                    self.route.remove(goal)
+
+        if self.goals_collected >= self.total_goals and not self.game_won:
+            self.game_won = True
+            self.auto_mode = False
+            self.events.append("won")
+            message = "\n".join([
+                "\n YOU WON",
+                f"Moves: {self.moves_count}",
+                f"Battery remaining: {self.battery}%",
+                f"efficiency score: {self.efficiency()}",
+            ])
+        return message
+
+    def auto_move(self):
+        """one autopilot move down the shortest path to the next goal of the route"""
+        if not self.route or self.battery <= 0:
+            self.auto_mode = False
+            return "Autopilot: OFF (" + ("battery empty)" if self.route else "route done)")
+        goal_x, goal_y = self.route[0]
+        direction = self.planner.best_direction(self.robot_x, self.robot_y, MOVE_SPEED, goal_x, goal_y)
+        if direction is None:
+            self.auto_mode = False
+            return f"Autopilot: OFF (no path to ({goal_x}, {goal_y}))"
+        return self.move(direction)
+
+    def efficiency(self):
+        return int((self.battery / self.moves_count) * 100) if self.moves_count > 0 else 0
+
+    def pop_events(self):
+        """what happened since the last call ("blocked", "goal", "won"), oldest first"""
+        events = self.events
+        self.events = []
+        return events
+
+    def state(self):
+        """everything a replay has to reproduce, as plain values"""
+        return {
+            "robot": [self.robot_x, self.robot_y],
+            "battery": self.battery,
+            "moves": self.moves_count,
+            "goals_collected": self.goals_collected,
+            "game_won": self.game_won,
+            "auto_mode": self.auto_mode,
+            "goals": [list(goal) for goal in self.goals],
+            "steps": self.steps,
+        }
@@ -11,14 +11,36 @@ HOW TO RUN:
 
 CONTROLS:
 - Arrow keys: Move the robot
+- R: Restart
+- A: Autopilot (plans the shortest tour over the goals and drives it)
 - ESC or close window: Exit
 
+To record a game and play it back later: python day1_robot.py --record game.rlog
+then python replay.py game.rlog
+
+To play on another map: python day1_robot.py --map level.rmap (make one with maps.py)
+
 YOUR GOAL: Move the blue robot to the green goal!
 """
 
+import argparse
 import pygame
 import sys
 
+from camera import Camera, draw_cells
+from day1_engine import MAX_BATTERY, Simulation
+from frame_profiler import FrameProfiler, Overlay
+from render_layers import StaticLayer, DirtyRects
+from replay import InputRecorder
+from text_cache import TextCache
+from tones import ToneBank, GOAL_TONE, ERROR_TONE, VICTORY_TONE
+
+# --record FILE saves the keys you press so the game can be replayed (see replay.py)
+parser = argparse.ArgumentParser(description="Day 1: Robot Simulator")
+parser.add_argument("--record", metavar="FILE", help="record the game keys to this file")
+parser.add_argument("--map", metavar="FILE", help="play on a map file (see maps.py)")
+args = parser.parse_args()
+
 # Initialize Pygame (this must happen first)
 pygame.init()
 pygame.mixer.init()
@@ -30,8 +52,6 @@ pygame.mixer.init()
 # Window settings
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 600
-GRID_SIZE = 10  # 10x10 grid
-CELL_SIZE = WINDOW_WIDTH // GRID_SIZE  # Size of each grid cell
 
 # Colors (RGB format - Red, Green, Blue from 0-255)
 WHITE = (255, 255, 255)      # Background
@@ -42,69 +62,38 @@ RED = (255, 0, 0)            # Obstacles
 GRAY = (200, 200, 200)       # Grid
 ORANGE = (255, 165, 0)
 
-#GAME SETTINGS
-MAX_BATTERY = 100
-BATTERY_DRAIN_PER_MOVE = 1
-TOTAL_GOALS = 3
-moves_count = 0
-# Robot starting position (grid coordinates)
-robot_x = 0
-robot_y = 0
-
-# Goal position
-goals = [
-    [9, 9],
-    [2, 8],
-    [8, 2],
-]
-
-# Obstacles (list of [x, y] positions)
-obstacles = [
-    [0, 3],
-    [0, 6],
-    [0, 7],
-    [1, 2],
-    [1, 4],
-    [1, 5],
-    [1, 8],
-    [2, 0],
-    [2, 4],
-    [2, 9],
-    [3, 0],
-    [3, 1],
-    [3, 3],
-    [4, 5],
-    [4, 7],
-    [4, 0],
-    [4, 6],
-    [5, 0],
-    [5, 2],
-    [5, 4],
-    [5, 7],
-    [5, 9],
-    [6, 2],
-    [6, 3],
-    [7, 1],
-    [7, 2],
-    [7, 4],
-    [7, 6],
-    [7, 7],
-    [7, 9],
-    [8, 4],
-    [8, 8],
-    [9, 1],
-    [9, 3],
-    [9, 6],
-]
-
-# Movement speed (cells per key press)
-move_speed = 1
-battery= MAX_BATTERY
-moves_count = 0
-goals_collected = 0
-game_won = False
-TOTALGOALS = 3
-goals_collected = 0
+# The game itself (robot position, battery, goals and obstacles) lives in
+# day1_engine.py; this file draws it and turns key presses into moves.
+# The goals and obstacles are the same map as day 2, unless --map gives a map file.
+if args.map:
+    from maps import load_map
+    grid, goals = load_map(args.map)
+    if grid.width > WINDOW_WIDTH or grid.height > WINDOW_HEIGHT:
+        parser.error(f"day 1 shows the whole map, {args.map} is too big for the window (try day2_robot.py)")
+    sim = Simulation(goals=goals, grid=grid)
+else:
+    sim = Simulation()
+
+CELL_SIZE = WINDOW_WIDTH // max(sim.grid.width, sim.grid.height)  # Size of each grid cell
+# the whole map is in view; draw_cells uses it to paint maps that have no obstacle list
+camera = Camera(sim.grid.width, sim.grid.height, WINDOW_WIDTH, WINDOW_HEIGHT, CELL_SIZE)
+
+# pygame keys the game understands, by the name the engine uses
+KEY_NAMES = {
+    pygame.K_UP: "up",
+    pygame.K_DOWN: "down",
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_r: "r",
+    pygame.K_a: "a",
+}
+
+# what the engine reports -> the beep to play
+SOUNDS = {
+    "blocked": ERROR_TONE,   # low pitch sound for errors
+    "goal": GOAL_TONE,       # high pitch goal sound
+    "won": VICTORY_TONE,     # victory sound
+}
 
 # ============================================
 # SETUP THE GAME WINDOW
@@ -122,79 +111,79 @@ FPS = 30  # Frames per second
 font = pygame.font.Font(None, 36)
 small_font = pygame.font.Font(None, 24)
 
+# Goal, error and victory beeps are made once here, not while playing
+tones = ToneBank()
+
+# Rendered text is reused between frames instead of rendered 30 times a second
+text_cache = TextCache()
+
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
-def draw_grid():
-    """Draw the grid lines on the screen"""
+def draw_grid(surface):
+    """Draw the grid lines on the surface"""
+    if CELL_SIZE < 4:
+        return  # the lines would hide the map
     for x in range(0, WINDOW_WIDTH, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (x, 0), (x, WINDOW_HEIGHT), 1)
+        pygame.draw.line(surface, GRAY, (x, 0), (x, WINDOW_HEIGHT), 1)
     for y in range(0, WINDOW_HEIGHT, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (0, y), (WINDOW_WIDTH, y), 1)
+        pygame.draw.line(surface, GRAY, (0, y), (WINDOW_WIDTH, y), 1)
 
 def draw_robot(x, y):
     """Draw the robot as a blue circle"""
     pixel_x = x * CELL_SIZE + CELL_SIZE // 2
     pixel_y = y * CELL_SIZE + CELL_SIZE // 2
-    pygame.draw.circle(screen, BLUE, (pixel_x, pixel_y), CELL_SIZE // 3)
+    pygame.draw.circle(screen, BLUE, (pixel_x, pixel_y), max(2, CELL_SIZE // 3))
 
-def draw_goals():
-    """Draw the goal as a green square"""
-    pixel_x = goal[0] * CELL_SIZE
-    pixel_y = goal[1] * CELL_SIZE
-    pygame.draw.rect(screen, GREEN, (pixel_x, pixel_y, CELL_SIZE, CELL_SIZE))
+def robot_rect(x, y):
+    """The area draw_robot paints"""
+    radius = max(2, CELL_SIZE // 3)
+    pixel_x = x * CELL_SIZE + CELL_SIZE // 2
+    pixel_y = y * CELL_SIZE + CELL_SIZE // 2
+    return pygame.Rect(pixel_x - radius, pixel_y - radius, 2 * radius + 1, 2 * radius + 1)
+
+def draw_goals(surface):
+    """Draw every goal left as a green square"""
+    for goal in sim.goals:
+        pixel_x = goal[0] * CELL_SIZE
+        pixel_y = goal[1] * CELL_SIZE
+        pygame.draw.rect(surface, GREEN, (pixel_x, pixel_y, CELL_SIZE, CELL_SIZE))
 
-def draw_obstacles():
+def draw_obstacles(surface):
     """Draw all obstacles as red squares"""
-    for obstacle in obstacles:
+    if sim.obstacles is None:
+        draw_cells(surface, sim.grid, camera, RED)
+        return
+    for obstacle in sim.obstacles:
         pixel_x = obstacle[0] * CELL_SIZE
         pixel_y = obstacle[1] * CELL_SIZE
-        pygame.draw.rect(screen, RED, (pixel_x, pixel_y, CELL_SIZE, CELL_SIZE))
-
-def is_obstacle(x, y):
-    """Check if position (x, y) has an obstacle"""
-    for obstacle in obstacles:
-        if obstacle[0] == x and obstacle[1] == y:
-            return True
-    return False
-
-def is_valid_position(x, y):
-    """Check if position is within grid and not an obstacle"""
-    if x < 0 or x >= GRID_SIZE or y < 0 or y >= GRID_SIZE:
-        return False  # Outside grid
-    if is_obstacle(x, y):
-        return False  # Hit an obstacle
-    return True
+        pygame.draw.rect(surface, RED, (pixel_x, pixel_y, CELL_SIZE, CELL_SIZE))
+
+def draw_map(surface):
+    """Paint everything that only changes when a goal is collected"""
+    surface.fill(WHITE)
+    draw_grid(surface)
+    draw_goals(surface)      # Draw goals first (background)
+    draw_obstacles(surface)  # Then obstacles
+    # Draw instructions
+    instructions = "Arrow Keys to Move |R: Restart |A: Autopilot | ESC to Exit"
+    surface.blit(text_cache.render(small_font, instructions, BLACK), (10, WINDOW_HEIGHT - 30))
 
 def display_text(text, x, y, font_obj, color=BLACK):
     """Display text on screen at position (x, y)"""
-    text_surface = font_obj.render(text, True, color)
+    text_surface = text_cache.render(font_obj, text, color)
     screen.blit(text_surface, (x, y))
-def play_beep(frequency, duration):
-    """paly simple beep sound"""
-    sample_rate = 22050
-    n_smaples = int(round(duration* sample_rate))
-    # craete  asimple sine wave 
-    buf = []
-    for i in range (n_smaples):
-        value = int(127* (1+(i%int(sample_rate / frequency ))/(sample_rate /frequency)))
-        buf.append(value)
-
-        sound = pygame.sndarray.make_sound(bytearray(buf))
-        sound.play()
-        #when collecting goal
-        if robot_x == goal[0] and robot_y ==[1]:
-            play_beep(800,0.1) #high pitch goal sound
-            #when hitting an obstacle 
-        else:
-            print(f"cannot move there!")
-            play_beep(200, 0.1) # low pitch sound for errors
 
-            #when winning 
-            if goals_collected >= TOTALGOALS:
-                game_won = True
-                play_beep(1000, 0.3) #victory sound
+def show_text(key, text, x, y, font_obj, color=BLACK):
+    """Add text to this frame; it is only repainted when it changes"""
+    text_surface = text_cache.render(font_obj, text, color)
+    sprites.add(key, text_surface.get_rect(topleft=(x, y)), (text, color),
+                lambda: screen.blit(text_surface, (x, y)))
+
+def play_beep(frequency, duration):
+    """Play a simple beep sound (made once, then reused; never waits for it to finish)"""
+    tones.play(frequency, duration)
 
 
 def draw_battery_bar():
@@ -206,10 +195,10 @@ def draw_battery_bar():
     #background (empty)
     pygame.draw.rect(screen, GRAY, (bar_x, bar_y, bar_width, bar_height))
     #filled portion(current battery)
-    fill_width = int((battery/MAX_BATTERY)*bar_width)
-    if battery > 50:
+    fill_width = int((sim.battery/MAX_BATTERY)*bar_width)
+    if sim.battery > 50:
         fill_color = GREEN
-    elif battery > 20:
+    elif sim.battery > 20:
         fill_color = ORANGE
     else:
         fill_color= RED
@@ -217,44 +206,39 @@ def draw_battery_bar():
     pygame.draw.rect(screen, fill_color,  ( bar_x, bar_y, fill_width, bar_height))
         #border 
     pygame.draw.rect(screen, BLACK, (bar_x, bar_y, fill_width, bar_height), 2)
-def reset_game():
-    """ reset all variables to stating state """
-    global robot_x, robot_y, battery, moves_count, goals_collected, game_won, goals
-    robot_x = 0
-    robot_y = 0
-    battery = MAX_BATTERY
-    moves_count = 0 
-    goals_collected = 0
-    game_won = 0 
-    goals = 0 
-    #rest goal list
-    goals = [
-    [9, 9],
-    [2, 8],
-    [8, 2],
-]
-    print ("\n" + "="*50)
-    print("GAME RESET!")
-    print("="*50)
 
 
+# The map is painted once into this layer; the robot and the text on top
+# are only repainted where they change
+map_layer = StaticLayer((WINDOW_WIDTH, WINDOW_HEIGHT), draw_map)
+sprites = DirtyRects(screen)
+
+# F3 shows where the frame time goes (and starts recording it), F4 saves it to a CSV file
+profiler = FrameProfiler()
+overlay = Overlay(profiler, pygame.font.Font(None, 18), (WINDOW_WIDTH - 330, 130))
+PROFILE_CSV = "day1_frames.csv"
+
+recorder = InputRecorder(args.record, "day1", KEY_NAMES.values(), args.map)
 
 # ============================================
 # MAIN GAME LOOP
 # ============================================
 game_running = True
-game_won = False
 
 print("=" * 50)
 print("ROBOT SIMULATOR STARTED!")
 print("=" * 50)
-print("Use ARROW KEYS to move the robot")
-print(f"Starting position: ({robot_x}, {robot_y})")
-print(f"Goal position: ({goals})")
-print(f"Obstacles: {len(obstacles)}")
+print("Use ARROW KEYS to move the robot, A for the autopilot")
+print("F3: frame time overlay, F4: save frame times to CSV")
+print(f"Starting position: ({sim.robot_x}, {sim.robot_y})")
+print(f"Goal position: ({sim.goals})")
+print(f"Obstacles: {sim.grid.count()}")
 print("=" * 50)
 
 while game_running:
+    profiler.start_frame()
+    recorder.start_frame()
+
     # ========================================
     # 1. HANDLE EVENTS (keyboard, mouse, etc)
     # ========================================
@@ -263,73 +247,46 @@ while game_running:
         # Check if user closed the window
         if event.type == pygame.QUIT:
             game_running = False
+
+        # The window was uncovered, paint all of it again
+        if event.type == pygame.VIDEOEXPOSE:
+            sprites.redraw_all()
         
         # Check for key presses
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 game_running = False
-            if event.key == pygame.K_r:
-                    reset_game()
-            
-            # Only allow movement if game not won
-            if not game_won and battery > 0:
-                # Arrow key movement
-                new_x = robot_x
-                new_y = robot_y
-                
-                if event.key == pygame.K_UP:
-                    new_y = robot_y - move_speed
-                    print(f"Trying to move UP to ({new_x}, {new_y})")
-                
-                elif event.key == pygame.K_DOWN:
-                    new_y = robot_y + move_speed
-                    print(f"Trying to move DOWN to ({new_x}, {new_y})")
-                
-                elif event.key == pygame.K_LEFT:
-                    new_x = robot_x - move_speed
-                    print(f"Trying to move LEFT to ({new_x}, {new_y})")
-                
-                elif event.key == pygame.K_RIGHT:
-                    new_x = robot_x + move_speed
-                    print(f"Trying to move RIGHT to ({new_x}, {new_y})")
-                
-                # Check if new position is valid
-                if is_valid_position(new_x, new_y):
-                    robot_x = new_x
-                    robot_y = new_y
-                    moves_count += 1 
-                    battery -= BATTERY_DRAIN_PER_MOVE
-                    print(f"✓ Moved successfully! Now at ({robot_x}, {robot_y})")
-                    battery -= BATTERY_DRAIN_PER_MOVE
-                    if battery <0:
-                         battery = 0
-                   
-                    print(f" Battery: {battery}%")
-                else:
-                    print(f"✗ Cannot move there! (obstacle or out of bounds)")
+            if event.key == pygame.K_F3:
+                if profiler.toggle():
+                    profiler.clear()
+            if event.key == pygame.K_F4 and profiler.frames:
+                print(f"Saved {profiler.dump_csv(PROFILE_CSV)} frames to {PROFILE_CSV}")
+
+            # Arrow keys move the robot (while the game isn't won and there is battery left), R restarts
+            if event.key in KEY_NAMES:
+                recorder.key(KEY_NAMES[event.key])
+                message = sim.handle_key(KEY_NAMES[event.key])
+                if message:
+                    print(message)
+
+    profiler.mark("events")
     
     # ========================================
     # 2. UPDATE GAME STATE
     # ========================================
     
-    # Check if robot reached any goal
-    for goal in goals[:]:
-     if robot_x == goal[0] and robot_y == goal[1]:
-         goals.remove(goal) 
-         goals_collected += 1
-     print(f" Goal collected!({goals_collected}/{TOTALGOALS})")
-    if goals_collected >= TOTALGOALS:
-        game_won= True
-        efficiency = int((battery / moves_count) * 100) if moves_count > 0 else 0 
-        print(f"\n YOU WON")
-        print(f"Moves: {moves_count}")
-        print(f"Battery remaining: {battery}%")
-        print(F"efficiency score: {efficiency}")
-        battery_text = f"Battery: {battery}%"
+    # Check if robot reached any goal, and if that was the last one
+    message = sim.step()
+    if message:
+        print(message)
+    for event_name in sim.pop_events():
+        play_beep(*SOUNDS[event_name])
+    if sim.game_won:
+        battery_text = f"Battery: {sim.battery}%"
         #clour changes based on battery level
-        if battery > 50:
+        if sim.battery > 50:
             battery_color = GREEN
-        elif battery > 20 :
+        elif sim.battery > 20 :
             battery_color = (255, 165, 0)  # orange
         else:
             battery_color = RED
@@ -339,58 +296,69 @@ while game_running:
         print("🎉 CONGRATULATIONS! ALL GOALS COLLECTED! YOU WON! 🎉")
         print("=" * 50)
         break
-    if battery < 0 and not game_won:
+    if sim.battery < 0 and not sim.game_won:
         print("\n BATTERY DEPLETED! GMAE OVER!")
         display_text ("OUT OF POWER !", WINDOW_WIDTH // 2 - 100 , WINDOW_HEIGHT // 2, font, RED)
 
+    profiler.mark("update")
     
     # ========================================
     # 3. DRAW EVERYTHING
     # ========================================
     
-    # Clear screen with white background
-    screen.fill(WHITE)
-    
-    # Draw grid
-    draw_grid()
+    # The map (grid, goals, obstacles) is only repainted after a goal is collected or a reset
+    background, rebuilt = map_layer.get(sim.map_version)
+    if rebuilt:
+        sprites.redraw_all()
 
     #draw battery bar
-    draw_battery_bar()
+    sprites.add("battery", (10, 100, 200, 20), sim.battery, draw_battery_bar)
     
     # Draw game elements
-    draw_goals() # Draw goal first (background)
-    draw_obstacles()           # Then obstacles
-    draw_robot(robot_x, robot_y)  # Robot on top
+    sprites.add("robot", robot_rect(sim.robot_x, sim.robot_y), (sim.robot_x, sim.robot_y),
+                lambda: draw_robot(sim.robot_x, sim.robot_y))  # Robot on top
 
-    moves_text = f"Moves: {moves_count}"
-    display_text(moves_text, WINDOW_WIDTH - 150, 10, small_font)
+    moves_text = f"Moves: {sim.moves_count}"
+    show_text("moves", moves_text, WINDOW_WIDTH - 150, 10, small_font)
 
     # Draw position text
-    goal_text = f"Goals: ({goals_collected}/{TOTAL_GOALS})"
-    display_text(goal_text, 10, 40, small_font)
-    
-    # Draw instructions
-    instructions = "Arrow Keys to Move |R: Restart | ESC to Exit"
-    display_text(instructions, 10, WINDOW_HEIGHT - 30, small_font)
+    goal_text = f"Goals: ({sim.goals_collected}/{sim.total_goals})"
+    show_text("goals", goal_text, 10, 40, small_font)
+    if sim.auto_mode:
+        show_text("auto", "AUTOPILOT", WINDOW_WIDTH - 150, 40, small_font, GREEN)
     
     # If game won, show victory message
-    if game_won:
-        display_text("YOU WON!", WINDOW_WIDTH // 2 - 80, WINDOW_HEIGHT // 2, font, GREEN)
-        efficiency = int(battery / moves_count)* 100 if moves_count> 0 else 0
-        efficiency_text = f"Efficiency: {efficiency}| Mves: {moves_count}"
-        display_text(efficiency_text, WINDOW_WIDTH // 2 - 150 , WINDOW_HEIGHT // 2+ 10, small_font, BLACK)
+    if sim.game_won:
+        show_text("won", "YOU WON!", WINDOW_WIDTH // 2 - 80, WINDOW_HEIGHT // 2, font, GREEN)
+        efficiency = int(sim.battery / sim.moves_count)* 100 if sim.moves_count> 0 else 0
+        efficiency_text = f"Efficiency: {efficiency}| Mves: {sim.moves_count}"
+        show_text("efficiency", efficiency_text, WINDOW_WIDTH // 2 - 150 , WINDOW_HEIGHT // 2+ 10, small_font, BLACK)
+
+    # Frame time overlay (F3)
+    if profiler.enabled:
+        overlay.update()
+        sprites.add("profiler", overlay.rect(), overlay.lines, lambda: overlay.draw(screen))
+
+    dirty = sprites.flush(background)
+    profiler.mark("draw")
     
     # ========================================
     # 4. UPDATE DISPLAY
     # ========================================
     
-    pygame.display.flip()  # Update the full display
+    pygame.display.update(dirty)  # Update only what changed
+    profiler.mark("display")
     clock.tick(FPS)  # Limit to FPS frames per second
+    profiler.end_frame()
 
 # ============================================
 # CLEANUP
 # ============================================
 
+recorder.close(sim.state())
+if args.record:
+    print(f"Recorded {recorder.presses} key presses over {recorder.frames} frames to {args.record}")
+print(f"Text cache: {text_cache.stats()}")
 pygame.quit()
 sys.exit()
 
@@ -0,0 +1,534 @@
+"""
+DAY 2 ENGINE: the robot fleet without a window
+
+The robot classes and the rules of the day 2 game, with no pygame at all.
+day2_robot.py draws on top of this engine; CI boxes and benchmarks can
+step it directly, as fast as the CPU allows.
+
+HOW TO RUN (headless):
+    python day2_engine.py --episodes 1000 --max-steps 200
+
+It prints how many steps per second the engine managed.
+"""
+
+import argparse
+import time
+import zlib
+
+from occupancy import OccupancyGrid, RobotOccupancy
+from pathfinding import DIRECTIONS, DistanceFieldCache
+from spatial_index import SpatialIndex
+
+# CONFIGURATION SECTION
+
+GRID_SIZE = 10
+
+# print a line for each starting robot the game builds (the headless runner turns this off)
+VERBOSE = True
+
+# direction name -> (dx, dy)
+STEPS = {name: (dx, dy) for name, dx, dy in DIRECTIONS}
+
+# the keys Simulation.handle_key understands
+KEYS = ("1", "2", "3", "4", "up", "down", "left", "right", "space", "r", "p", "s")
+
+# RGB COLOURS
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+ORANGE = (255, 165, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+GRAY = (200, 200, 200)
+SKY_BLUE = (135, 206, 235)
+INDIGO = (100, 100, 255)
+GOLDEN = (255, 215, 0)
+
+# starting map: goal and obstacle positions
+DEFAULT_GOALS = [
+    [9, 9],
+    [2, 8],
+    [8, 2],
+]
+
+DEFAULT_OBSTACLES = [
+    [0, 3],
+    [0, 6],
+    [0, 7],
+    [1, 2],
+    [1, 4],
+    [1, 5],
+    [1, 8],
+    [2, 0],
+    [2, 4],
+    [2, 9],
+    [3, 0],
+    [3, 1],
+    [3, 3],
+    [4, 5],
+    [4, 7],
+    [4, 0],
+    [4, 6],
+    [5, 0],
+    [5, 2],
+    [5, 4],
+    [5, 7],
+    [5, 9],
+    [6, 2],
+    [6, 3],
+    [7, 1],
+    [7, 2],
+    [7, 4],
+    [7, 6],
+    [7, 7],
+    [7, 9],
+    [8, 4],
+    [8, 8],
+    [9, 1],
+    [9, 3],
+    [9, 6],
+]
+
+
+class Robot():
+    # Every robot has
+    # name
+    # color
+    # speed
+    # position (x,y)
+    # battery percentage
+
+    # a fixed list of attributes instead of a __dict__ per robot, so fleets of
+    # millions take less memory and build faster (see bench_robots.py)
+    __slots__ = ("name", "color", "speed", "x", "y", "max_battery", "battery", "moves",
+                 "grid_size", "occupancy")
+
+    def __init__(self, name, x, y, speed=1, battery=100, color=RED):
+        """constructor runs automatically when an object is created from a class
+        it initializes the attributes of the object"""
+        self.name = name   # robot name
+        self.color = color   # robot color
+        self.speed = speed  # robot speed
+        self.x = x    # robot position x
+        self.y = y    # robot position y
+        self.max_battery = battery  # robot max battery
+        self.battery = battery  # robot current battery
+        self.moves = 0  # number of moves made by the robot
+        # cells per side of the map the robot drives on (set it on a robot for bigger maps)
+        self.grid_size = GRID_SIZE
+        # a RobotOccupancy to stop the robot driving into obstacles and other robots;
+        # None checks only the edges of the grid (Simulation sets it on its robots)
+        self.occupancy = None
+
+    def move_up(self):
+        """move the robot up by its speed if within grid bounds and has enough battery (decrease y)"""
+        return self._move(0, -1)
+
+    def move_down(self):
+        """move the robot down by its speed if within the grid bounds and has enough battery (increase y)"""
+        return self._move(0, 1)
+
+    def move_left(self):
+        """move the robot left by its speed if within the bounds and has enough battery (decrease x)"""
+        return self._move(-1, 0)
+
+    def move_right(self):
+        """move the robot to the right if within the grid bounds and has enough battery (increase x)"""
+        return self._move(1, 0)
+
+    def _move(self, dx, dy, cells=None):
+        """move `speed` cells (or `cells`) in direction (dx, dy) if there is battery, the landing
+        cell is on the grid and (with an occupancy) it has no obstacle or robot on it"""
+        if cells is None:
+            cells = self.speed
+        new_x = self.x + dx * cells
+        new_y = self.y + dy * cells
+        if self.battery <= 0 or not (0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size):
+            return False
+        occupancy = self.occupancy
+        if occupancy is not None and not occupancy.can_enter(self, new_x, new_y):
+            return False
+        old_x = self.x
+        old_y = self.y
+        self.x = new_x
+        self.y = new_y
+        self.battery -= 1
+        self.moves += 1
+        if occupancy is not None:
+            occupancy.moved(self, old_x, old_y)
+        return True
+
+    def recharge(self):
+        """recharge the robot to the max battery"""
+        if self.battery < self.max_battery:
+            self.battery = self.max_battery
+            print(f"Robot {self.name} recharged to {self.battery}%")
+            return True
+        return False
+
+    def move_towards_goal(self, goal_x, goal_y, planner=None):
+        """the robot moves towards the goal position(x, y)
+        with a planner (a DistanceFieldCache) it follows the shortest path around obstacles,
+        without one it just steps in the direction of the goal"""
+        if self.battery <= 0:
+            return False
+        if planner is not None:
+            # with an occupancy, a cell another robot stands on is no way to go
+            direction = planner.best_direction(self.x, self.y, self.speed, goal_x, goal_y, self.occupancy)
+            if direction is None and self.speed > 1:
+                # a robot that can't jump any closer takes a single step: jumps alone only
+                # ever reach cells of one parity, and in traffic it would block the others
+                direction = planner.best_direction(self.x, self.y, 1, goal_x, goal_y, self.occupancy)
+                if direction is not None:
+                    return self._move(*STEPS[direction], cells=1)
+            if direction is None:
+                return False  # already there, or no move gets closer
+            return getattr(self, "move_" + direction)()
+        dx = goal_x - self.x
+        dy = goal_y - self.y
+        if abs(dx) > abs(dy):
+            if dx > 0:
+                return self.move_right()
+            else:
+                return self.move_left()
+        else:
+            if dy > 0:
+                return self.move_down()
+            else:
+                return self.move_up()
+
+    def get_position(self):
+        """returns the current position of the robot as a tuple (x,y)"""
+        return (self.x, self.y)
+
+    def get_battery(self):
+        """returns the current battery percentage of robot """
+        return self.battery
+
+    def get_moves(self):
+        """returns the number of moves made by the robot"""
+        return self.moves
+
+    def get_status(self):
+        """returns the robot status as a string"""
+        return (
+            f"ROBOT {self.name}:\n"
+            f"Position: ({self.x}, {self.y})\n"
+            f"Battery: {self.battery}%\n"
+            f"Moves made: {self.moves}\n"
+        )
+
+    def get_info(self):
+        """returns robot info in one line - FIXED: Added this method"""
+        return f"{self.name}: ({self.x},{self.y}) Battery:{int(self.battery)}% Moves:{self.moves}"
+
+    def is_at_goal(self, goal_x, goal_y):
+        """checks if the robot is at the goal position (x,y)"""
+        return self.x == goal_x and self.y == goal_y
+
+
+# SPECIAL ROBOT CLASSES (INHERITANCE)
+
+class FastRobot(Robot):
+    """a robot that moves faster than others but uses more battery"""
+    __slots__ = ()
+    type = "FAST ROBOT"
+
+    def __init__(self, name, x, y, speed=2, battery=80, color=SKY_BLUE):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+
+    def _move(self, dx, dy, cells=None):
+        if super()._move(dx, dy, cells):
+            # extra battery drain for fast robot
+            self.battery = max(0, self.battery - 1)
+            return True
+        return False
+
+
+class StrongRobot(Robot):
+    """a robot that can push obstacles out of the way but moves slower and uses less battery"""
+    __slots__ = ()
+    type = "STRONG ROBOT"
+
+    def __init__(self, name, x, y, speed=1, battery=120, color=INDIGO):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+
+    def push_obstacle(self, obstacle):
+        """pushes an obstacle ([x, y]) out of the way if adjacent to it, but never off the grid
+        (nor, with an occupancy, onto another obstacle or a robot)"""
+        if (abs(self.x - obstacle[0]) <= 1 and self.y == obstacle[1]) or (abs(self.y - obstacle[1]) <= 1 and self.x == obstacle[0]):
+            new_x, new_y = obstacle[0], obstacle[1]
+            # move the obstacle in the direction away from the robot
+            if self.x < obstacle[0]:
+                new_x += 1
+            elif self.x > obstacle[0]:
+                new_x -= 1
+            elif self.y < obstacle[1]:
+                new_y += 1
+            elif self.y > obstacle[1]:
+                new_y -= 1
+            if not (0 <= new_x < self.grid_size and 0 <= new_y < self.grid_size):
+                return False
+            # with an occupancy, never onto another obstacle or a robot
+            if self.occupancy is not None and not self.occupancy.is_free(new_x, new_y):
+                return False
+            obstacle[0] = new_x
+            obstacle[1] = new_y
+            self.battery = max(0, self.battery - 2)  # pushing uses extra battery
+            return True
+        return False
+
+
+class ScoutRobot(Robot):
+    """a robot that can scan the area around it to detect obstacles and goals"""
+    __slots__ = ("scan_range",)
+    type = "SCOUT ROBOT"
+
+    def __init__(self, name, x, y, speed=2, battery=100, color=GOLDEN):
+        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
+        self.scan_range = 2  # scan range in cells
+
+    def scan_area(self, obstacles, goals):
+        """scans the area around the robot to detect obstacles and goals within a scan radius
+        obstacles and goals are lists of [x, y], or anything with near(x, y, radius)
+        (a SpatialIndex, an OccupancyGrid) so only nearby cells are looked at"""
+        detected_obstacles = self._scan(obstacles)
+        detected_goals = self._scan(goals)
+        self.battery = max(0, self.battery - 1)  # scanning uses battery
+        return detected_obstacles, detected_goals
+
+    def _scan(self, items):
+        """the items within scan_range of the robot"""
+        if hasattr(items, "near"):
+            return items.near(self.x, self.y, self.scan_range)
+        detected = []
+        for item in items:
+            if abs(self.x - item[0]) <= self.scan_range and abs(self.y - item[1]) <= self.scan_range:
+                detected.append(item)
+        return detected
+
+
+def make_robots():
+    """create the four starting robots"""
+    robots = [
+        Robot("WAMBUI", 0, 0, color=RED),
+        FastRobot("FAITH", 1, 0),
+        StrongRobot("OPTIMUS PRIME", 0, 1),
+        ScoutRobot("REX", 1, 1),
+    ]
+    if VERBOSE:
+        for robot in robots:
+            print(f"Robot {robot.name} at position ({robot.x}, {robot.y})")
+    return robots
+
+
+# GAME RULES
+
+class Simulation():
+    """the whole game state: robots, goals, obstacles and the selected robot
+    step() advances one frame of game logic; nothing here draws or sleeps"""
+
+    def __init__(self, goals=None, obstacles=None, robots=None, grid=None):
+        """a big map can come as an OccupancyGrid (square) instead of an obstacle list;
+        its obstacles then only live in the grid and self.obstacles is None"""
+        self.goals = [list(goal) for goal in (DEFAULT_GOALS if goals is None else goals)]
+        if grid is None:
+            self.obstacles = [list(obstacle) for obstacle in (DEFAULT_OBSTACLES if obstacles is None else obstacles)]
+            # obstacle cells for quick checks
+            self.grid = OccupancyGrid.from_obstacles(self.obstacles, GRID_SIZE, GRID_SIZE)
+            # buckets of nearby obstacles for scouts
+            self.obstacle_index = SpatialIndex.from_items(self.obstacles)
+        else:
+            if grid.width != grid.height:
+                raise ValueError(f"maps must be square, got {grid.width}x{grid.height}")
+            self.obstacles = None
+            self.grid = grid
+            # the grid answers "which obstacles are near" itself
+            self.obstacle_index = grid
+        self.size = self.grid.width
+        # which robot is on which cell, so robots can't drive into each other or into obstacles
+        self.traffic = RobotOccupancy(self.grid)
+        # shortest-path fields shared by all robots
+        self.planner = DistanceFieldCache(self.grid)
+        self.goal_index = SpatialIndex.from_items(self.goals)
+        self.robots = make_robots() if robots is None else robots
+        self.fit_robots()
+        self.selected_robot_index = 0
+        self.auto_mode = False
+        self.steps = 0
+        # bumped whenever obstacles or goals change, so renderers know to redraw the map
+        self.map_version = 0
+
+    @property
+    def selected_robot(self):
+        """the robot the arrow keys control"""
+        return self.robots[self.selected_robot_index]
+
+    def fit_robots(self):
+        """tell the robots how big this map is (they stop at its edges) and put them on the traffic layer"""
+        self.traffic.clear()
+        for robot in self.robots:
+            if self.size != GRID_SIZE:
+                robot.grid_size = self.size
+            robot.occupancy = self.traffic
+            self.traffic.place(robot)
+
+    def reset_robots(self):
+        """reset all robots to start point"""
+        self.robots = make_robots()
+        self.fit_robots()
+        self.selected_robot_index = 0
+
+    def push_obstacle(self, robot, obstacle):
+        """let a StrongRobot push an obstacle, and refile it in the grid and the index"""
+        old_x, old_y = obstacle
+        # the obstacle lands on the far side from the robot: never onto another obstacle
+        # (the grid would count two and the list hold a duplicate), a robot or a goal
+        new_x = 2 * old_x - robot.x
+        new_y = 2 * old_y - robot.y
+        if self.grid.is_blocked(new_x, new_y) or self.traffic.robot_at(new_x, new_y) is not None:
+            return False
+        if [new_x, new_y] in self.goals:
+            return False
+        if not robot.push_obstacle(obstacle):
+            return False
+        self.grid.move(old_x, old_y, obstacle[0], obstacle[1])
+        if self.obstacles is not None:
+            self.obstacle_index.move(obstacle, old_x, old_y)
+        self.map_version += 1
+        return True
+
+    def scan(self, robot):
+        """what a ScoutRobot sees from where it stands"""
+        return robot.scan_area(self.obstacle_index, self.goal_index)
+
+    def handle_key(self, key):
+        """apply one key press ("1".."4", "up", "down", "left", "right", "space", "r", "p", "s")
+        returns a message for the console, or None"""
+        if key == "r":
+            self.reset_robots()
+            return "\nAll robots reset!"
+
+        # select robots
+        if key in ("1", "2", "3", "4"):
+            self.selected_robot_index = int(key) - 1
+            return f"Selected: {self.selected_robot.name}"
+
+        # automode
+        if key == "space":
+            self.auto_mode = not self.auto_mode
+            return f"Auto-mode: {'ON' if self.auto_mode else 'OFF'}"
+
+        # P - a strong robot pushes the first obstacle next to it
+        if key == "p" and isinstance(self.selected_robot, StrongRobot):
+            robot = self.selected_robot
+            for obstacle in self.obstacle_index.near(robot.x, robot.y, 1):
+                if abs(robot.x - obstacle[0]) + abs(robot.y - obstacle[1]) == 1:
+                    if self.push_obstacle(robot, obstacle):
+                        return f"{robot.name} pushed an obstacle to ({obstacle[0]}, {obstacle[1]})"
+            return None
+
+        # S - a scout scans around itself
+        if key == "s" and isinstance(self.selected_robot, ScoutRobot):
+            found_obstacles, found_goals = self.scan(self.selected_robot)
+            return f"{self.selected_robot.name} sees {len(found_obstacles)} obstacles and {len(found_goals)} goals"
+
+        # MANUAL movement
+        if not self.auto_mode:
+            robot = self.selected_robot
+            moves = {
+                "up": robot.move_up,
+                "down": robot.move_down,
+                "left": robot.move_left,
+                "right": robot.move_right,
+            }
+            if key in moves and moves[key]():
+                return robot.get_info()
+        return None
+
+    def step(self):
+        """advance the game state by one frame, returns how many robots moved"""
+        moved = 0
+        # AUTO MODE all robots follow the shortest path to the goal
+        if self.auto_mode and len(self.goals) > 0:
+            goal_x, goal_y = self.goals[0]
+            for robot in self.robots:
+                # Move toward first goal in list
+                if robot.move_towards_goal(goal_x, goal_y, self.planner):
+                    moved += 1
+
+        # check if any robot reached goal
+        for robot in self.robots:
+            if len(self.goals) > 0:
+                if robot.is_at_goal(self.goals[0][0], self.goals[0][1]):
+                    # you can add celebration here
+                    pass
+
+        self.steps += 1
+        return moved
+
+    def state(self):
+        """everything a replay has to reproduce, as plain values"""
+        return {
+            "robots": [[robot.name, robot.x, robot.y, robot.battery, robot.moves] for robot in self.robots],
+            "selected": self.selected_robot_index,
+            "auto_mode": self.auto_mode,
+            "goals": [list(goal) for goal in self.goals],
+            "obstacles": self.obstacle_state(),
+            "steps": self.steps,
+        }
+
+    def obstacle_state(self):
+        """the obstacle list, or for a grid-only map its obstacle count and a checksum of the cells"""
+        if self.obstacles is not None:
+            return [list(obstacle) for obstacle in self.obstacles]
+        return {"count": self.grid.count(), "crc32": zlib.crc32(self.grid.cells)}
+
+    def run(self, max_steps):
+        """step in auto mode until no robot can move or max_steps is reached
+        returns the number of steps taken"""
+        self.auto_mode = True
+        start = self.steps
+        while self.steps - start < max_steps:
+            if self.step() == 0:
+                break
+        return self.steps - start
+
+
+def run_episodes(episodes, max_steps):
+    """run fresh auto-mode episodes back to back and time them
+    returns a dict with the totals and the steps per second"""
+    total_steps = 0
+    start = time.perf_counter()
+    for _ in range(episodes):
+        total_steps += Simulation().run(max_steps)
+    seconds = time.perf_counter() - start
+    return {
+        "episodes": episodes,
+        "steps": total_steps,
+        "seconds": seconds,
+        "steps_per_second": total_steps / seconds if seconds > 0 else 0.0,
+        "episodes_per_second": episodes / seconds if seconds > 0 else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run the day 2 robots headless")
+    parser.add_argument("--episodes", type=int, default=1000, help="number of episodes to run")
+    parser.add_argument("--max-steps", type=int, default=200, help="step limit per episode")
+    args = parser.parse_args()
+
+    global VERBOSE
+    VERBOSE = False
+
+    stats = run_episodes(args.episodes, args.max_steps)
+    print(f"episodes: {stats['episodes']}")
+    print(f"steps: {stats['steps']}")
+    print(f"seconds: {stats['seconds']:.3f}")
+    print(f"steps/sec: {stats['steps_per_second']:.0f}")
+    print(f"episodes/sec: {stats['episodes_per_second']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
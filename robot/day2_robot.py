@@ -1,6 +1,22 @@
+import argparse
 import pygame
 import sys
-import random
+
+from camera import Camera, draw_cells
+from day2_engine import WHITE, BLACK, GREEN, GRAY, Simulation
+from frame_profiler import FrameProfiler, Overlay
+from render_layers import StaticLayer, DirtyRects
+from replay import InputRecorder
+from text_cache import TextCache
+
+# --record FILE saves the game keys so the session can be replayed headless (see replay.py)
+parser = argparse.ArgumentParser(description="Day 2: robot simulation")
+parser.add_argument("--record", metavar="FILE", help="record the game keys to this file")
+parser.add_argument("--map", metavar="FILE", help="play on a map file (see maps.py)")
+parser.add_argument("--warehouse", type=int, metavar="SIZE", help="play on a generated SIZE x SIZE warehouse map")
+args = parser.parse_args()
+if args.record and args.warehouse:
+    parser.error("a replay needs the map: save it with 'python maps.py warehouse SIZE FILE' and use --map FILE")
 
 pygame.init()
 
@@ -8,225 +24,24 @@ pygame.init()
 
 WINDOWS_HEIGHT = 800
 WINDOWS_WIDTH = 800
-GRID_SIZE = 10
-CELL_SIZE = WINDOWS_WIDTH // GRID_SIZE
-
-# RGB COLOURS
-
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-ORANGE = (255, 165, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-GRAY = (200, 200, 200)
-SKY_BLUE = (135, 206, 235)
-INDIGO = (100, 100, 255)
-GOLDEN = (255, 215, 0)
-
-
-class Robot():
-    # Every robot has
-    # name
-    # color
-    # speed
-    # position (x,y)
-    # battery percentage
-    def __init__(self, name, x, y, speed=1, battery=100, color=RED):
-        """constructor runs automatically when an object is created from a class
-        it initializes the attributes of the object"""
-        self.name = name   # robot name
-        self.color = color   # robot color
-        self.speed = speed  # robot speed
-        self.x = x    # robot position x
-        self.y = y    # robot position y
-        self.max_battery = battery  # robot max battery
-        self.battery = battery  # robot current battery
-        self.moves = 0  # number of moves made by the robot
-
-        print(f"Robot {self.name} at position ({self.x}, {self.y})")
-
-    def move_up(self):
-        """move the robot up by its speed if within grid bounds and has enough battery (decrease y)"""
-        if self.battery > 0 and self.y > 0:
-            self.y -= self.speed
-            self.battery -= 1
-            self.moves += 1
-            return True
-        return False
-
-    def move_down(self):
-        """move the robot down by its speed if within the grid bounds and has enough battery (increase y)"""
-        if self.battery > 0 and self.y < GRID_SIZE - 1:
-            self.y += self.speed
-            self.battery -= 1
-            self.moves += 1
-            return True
-        return False
-
-    def move_left(self):
-        """move the robot left by its speed if within the bounds and has enough battery (decrease x)"""
-        if self.battery > 0 and self.x > 0:
-            self.x -= self.speed
-            self.battery -= 1
-            self.moves += 1
-            return True
-        return False
-
-    def move_right(self):
-        """move the robot to the right if within the grid bounds and has enough battery (increase x)"""
-        if self.battery > 0 and self.x < GRID_SIZE - 1:
-            self.x += self.speed
-            self.battery -= 1
-            self.moves += 1
-            return True
-        return False
-
-    def recharge(self):
-        """recharge the robot to the max battery"""
-        if self.battery < self.max_battery:
-            self.battery = self.max_battery
-            print(f"Robot {self.name} recharged to {self.battery}%")
-            return True
-        return False
-
-    def move_towards_goal(self, goal_x, goal_y):
-        """the robot moves towards the goal position(x, y)
-        this is a basic pathfinding algorithm that moves the robot in the direction of the goal"""
-        if self.battery <= 0:
-            return False
-        dx = goal_x - self.x
-        dy = goal_y - self.y
-        if abs(dx) > abs(dy):
-            if dx > 0:
-                return self.move_right()
-            else:
-                return self.move_left()
-        else:
-            if dy > 0:
-                return self.move_down()
-            else:
-                return self.move_up()
-
-    def get_position(self):
-        """returns the current position of the robot as a tuple (x,y)"""
-        return (self.x, self.y)
-
-    def get_battery(self):
-        """returns the current battery percentage of robot """
-        return self.battery
-
-    def get_moves(self):
-        """returns the number of moves made by the robot"""
-        return self.moves
-
-    def draw(self, screen):
-        """draw the robot on the screen at its current position"""
-        pixel_x = int(self.x * CELL_SIZE + CELL_SIZE // 2)
-        pixel_y = int(self.y * CELL_SIZE + CELL_SIZE // 2)
-        # Draw the robot as a circle
-        pygame.draw.circle(screen, self.color, (pixel_x, pixel_y), CELL_SIZE // 3)
-        # draw robot outline
-        pygame.draw.circle(screen, BLACK, (pixel_x, pixel_y), CELL_SIZE // 3, 2)
-        # draw name above the robot
-        font = pygame.font.Font(None, 18)
-        text = font.render(self.name, True, BLACK)
-        screen.blit(text, (pixel_x - 20, pixel_y - CELL_SIZE // 2 - 10))
-
-    def get_status(self):
-        """returns the robot status as a string"""
-        return (
-            f"ROBOT {self.name}:\n"
-            f"Position: ({self.x}, {self.y})\n"
-            f"Battery: {self.battery}%\n"
-            f"Moves made: {self.moves}\n"
-        )
-
-    def get_info(self):
-        """returns robot info in one line - FIXED: Added this method"""
-        return f"{self.name}: ({self.x},{self.y}) Battery:{int(self.battery)}% Moves:{self.moves}"
-
-    def is_at_goal(self, goal_x, goal_y):
-        """checks if the robot is at the goal position (x,y)"""
-        return self.x == goal_x and self.y == goal_y
-
-
-# SPECIAL ROBOT CLASSES (INHERITANCE)
-
-class FastRobot(Robot):
-    """a robot that moves faster than others but uses more battery"""
-    def __init__(self, name, x, y, speed=2, battery=80, color=SKY_BLUE):
-        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
-        self.type = "FAST ROBOT"
-
-    def move_up(self):
-        if super().move_up():
-            # extra battery drain for fast robot
-            self.battery = max(0, self.battery - 1)
-            return True
-        return False
-
-    def move_down(self):
-        if super().move_down():
-            self.battery = max(0, self.battery - 1)
-            return True
-        return False
-
-    def move_left(self):
-        if super().move_left():
-            self.battery = max(0, self.battery - 1)
-            return True
-        return False
-
-    def move_right(self):
-        if super().move_right():
-            self.battery = max(0, self.battery - 1)
-            return True
-        return False
-
-
-class StrongRobot(Robot):
-    """a robot that can push obstacles out of the way but moves slower and uses less battery"""
-    def __init__(self, name, x, y, speed=1, battery=120, color=INDIGO):
-        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
-        self.type = "STRONG ROBOT"
-
-    def push_obstacle(self, obstacle):
-        """pushes an obstacle out of the way if adjacent to it"""
-        if (abs(self.x - obstacle.x) <= 1 and self.y == obstacle.y) or (abs(self.y - obstacle.y) <= 1 and self.x == obstacle.x):
-            # move the obstacle in the direction away from the robot
-            if self.x < obstacle.x:
-                obstacle.x += 1
-            elif self.x > obstacle.x:
-                obstacle.x -= 1
-            elif self.y < obstacle.y:
-                obstacle.y += 1
-            elif self.y > obstacle.y:
-                obstacle.y -= 1
-            self.battery = max(0, self.battery - 2)  # pushing uses extra battery
-            return True
-        return False
-
-
-class ScoutRobot(Robot):
-    """a robot that can scan the area around it to detect obstacles and goals"""
-    def __init__(self, name, x, y, speed=2, battery=100, color=GOLDEN):
-        super().__init__(name, x, y, speed=speed, battery=battery, color=color)
-        self.type = "SCOUT ROBOT"
-        self.scan_range = 2  # scan range in cells
-
-    def scan_area(self, obstacles, goals):
-        """scans the area around the robot to detect obstacles and goals within a scan radius"""
-        detected_obstacles = []
-        detected_goals = []
-        for obstacle in obstacles:
-            if abs(self.x - obstacle[0]) <= self.scan_range and abs(self.y - obstacle[1]) <= self.scan_range:
-                detected_obstacles.append(obstacle)
-        for goal in goals:
-            if abs(self.x - goal[0]) <= self.scan_range and abs(self.y - goal[1]) <= self.scan_range:
-                detected_goals.append(goal)
-        self.battery = max(0, self.battery - 1)  # scanning uses battery
-        return detected_obstacles, detected_goals
+# cells are drawn at least this big when the game starts; zoom out with - or the mouse wheel
+MIN_START_CELL = 8
+
+# pygame keys the game understands, by the name the engine uses
+KEY_NAMES = {
+    pygame.K_1: "1",
+    pygame.K_2: "2",
+    pygame.K_3: "3",
+    pygame.K_4: "4",
+    pygame.K_UP: "up",
+    pygame.K_DOWN: "down",
+    pygame.K_LEFT: "left",
+    pygame.K_RIGHT: "right",
+    pygame.K_SPACE: "space",
+    pygame.K_r: "r",
+    pygame.K_p: "p",
+    pygame.K_s: "s",
+}
 
 
 # SET UP PYGAME WINDOW
@@ -239,268 +54,307 @@ font = pygame.font.Font(None, 24)
 small_font = pygame.font.Font(None, 18)
 large_font = pygame.font.Font(None, 36)
 
-# draw goal and obstacle positions
-goals = [
-    [9, 9],
-    [2, 8],
-    [8, 2],
-]
-
-obstacles = [
-    [0, 3],
-    [0, 6],
-    [0, 7],
-    [1, 2],
-    [1, 4],
-    [1, 5],
-    [1, 8],
-    [2, 0],
-    [2, 4],
-    [2, 9],
-    [3, 0],
-    [3, 1],
-    [3, 3],
-    [4, 5],
-    [4, 7],
-    [4, 0],
-    [4, 6],
-    [5, 0],
-    [5, 2],
-    [5, 4],
-    [5, 7],
-    [5, 9],
-    [6, 2],
-    [6, 3],
-    [7, 1],
-    [7, 2],
-    [7, 4],
-    [7, 6],
-    [7, 7],
-    [7, 9],
-    [8, 4],
-    [8, 8],
-    [9, 1],
-    [9, 3],
-    [9, 6],
-]
-
-# create multiple robots
-robots = [
-    Robot("WAMBUI", 0, 0),
-    FastRobot("FAITH", 1, 0),
-    StrongRobot("OPTIMUS PRIME", 0, 1),
-    ScoutRobot("REX", 1, 1),
-]
-
-# KEEP TRACK OF ROBOT SELECTED
-selected_robot_index = 0
-selected_robot = robots[selected_robot_index]
+# labels are rendered once and reused every frame
+text_cache = TextCache()
+
+# the game itself lives in the engine; this file only draws it and reads keys
+if args.map:
+    from maps import load_map
+    grid, goals = load_map(args.map)
+    sim = Simulation(goals=goals, grid=grid)
+elif args.warehouse:
+    from maps import warehouse
+    grid, goals = warehouse(args.warehouse)
+    sim = Simulation(goals=goals, grid=grid)
+else:
+    sim = Simulation()
+
+# the part of the map on screen: the whole map if it fits, otherwise it scrolls after the selected robot
+camera = Camera(sim.size, sim.size, WINDOWS_WIDTH, WINDOWS_HEIGHT,
+                max(MIN_START_CELL, WINDOWS_WIDTH // sim.size))
+follow_selected = True
 
 
 # GAME CONTROL UNITS
-def draw_grid():
-    """draw the grid lines on the screen"""
-    for x in range(0, WINDOWS_WIDTH, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (x, 0), (x, WINDOWS_HEIGHT), 1)
-    for y in range(0, WINDOWS_HEIGHT, CELL_SIZE):
-        pygame.draw.line(screen, GRAY, (0, y), (WINDOWS_WIDTH, y), 1)
+def draw_grid(surface):
+    """draw the grid lines of the visible cells on the surface (not when zoomed far out)"""
+    size = camera.cell_size
+    if size < 6:
+        return
+    first_x, first_y, end_x, end_y = camera.visible_cells()
+    left, top = camera.to_screen(first_x, first_y)
+    right, bottom = camera.to_screen(end_x, end_y)
+    right = min(right, WINDOWS_WIDTH)
+    bottom = min(bottom, WINDOWS_HEIGHT)
+    for x in range(left, right, size):
+        pygame.draw.line(surface, GRAY, (x, 0), (x, bottom), 1)
+    for y in range(top, bottom, size):
+        pygame.draw.line(surface, GRAY, (0, y), (right, y), 1)
+
+
+def draw_goals(surface):
+    """draw the goals in view"""
+    first_x, first_y, end_x, end_y = camera.visible_cells()
+    size = camera.cell_size
+    for goal in sim.goal_index.query(first_x, first_y, end_x - 1, end_y - 1):
+        pygame.draw.rect(surface, GREEN, (*camera.to_screen(goal[0], goal[1]), size, size))
+        pygame.draw.circle(surface, BLACK, camera.cell_center(goal[0], goal[1]), max(1, size // 4), 2)
+
+
+def draw_obstacles(surface):
+    """draw the obstacles in view"""
+    draw_cells(surface, sim.grid, camera, BLACK)
+
+
+def draw_static_ui(surface):
+    """draw the title and instructions, which never change"""
+    title = text_cache.render(large_font, "ROBOT RACE DEMO", BLACK)
+    surface.blit(title, (10, 10))
+
+    # instructions
+    y_offset = WINDOWS_HEIGHT - 140
+    instructions = [
+        "keys: 1, 2, 3, 4 - Select Robot",
+        "Arrows - Move selected",
+        "SPACE - auto-move ALL",
+        "P - Push (strong) | S - Scan (scout)",
+        "+/- or wheel - Zoom | drag - Scroll | C - Follow",
+        "R - Reset | ESC - Quit"
+    ]
+
+    for instruction in instructions:
+        text = text_cache.render(font, instruction, BLACK)
+        surface.blit(text, (10, y_offset))
+        y_offset += 20
 
 
-def draw_goals():
-    """draw the goal positions on the grid"""
-    for goal in goals:
-        pixel_x = int(goal[0] * CELL_SIZE + CELL_SIZE // 2)
-        pixel_y = int(goal[1] * CELL_SIZE + CELL_SIZE // 2)
-        pygame.draw.rect(screen, GREEN, (goal[0] * CELL_SIZE, goal[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        pygame.draw.circle(screen, BLACK, (pixel_x, pixel_y), CELL_SIZE // 4, 2)
+def draw_map(surface):
+    """paint the static layer: background, grid, goals, obstacles and fixed text
+    (only the part of the map the camera sees)"""
+    surface.fill(WHITE)
+    draw_grid(surface)
+    draw_goals(surface)
+    draw_obstacles(surface)
+    draw_static_ui(surface)
 
 
-def draw_obstacles():
-    """draw obstacles on the grid """
-    for obstacle in obstacles:
-        pygame.draw.rect(screen, BLACK, (obstacle[0] * CELL_SIZE, obstacle[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+def cell_center(x, y):
+    """pixel position of the middle of cell (x, y)"""
+    return camera.cell_center(x, y)
 
 
-def draw_ui():
-    """draw user interface"""
-    y_offset = 10
-    # title 
-    title = large_font.render("ROBOT RACE DEMO", True, BLACK)
-    screen.blit(title, (10, y_offset))
-    y_offset += 40
+def circle_rect(center, radius):
+    """the rect a circle of this radius covers"""
+    return pygame.Rect(center[0] - radius, center[1] - radius, 2 * radius + 1, 2 * radius + 1)
+
+
+def robot_rect(robot):
+    """where draw_robot paints: the circle and the name above it"""
+    pixel_x, pixel_y = cell_center(robot.x, robot.y)
+    text = text_cache.render(small_font, robot.name, BLACK)
+    label = text.get_rect(topleft=(pixel_x - 20, pixel_y - camera.cell_size // 2 - 10))
+    return circle_rect((pixel_x, pixel_y), robot_radius()).union(label)
+
+
+def robot_radius():
+    return max(2, camera.cell_size // 3)
+
+
+def draw_robot(robot):
+    """draw the robot on the screen at its current position"""
+    pixel_x, pixel_y = cell_center(robot.x, robot.y)
+    # Draw the robot as a circle
+    pygame.draw.circle(screen, robot.color, (pixel_x, pixel_y), robot_radius())
+    # draw robot outline
+    pygame.draw.circle(screen, BLACK, (pixel_x, pixel_y), robot_radius(), 2)
+    # draw name above the robot
+    text = text_cache.render(small_font, robot.name, BLACK)
+    screen.blit(text, (pixel_x - 20, pixel_y - camera.cell_size // 2 - 10))
+
+
+def draw_highlight(robot):
+    """ring around the selected robot"""
+    pygame.draw.circle(screen, (255, 255, 0), cell_center(robot.x, robot.y), highlight_radius(), 3)
 
-    # robot selection indicator
-    for i, robot in enumerate(robots):
-        color = BLACK if i == selected_robot_index else GRAY
 
-        # robot info
-        info = font.render(f"[{i+1}] {robot.get_info()}", True, color)
-        screen.blit(info, (10, y_offset))
+def highlight_radius():
+    return max(4, camera.cell_size // 2)
 
-        # battery bar
-        bar_x = 10
-        bar_y = y_offset + 20
-        bar_width = 200
-        bar_height = 10
 
-        # background
-        pygame.draw.rect(screen, GRAY, (bar_x, bar_y, bar_width, bar_height))
+def draw_robot_panel(i, robot, y_offset):
+    """one robot's info line and battery bar"""
+    color = BLACK if i == sim.selected_robot_index else GRAY
 
-        # fill
-        fill = int((robot.battery / robot.max_battery) * bar_width)
-        if fill > 0:
-            pygame.draw.rect(screen, robot.color, (bar_x, bar_y, fill, bar_height))
+    # robot info
+    info = text_cache.render(font, f"[{i+1}] {robot.get_info()}", color)
+    screen.blit(info, (10, y_offset))
 
-        # BORDER
-        pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, bar_height), 1)
+    # battery bar
+    bar_x = 10
+    bar_y = y_offset + 20
+    bar_width = 200
+    bar_height = 10
+
+    # background
+    pygame.draw.rect(screen, GRAY, (bar_x, bar_y, bar_width, bar_height))
+
+    # fill
+    fill = int((robot.battery / robot.max_battery) * bar_width)
+    if fill > 0:
+        pygame.draw.rect(screen, robot.color, (bar_x, bar_y, fill, bar_height))
+
+    # BORDER
+    pygame.draw.rect(screen, BLACK, (bar_x, bar_y, bar_width, bar_height), 1)
+
+
+def draw_ui():
+    """add the user interface that changes (robot info and batteries) to this frame"""
+    y_offset = 50
+
+    # robot selection indicator
+    for i, robot in enumerate(sim.robots):
+        color = BLACK if i == sim.selected_robot_index else GRAY
+        text = f"[{i+1}] {robot.get_info()}"
+        rect = text_cache.render(font, text, color).get_rect(topleft=(10, y_offset))
+        rect.union_ip(pygame.Rect(10, y_offset + 20, 200, 10))
+        fill = int((robot.battery / robot.max_battery) * 200)
+        sprites.add(("panel", i), rect, (text, color, fill, robot.color),
+                    lambda i=i, robot=robot, y_offset=y_offset: draw_robot_panel(i, robot, y_offset))
         y_offset += 40
 
-    # instructions
-    y_offset = WINDOWS_HEIGHT - 100
-    instructions = [
-        "keys: 1, 2, 3, 4 - Select Robot",
-        "Arrows - Move selected",
-        "SPACE - auto-move ALL",
-        "R - Reset | ESC - Quit"
-    ]
 
-    for instruction in instructions:
-        text = font.render(instruction, True, BLACK)
-        screen.blit(text, (10, y_offset))
-        y_offset += 20
+# the map is drawn once into this layer; robots and the HUD are redrawn only where they change
+map_layer = StaticLayer((WINDOWS_WIDTH, WINDOWS_HEIGHT), draw_map)
+sprites = DirtyRects(screen)
 
+# F3 shows where the frame time goes (and starts recording it), F4 saves it to a CSV file
+profiler = FrameProfiler()
+overlay = Overlay(profiler, small_font, (WINDOWS_WIDTH - 330, WINDOWS_HEIGHT - 60))
+PROFILE_CSV = "day2_frames.csv"
 
-def reset_robots():
-    """reset all robots to start point"""
-    global robots, selected_robot_index, selected_robot
-    robots = [
-        Robot("WAMBUI", 0, 0,  color = RED),
-        FastRobot("FAITH", 1, 0),
-        StrongRobot("OPTIMUS PRIME", 0, 1),
-        ScoutRobot("REX", 1, 1)
-    ]
-    selected_robot_index = 0
-    selected_robot = robots[selected_robot_index]
-    print("\nAll robots reset!")
+recorder = InputRecorder(args.record, "day2", KEY_NAMES.values(), args.map)
 
 
 # MAIN GAME LOOP
 game_running = True
-auto_mode = False
 
 print("="*60)
 print("DAY2: ROBOT CLASSES & OBJECT ORIENTED PROGRAMMING")
 print("="*60)
 print("\nYou created 4 different robots: ")
-for robot in robots:
+for robot in sim.robots:
     print(f" - {robot.name} ({robot.__class__.__name__})")
 print("\nControls: ")
 print(" 1, 2, 3, 4 - select robot")
 print(" Arrow keys - move the selected robot")
 print(" Space  - Auto-Move all robots")
+print(" P - strong robot pushes an obstacle, S - scout scans")
 print(' R - reset')
+print(" +/- or mouse wheel - zoom, drag - scroll, C - follow the selected robot")
+print(" F3 - frame time overlay, F4 - save frame times to CSV")
 print("="*60)
 
 while game_running:
+    profiler.start_frame()
+    recorder.start_frame()
+
     # handles input
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             game_running = False
+
+        # the window was uncovered, paint all of it again
+        if event.type == pygame.VIDEOEXPOSE:
+            sprites.redraw_all()
+
+        # wheel zooms around the mouse, dragging with any button scrolls (and stops following)
+        if event.type == pygame.MOUSEWHEEL and event.y:
+            camera.zoom(2 if event.y > 0 else 0.5, pygame.mouse.get_pos())
+        if event.type == pygame.MOUSEMOTION and any(event.buttons):
+            camera.pan(-event.rel[0], -event.rel[1])
+            follow_selected = False
         
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 game_running = False
-            
-            if event.key == pygame.K_r:
-                reset_robots()
-            
-            # Select robots
-            if event.key == pygame.K_1:
-                selected_robot_index = 0
-                selected_robot = robots[selected_robot_index]
-                print(f"Selected: {selected_robot.name}")
-            
-            if event.key == pygame.K_2:
-                selected_robot_index = 1
-                selected_robot = robots[selected_robot_index]
-                print(f"Selected: {selected_robot.name}")
-            
-            if event.key == pygame.K_3:
-                selected_robot_index = 2
-                selected_robot = robots[selected_robot_index]
-                print(f"Selected: {selected_robot.name}")
-            
-            if event.key == pygame.K_4:
-                selected_robot_index = 3
-                selected_robot = robots[selected_robot_index]
-                print(f"Selected: {selected_robot.name}")
-            
-            # automode
-            if event.key == pygame.K_SPACE:
-                auto_mode = not auto_mode
-                print(f"Auto-mode: {'ON' if auto_mode else 'OFF'}")
-            
-            # MANUAL movement
-            if not auto_mode:
-                if event.key == pygame.K_UP:
-                    if selected_robot.move_up():
-                        print(selected_robot.get_info())
-                
-                if event.key == pygame.K_DOWN:
-                    if selected_robot.move_down():
-                        print(selected_robot.get_info())
-                
-                if event.key == pygame.K_LEFT:
-                    if selected_robot.move_left():
-                        print(selected_robot.get_info())
-                
-                if event.key == pygame.K_RIGHT:
-                    if selected_robot.move_right():
-                        print(selected_robot.get_info())
+
+            if event.key == pygame.K_F3:
+                if profiler.toggle():
+                    profiler.clear()
+            if event.key == pygame.K_F4 and profiler.frames:
+                print(f"Saved {profiler.dump_csv(PROFILE_CSV)} frames to {PROFILE_CSV}")
+
+            # the view only, not the game (so they are not recorded)
+            if event.key in (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS):
+                camera.zoom(2)
+            if event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                camera.zoom(0.5)
+            if event.key == pygame.K_c:
+                follow_selected = not follow_selected
+                print(f"Camera follows the selected robot: {'ON' if follow_selected else 'OFF'}")
+
+            # everything else is a game key for the engine
+            if event.key in KEY_NAMES:
+                recorder.key(KEY_NAMES[event.key])
+                message = sim.handle_key(KEY_NAMES[event.key])
+                if message:
+                    print(message)
+
+    profiler.mark("events")
 
     # UPDATE GAME STATE
-    # AUTO MODE all robots move toward the goal
-    if auto_mode:
-        for robot in robots:
-            # Move toward first goal in list
-            if len(goals) > 0:
-                robot.move_towards_goal(goals[0][0], goals[0][1])
-    
-    # check if any robot reached goal
-    for robot in robots:
-        if len(goals) > 0:
-            if robot.is_at_goal(goals[0][0], goals[0][1]):
-                # you can add celebration here
-                pass
+    sim.step()
+    profiler.mark("update")
 
     # DRAW EVERYTHING
-    screen.fill(WHITE)
+    selected = sim.selected_robot
+    if follow_selected:
+        camera.follow(selected.x, selected.y)
+
+    # the map layer is only repainted when an obstacle is pushed, the goals change or the view moves
+    background, rebuilt = map_layer.get((sim.map_version, camera.version))
+    if rebuilt:
+        sprites.redraw_all()
 
-    draw_grid()
-    draw_goals()
-    draw_obstacles()
-    
-    # DRAW all robots
-    for robot in robots:
-        robot.draw(screen)
+    # DRAW the robots in view
+    for i, robot in enumerate(sim.robots):
+        if camera.is_visible(robot.x, robot.y):
+            sprites.add(("robot", i), robot_rect(robot), (robot.x, robot.y, robot.name, robot.color),
+                        lambda robot=robot: draw_robot(robot))
 
     # highlight the selected robot
-    pixel_x = int(selected_robot.x * CELL_SIZE + CELL_SIZE // 2)
-    pixel_y = int(selected_robot.y * CELL_SIZE + CELL_SIZE // 2)
-    pygame.draw.circle(screen, (255, 255, 0), (pixel_x, pixel_y), CELL_SIZE // 2, 3)
+    if camera.is_visible(selected.x, selected.y):
+        sprites.add("highlight", circle_rect(cell_center(selected.x, selected.y), highlight_radius()),
+                    (selected.x, selected.y), lambda: draw_highlight(selected))
 
     draw_ui()
 
     # auto mode indicator
-    if auto_mode:
-        auto_text = large_font.render("AUTO MODE", True, GREEN)
-        screen.blit(auto_text, (WINDOWS_WIDTH // 2 - 80, 10))
-
-    # UPDATE DISPLAY
-    pygame.display.flip()
+    if sim.auto_mode:
+        auto_text = text_cache.render(large_font, "AUTO MODE", GREEN)
+        auto_pos = (WINDOWS_WIDTH // 2 - 80, 10)
+        sprites.add("auto", auto_text.get_rect(topleft=auto_pos), None,
+                    lambda: screen.blit(auto_text, auto_pos))
+
+    # frame time overlay
+    if profiler.enabled:
+        overlay.update()
+        sprites.add("profiler", overlay.rect(), overlay.lines, lambda: overlay.draw(screen))
+
+    dirty = sprites.flush(background)
+    profiler.mark("draw")
+
+    # UPDATE DISPLAY (only the parts that changed)
+    pygame.display.update(dirty)
+    profiler.mark("display")
     clock.tick(FPS)
+    profiler.end_frame()
 
 # ENDING GAME
+recorder.close(sim.state())
+if args.record:
+    print(f"Recorded {recorder.presses} key presses over {recorder.frames} frames to {args.record}")
+print(f"Text cache: {text_cache.stats()}")
 pygame.quit()
 sys.exit()
 print("\nGOOD MORNING!! Great work!")
\ No newline at end of file
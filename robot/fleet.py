@@ -0,0 +1,233 @@
+"""
+FLEET: thousands of robots stepped at once with NumPy
+
+Instead of one Python object per robot, a Fleet keeps every robot's
+position, battery, speed and move count in NumPy arrays (one slot per robot)
+and moves all of them with a handful of array operations per step.
+The rules are the same as the Robot classes in day2_engine.py:
+- a move needs battery left and a landing cell inside the grid
+- every move costs 1 battery, a FastRobot pays 1 more
+- a robot standing on the goal has arrived and stops
+
+fleet[i] gives a RobotView with the usual get_info/get_status/... methods,
+so code written for Robot objects can still read a fleet robot.
+
+HOW TO USE:
+    fleet = Fleet.from_robots(sim.robots, GRID_SIZE)
+    fleet.step(goal_x, goal_y, sim.planner)
+"""
+
+import numpy as np
+
+from day2_engine import GRID_SIZE, Robot, FastRobot
+from pathfinding import DIRECTIONS, UNREACHABLE
+
+# direction codes used in the arrays: 0 means "stay"
+STAY = 0
+DIRECTION_CODES = {name: code for code, (name, _, _) in enumerate(DIRECTIONS, start=1)}
+DX = np.array([0] + [dx for _, dx, _ in DIRECTIONS], dtype=np.int32)
+DY = np.array([0] + [dy for _, _, dy in DIRECTIONS], dtype=np.int32)
+
+# stands in for "no path" when comparing distances
+FAR = np.iinfo(np.int64).max
+
+# speed, battery and extra battery per move of each robot type (the class defaults)
+ROBOT_TYPES = {
+    "Robot": (1, 100, 0),
+    "FastRobot": (2, 80, 1),
+    "StrongRobot": (1, 120, 0),
+    "ScoutRobot": (2, 100, 0),
+}
+
+
+def downhill(grid, x, y, step, current, distance_at):
+    """direction code for robots at (x, y) moving `step` cells: the free landing cell with the
+    smallest distance (distance_at(landing cells)) below `current`, STAY where there is none"""
+    width = grid.width
+    cells = np.frombuffer(grid.cells, dtype=np.uint8)
+    current = current.astype(np.int64)
+    current[current == UNREACHABLE] = FAR
+    # distance after each of the four moves, "infinite" if the landing cell is no good
+    options = np.full((len(DIRECTIONS), len(x)), FAR, dtype=np.int64)
+    for d in range(len(DIRECTIONS)):
+        new_x = x + DX[d + 1] * step
+        new_y = y + DY[d + 1] * step
+        inside = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < grid.height)
+        landing = np.where(inside, new_y * width + new_x, 0)
+        distance = distance_at(landing)
+        ok = inside & (cells[landing] == 0) & (distance != UNREACHABLE)
+        options[d, ok] = distance[ok]
+
+    best = options.argmin(axis=0)  # first smallest, same tie order as DIRECTIONS
+    better = options[best, np.arange(len(x))] < current
+    return np.where(better, best + 1, STAY).astype(np.int32)
+
+
+class Fleet():
+    """struct-of-arrays robot fleet: fleet.x[i], fleet.battery[i], ... describe robot i"""
+
+    def __init__(self, x, y, speed, battery, extra_drain, grid_size=GRID_SIZE, names=None, kinds=None):
+        self.x = np.asarray(x, dtype=np.int32).copy()
+        self.y = np.asarray(y, dtype=np.int32).copy()
+        self.speed = np.asarray(speed, dtype=np.int32).copy()
+        self.battery = np.asarray(battery, dtype=np.int32).copy()
+        self.max_battery = self.battery.copy()
+        self.extra_drain = np.asarray(extra_drain, dtype=np.int32).copy()
+        self.moves = np.zeros(len(self.x), dtype=np.int32)
+        self.grid_size = grid_size
+        self.names = names if names is not None else [f"R{i}" for i in range(len(self.x))]
+        self.kinds = kinds if kinds is not None else ["Robot"] * len(self.x)
+        self.steps = 0
+
+    @classmethod
+    def from_robots(cls, robots, grid_size=GRID_SIZE):
+        """copy a list of Robot objects into a fleet"""
+        fleet = cls(
+            [robot.x for robot in robots],
+            [robot.y for robot in robots],
+            [robot.speed for robot in robots],
+            [robot.battery for robot in robots],
+            [1 if isinstance(robot, FastRobot) else 0 for robot in robots],
+            grid_size,
+            names=[robot.name for robot in robots],
+            kinds=[robot.__class__.__name__ for robot in robots],
+        )
+        fleet.max_battery = np.array([robot.max_battery for robot in robots], dtype=np.int32)
+        fleet.moves = np.array([robot.moves for robot in robots], dtype=np.int32)
+        return fleet
+
+    @classmethod
+    def spawn(cls, count, grid, seed=0):
+        """`count` robots on random free cells of an OccupancyGrid, cycling through the four robot types"""
+        rng = np.random.default_rng(seed)
+        free = np.flatnonzero(np.frombuffer(grid.cells, dtype=np.uint8) == 0)
+        cells = rng.choice(free, size=count)
+        kinds = list(ROBOT_TYPES)
+        table = np.array([ROBOT_TYPES[kind] for kind in kinds], dtype=np.int32)
+        kind_index = np.arange(count) % len(kinds)
+        return cls(
+            cells % grid.width,
+            cells // grid.width,
+            table[kind_index, 0],
+            table[kind_index, 1],
+            table[kind_index, 2],
+            grid.width,
+            kinds=[kinds[k] for k in kind_index],
+        )
+
+    def __len__(self):
+        return len(self.x)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("fleet index out of range")
+        return RobotView(self, i % len(self))
+
+    def move(self, directions, hops=None):
+        """move every robot one step in its direction code (STAY, or DIRECTION_CODES[name]),
+        `hops` cells along it (default: its speed)
+        returns a boolean array of the robots that actually moved"""
+        directions = np.asarray(directions)
+        hops = self.speed if hops is None else np.asarray(hops)
+        new_x = self.x + DX[directions] * hops
+        new_y = self.y + DY[directions] * hops
+        moved = (
+            (directions != STAY)
+            & (self.battery > 0)
+            & (new_x >= 0) & (new_x < self.grid_size)
+            & (new_y >= 0) & (new_y < self.grid_size)
+        )
+        np.copyto(self.x, new_x, where=moved)
+        np.copyto(self.y, new_y, where=moved)
+        self.battery -= moved * (1 + self.extra_drain)
+        np.maximum(self.battery, 0, out=self.battery)
+        self.moves += moved
+        return moved
+
+    def plan(self, goal_x, goal_y, planner):
+        """the direction code and the cells to move for every robot that follows the
+        planner's shortest path, STAY where no move gets closer
+        (same choice as Robot.move_towards_goal); returns (directions, hops)"""
+        grid = planner.grid
+        width = grid.width
+        directions = np.zeros(len(self), dtype=np.int32)
+        hops = self.speed.copy()
+        # one search per robot speed, shared by every robot with that speed
+        for speed in np.unique(self.speed):
+            members = np.flatnonzero(self.speed == speed)
+            x = self.x[members]
+            y = self.y[members]
+            here = y * width + x
+            field = np.frombuffer(planner.field(goal_x, goal_y, int(speed)), dtype=np.intc)
+            unit = field
+            if speed != 1:
+                # jumping robots that can't reach the goal walk the unit field instead
+                unit = np.frombuffer(planner.field(goal_x, goal_y), dtype=np.intc)
+            lost = field[here] == UNREACHABLE
+            current = np.where(lost, unit[here], field[here])
+            chosen = downhill(grid, x, y, int(speed), current,
+                              lambda landing: np.where(lost, unit[landing], field[landing]))
+            if speed != 1:
+                # a robot that can't jump any closer takes a single step instead
+                stuck = np.flatnonzero(chosen == STAY)
+                step = downhill(grid, x[stuck], y[stuck], 1, unit[here[stuck]], lambda landing: unit[landing])
+                chosen[stuck] = step
+                hops[members[stuck[step != STAY]]] = 1
+            directions[members] = chosen
+        directions[self.battery <= 0] = STAY
+        return directions, hops
+
+    def at_goal(self, goal_x, goal_y):
+        """boolean array of the robots standing on the goal"""
+        return (self.x == goal_x) & (self.y == goal_y)
+
+    def step(self, goal_x, goal_y, planner):
+        """one auto-mode step for the whole fleet: plan, move and check the goal
+        returns (number of robots that moved, number standing on the goal)"""
+        moved = self.move(*self.plan(goal_x, goal_y, planner))
+        self.steps += 1
+        return int(moved.sum()), int(self.at_goal(goal_x, goal_y).sum())
+
+
+class RobotView():
+    """one robot of a Fleet, readable like a Robot object"""
+
+    def __init__(self, fleet, index):
+        self.fleet = fleet
+        self.index = index
+
+    @property
+    def name(self):
+        return self.fleet.names[self.index]
+
+    @property
+    def x(self):
+        return int(self.fleet.x[self.index])
+
+    @property
+    def y(self):
+        return int(self.fleet.y[self.index])
+
+    @property
+    def speed(self):
+        return int(self.fleet.speed[self.index])
+
+    @property
+    def battery(self):
+        return int(self.fleet.battery[self.index])
+
+    @property
+    def max_battery(self):
+        return int(self.fleet.max_battery[self.index])
+
+    @property
+    def moves(self):
+        return int(self.fleet.moves[self.index])
+
+    # the read-only Robot methods only look at the attributes above
+    get_position = Robot.get_position
+    get_battery = Robot.get_battery
+    get_moves = Robot.get_moves
+    get_status = Robot.get_status
+    get_info = Robot.get_info
+    is_at_goal = Robot.is_at_goal
@@ -0,0 +1,173 @@
+"""
+FRAME PROFILER: where does the frame time go?
+
+The game loops have four phases: handle events, update the game state,
+draw, and update the display; the rest of the frame is clock.tick() waiting
+for the next one. FrameProfiler times each phase of every frame into a ring
+buffer of the last `size` frames:
+
+    profiler.start_frame()
+    ...events...
+    profiler.mark("events")
+    ...update...
+    profiler.mark("update")
+    ...draw...
+    profiler.mark("draw")
+    pygame.display.update(...)
+    profiler.mark("display")
+    clock.tick(FPS)
+    profiler.end_frame()       # whatever is left is "wait"
+
+While it is disabled every call returns straight away, so it can stay in
+the loop. stats() gives FPS, frame time percentiles and the average of each
+phase; dump_csv() writes the buffer out; Overlay draws the stats on screen.
+"""
+
+import time
+from array import array
+
+PHASES = ("events", "update", "draw", "display")
+
+
+class FrameProfiler():
+    """per-phase frame times of the last `size` frames"""
+
+    def __init__(self, size=600, phases=PHASES, enabled=False):
+        self.size = size
+        self.phases = phases
+        self.columns = ("total",) + phases + ("wait",)
+        self.index = {phase: i + 1 for i, phase in enumerate(phases)}
+        self.width = len(self.columns)
+        # one row of seconds per frame, `size` rows, oldest overwritten first
+        self.samples = array("d", bytes(8 * self.width * size))
+        self.row = array("d", bytes(8 * self.width))
+        self.frames = 0  # frames recorded since the last clear
+        self.enabled = enabled
+        self.frame_start = 0.0
+        self.last = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def clear(self):
+        self.frames = 0
+
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last = time.perf_counter()
+        for i in range(self.width):
+            self.row[i] = 0.0
+
+    def mark(self, phase):
+        """the phase that just ended"""
+        if not self.enabled or not self.frame_start:
+            return
+        now = time.perf_counter()
+        self.row[self.index[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        if not self.enabled or not self.frame_start:
+            return
+        now = time.perf_counter()
+        row = self.row
+        row[0] = now - self.frame_start
+        row[self.width - 1] = now - self.last
+        start = (self.frames % self.size) * self.width
+        self.samples[start:start + self.width] = row
+        self.frames += 1
+        self.frame_start = 0.0
+
+    def column(self, name):
+        """seconds of one column (total, a phase or wait), oldest frame first"""
+        i = self.columns.index(name)
+        count = min(self.frames, self.size)
+        first = self.frames - count
+        return [self.samples[((first + n) % self.size) * self.width + i] for n in range(count)]
+
+    def stats(self):
+        """fps, frame time percentiles and the mean of every phase, in ms"""
+        totals = self.column("total")
+        if not totals:
+            return None
+        ordered = sorted(totals)
+
+        def at(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+        elapsed = sum(totals)
+        return {
+            "frames": len(totals),
+            "fps": len(totals) / elapsed if elapsed else 0.0,
+            "p50_ms": at(0.50),
+            "p95_ms": at(0.95),
+            "p99_ms": at(0.99),
+            "phases_ms": {name: sum(self.column(name)) / len(totals) * 1000
+                          for name in self.columns[1:]},
+        }
+
+    def dump_csv(self, path):
+        """write the buffered frames (ms, oldest first) to a CSV file; returns how many"""
+        columns = [self.column(name) for name in self.columns]
+        with open(path, "w") as f:
+            f.write("frame," + ",".join(name + "_ms" for name in self.columns) + "\n")
+            first = self.frames - len(columns[0])
+            for n in range(len(columns[0])):
+                values = ",".join(f"{column[n] * 1000:.3f}" for column in columns)
+                f.write(f"{first + n},{values}\n")
+        return len(columns[0])
+
+
+class Overlay():
+    """the profiler's numbers as a few lines of text on the screen,
+    recomputed every `refresh` seconds so the text isn't re-rendered every frame"""
+
+    def __init__(self, profiler, font, pos, refresh=0.5, color=(0, 0, 0), background=(255, 255, 224)):
+        self.profiler = profiler
+        self.font = font
+        self.pos = pos
+        self.refresh = refresh
+        self.color = color
+        self.background = background
+        self.lines = ()
+        self.surfaces = []
+        self.updated = 0.0
+
+    def update(self):
+        """re-render the text if it is due; returns the current lines"""
+        now = time.perf_counter()
+        if now - self.updated < self.refresh:
+            return self.lines
+        self.updated = now
+        stats = self.profiler.stats()
+        if stats is None:
+            lines = ("profiling...",)
+        else:
+            phases = stats["phases_ms"]
+            lines = (
+                f"FPS {stats['fps']:.1f}   frame p50 {stats['p50_ms']:.1f}  "
+                f"p95 {stats['p95_ms']:.1f}  p99 {stats['p99_ms']:.1f} ms",
+                "  ".join(f"{name} {phases[name]:.2f}" for name in self.profiler.phases) + " ms",
+                f"wait {phases['wait']:.2f} ms   F4: save CSV",
+            )
+        if lines != self.lines:
+            self.lines = lines
+            self.surfaces = [self.font.render(line, True, self.color) for line in lines]
+        return self.lines
+
+    def rect(self):
+        """the area the overlay covers"""
+        x, y = self.pos
+        width = max(surface.get_width() for surface in self.surfaces) + 8
+        height = sum(surface.get_height() for surface in self.surfaces) + 8
+        return (x, y, width, height)
+
+    def draw(self, screen):
+        screen.fill(self.background, self.rect())
+        x, y = self.pos
+        y += 4
+        for surface in self.surfaces:
+            screen.blit(surface, (x + 4, y))
+            y += surface.get_height()
@@ -0,0 +1,175 @@
+"""
+MAPS: big maps that live in an OccupancyGrid instead of obstacle lists
+
+warehouse() lays out a warehouse floor of any size: blocks of shelves two
+cells deep, one-cell aisles between the rows of a block, wide aisles
+between blocks, and a free loading area in the top-left corner where the
+robots start. It is built with NumPy a whole block row at a time, so a
+2000x2000 floor takes milliseconds and 4 MB.
+
+    grid, goals = warehouse(2000, seed=1)
+    sim = Simulation(goals=goals, grid=grid)
+
+MAP FILES (.rmap) hold a map ready to use, with nothing to parse:
+
+    offset 0     header: b"RBOTMAP1", width, height, number of goals (uint32, little-endian)
+    offset 20    goals: x, y per goal (uint32)
+    offset 4096  the cells, one byte each, row by row (the OccupancyGrid bytes)
+
+load_map() reads the header and goals and memory-maps the cells, so
+opening a 2000x2000 map costs the same as a 10x10 one: pages are read from
+disk the first time they are touched. The mapping is copy-on-write:
+processes that load the same file share its pages in the OS page cache,
+and a pushed obstacle only copies the page it lands on, for that process,
+never the file.
+
+HOW TO RUN (converter):
+    python maps.py default default.rmap              # the built-in day 1 / day 2 map
+    python maps.py convert level.json level.rmap     # {"size": N, "goals": [...], "obstacles": [...]}
+    python maps.py warehouse 2000 big.rmap
+    python maps.py info big.rmap
+"""
+
+import argparse
+import json
+import mmap
+import random
+import struct
+
+import numpy as np
+
+from occupancy import OccupancyGrid
+
+MAGIC = b"RBOTMAP1"
+HEADER = struct.Struct("<8sIII")   # magic, width, height, goal count
+GOAL = struct.Struct("<II")
+CELLS_OFFSET = mmap.ALLOCATIONGRANULARITY  # mmap offsets must be a multiple of this
+
+SHELF_LENGTH = 12   # cells along a shelf
+SHELF_DEPTH = 2     # cells across a shelf
+AISLE = 1           # free cells between two shelves of a block
+CROSS_AISLE = 3     # free cells between blocks
+LOADING_AREA = 6    # free square in the top-left corner
+
+
+def warehouse(size, seed=0, goal_count=3, fill=0.85):
+    """a size x size warehouse grid and `goal_count` goals on free aisle cells
+    `fill` is the fraction of shelf slots that are built (the rest are gaps to cut through)"""
+    rng = np.random.default_rng(seed)
+    cells = np.zeros((size, size), dtype=np.uint8)
+
+    row_pitch = SHELF_DEPTH + AISLE        # one shelf row and the aisle under it
+    block_rows = 4                         # shelf rows per block
+    block_height = block_rows * row_pitch + CROSS_AISLE
+    slot_width = SHELF_LENGTH + CROSS_AISLE
+    slot_count = (size + slot_width - 1) // slot_width
+    # one slot: a cross aisle, then the shelf
+    slot = np.zeros(slot_width, dtype=np.uint8)
+    slot[CROSS_AISLE:] = 1
+
+    for top in range(CROSS_AISLE, size, block_height):
+        for row in range(block_rows):
+            y = top + row * row_pitch
+            if y + SHELF_DEPTH > size:
+                break
+            # which slots along this row get a shelf, spread out to cells
+            built = (rng.random(slot_count) < fill).astype(np.uint8)
+            cells[y:y + SHELF_DEPTH] = (np.repeat(built, slot_width) * np.tile(slot, slot_count))[:size]
+
+    cells[:LOADING_AREA, :LOADING_AREA] = 0
+    grid = OccupancyGrid.from_array(cells)
+
+    # goals on free cells outside the loading area
+    pick = random.Random(seed)
+    goals = []
+    while len(goals) < goal_count:
+        x = pick.randrange(size)
+        y = pick.randrange(size)
+        if grid.is_free(x, y) and (x >= LOADING_AREA or y >= LOADING_AREA) and [x, y] not in goals:
+            goals.append([x, y])
+    return grid, goals
+
+
+def cells_offset(goal_count):
+    """where the cells start: after the header and goals, rounded up to a page"""
+    end = HEADER.size + goal_count * GOAL.size
+    return -(-end // CELLS_OFFSET) * CELLS_OFFSET
+
+
+def save_map(path, grid, goals):
+    """write a grid and its goals as a map file"""
+    offset = cells_offset(len(goals))
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, grid.width, grid.height, len(goals)))
+        for x, y in goals:
+            f.write(GOAL.pack(x, y))
+        f.write(bytes(offset - f.tell()))
+        f.write(grid.cells)
+
+
+def read_header(f, path):
+    """(width, height, goals) from an open map file"""
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size or not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a robot map file")
+    _, width, height, goal_count = HEADER.unpack(data)
+    goal_data = f.read(goal_count * GOAL.size)
+    goals = [list(GOAL.unpack_from(goal_data, i * GOAL.size)) for i in range(goal_count)]
+    return width, height, goals
+
+
+def load_map(path):
+    """open a map file; returns (grid, goals)
+    the grid's cells are a copy-on-write memory map of the file, nothing is read up front"""
+    with open(path, "rb") as f:
+        width, height, goals = read_header(f, path)
+        length = width * height
+        offset = cells_offset(len(goals))
+        if f.seek(0, 2) < offset + length:
+            raise ValueError(f"{path} is cut short: expected {length} cells")
+        # the mapping keeps the file open by itself
+        cells = mmap.mmap(f.fileno(), length, access=mmap.ACCESS_COPY, offset=offset)
+    return OccupancyGrid(width, height, cells), goals
+
+
+def from_lists(goals, obstacles, size):
+    """the old list format: a size x size grid and goals from [x, y] lists"""
+    return OccupancyGrid.from_obstacles(obstacles, size, size), [list(goal) for goal in goals]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="make and inspect robot map files")
+    commands = parser.add_subparsers(dest="command", required=True)
+    default = commands.add_parser("default", help="write the built-in map")
+    default.add_argument("out")
+    convert = commands.add_parser("convert", help="convert a JSON map with goal and obstacle lists")
+    convert.add_argument("json")
+    convert.add_argument("out")
+    generate = commands.add_parser("warehouse", help="write a generated warehouse map")
+    generate.add_argument("size", type=int)
+    generate.add_argument("out")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--goals", type=int, default=3)
+    info = commands.add_parser("info", help="describe a map file")
+    info.add_argument("map")
+    args = parser.parse_args()
+
+    if args.command == "default":
+        from day2_engine import DEFAULT_GOALS, DEFAULT_OBSTACLES, GRID_SIZE
+        grid, goals = from_lists(DEFAULT_GOALS, DEFAULT_OBSTACLES, GRID_SIZE)
+    elif args.command == "convert":
+        with open(args.json) as f:
+            level = json.load(f)
+        grid, goals = from_lists(level["goals"], level["obstacles"], level["size"])
+    elif args.command == "warehouse":
+        grid, goals = warehouse(args.size, args.seed, args.goals)
+    else:
+        grid, goals = load_map(args.map)
+        print(f"{args.map}: {grid.width}x{grid.height}, {grid.count()} obstacle cells, goals {goals}")
+        return
+    save_map(args.out, grid, goals)
+    print(f"wrote {args.out}: {grid.width}x{grid.height}, {grid.count()} obstacle cells, {len(goals)} goals")
+
+
+if __name__ == "__main__":
+    main()
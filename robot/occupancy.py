@@ -0,0 +1,170 @@
+"""
+OCCUPANCY GRID: which cells have an obstacle on them
+
+One byte per cell, stored row by row in a bytearray, so checking a cell is a
+single index instead of a walk over the whole obstacle list.
+Each byte counts the obstacles on that cell (0 = free), so two obstacles
+pushed onto the same cell and one pushed off again still leaves it blocked.
+
+Keep it in sync with the obstacle list by calling add/remove/move whenever
+an obstacle appears, disappears or is pushed. Every change bumps version
+and goes into `changes`, the cells of the last CHANGE_LOG changes, so a
+cache can fix just those cells instead of starting over. Big maps (a 2000x2000
+warehouse is 4 MB here, against hundreds of MB as a list of [x, y] lists)
+can skip the list and live only in the grid; array() gives a NumPy view of
+the same bytes for slicing out the part of the map on screen. cells can
+also be a memory-mapped map file (see maps.py), anything indexable by byte.
+"""
+
+from collections import deque
+
+# how many changes the grid remembers (see OccupancyGrid.changes)
+CHANGE_LOG = 64
+
+
+class OccupancyGrid():
+    """width x height cells, each holding the number of obstacles on it"""
+
+    def __init__(self, width, height, cells=None):
+        self.width = width
+        self.height = height
+        self.cells = bytearray(width * height) if cells is None else cells
+        # bumped on every change so caches built from the grid know when they are stale
+        self.version = 0
+        # index (y * width + x) of the cell changed at each of the last CHANGE_LOG versions
+        self.changes = deque(maxlen=CHANGE_LOG)
+
+    @classmethod
+    def from_obstacles(cls, obstacles, width, height):
+        """build a grid from a list of [x, y] obstacle positions"""
+        grid = cls(width, height)
+        for obstacle in obstacles:
+            grid.add(obstacle[0], obstacle[1])
+        return grid
+
+    @classmethod
+    def from_array(cls, cells):
+        """a grid holding a copy of a (height, width) array of obstacle counts"""
+        import numpy as np
+        cells = np.ascontiguousarray(cells, dtype=np.uint8)
+        height, width = cells.shape
+        return cls(width, height, bytearray(cells.tobytes()))
+
+    def array(self):
+        """the cells as a (height, width) NumPy uint8 array, indexed [y, x]
+        it shares memory with the grid, so it sees every add/remove/move"""
+        import numpy as np
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.height, self.width)
+
+    def in_bounds(self, x, y):
+        """True if (x, y) is a cell of the grid"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_blocked(self, x, y):
+        """True if there is an obstacle on (x, y); cells off the grid are not obstacles"""
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] != 0
+
+    def is_free(self, x, y):
+        """True if (x, y) is on the grid and has no obstacle"""
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == 0
+
+    def add(self, x, y):
+        """put one more obstacle on (x, y)"""
+        if not self.in_bounds(x, y):
+            raise ValueError(f"obstacle ({x}, {y}) is outside the {self.width}x{self.height} grid")
+        i = y * self.width + x
+        if self.cells[i] == 255:
+            raise ValueError(f"too many obstacles stacked on ({x}, {y})")
+        self.cells[i] += 1
+        self.version += 1
+        self.changes.append(i)
+
+    def remove(self, x, y):
+        """take one obstacle off (x, y)"""
+        if not self.is_blocked(x, y):
+            raise ValueError(f"no obstacle at ({x}, {y})")
+        i = y * self.width + x
+        self.cells[i] -= 1
+        self.version += 1
+        self.changes.append(i)
+
+    def move(self, old_x, old_y, new_x, new_y):
+        """an obstacle was pushed from (old_x, old_y) to (new_x, new_y)"""
+        self.add(new_x, new_y)
+        self.remove(old_x, old_y)
+
+    def near(self, x, y, radius):
+        """[x, y] of every blocked cell at most `radius` cells away along each axis
+        (the same answer SpatialIndex.near gives for an obstacle list)"""
+        found = []
+        for cell_y in range(max(0, y - radius), min(self.height, y + radius + 1)):
+            row = cell_y * self.width
+            for cell_x in range(max(0, x - radius), min(self.width, x + radius + 1)):
+                if self.cells[row + cell_x]:
+                    found.append([cell_x, cell_y])
+        return found
+
+    def changed_since(self, version):
+        """the set of cells changed after `version`, or None if the grid no longer remembers them all"""
+        behind = self.version - version
+        if behind > len(self.changes):
+            return None
+        return set(self.changes[i] for i in range(len(self.changes) - behind, len(self.changes)))
+
+    def count(self):
+        """number of blocked cells"""
+        if not hasattr(self.cells, "count"):
+            # a memory-mapped map file: count in place instead of copying it
+            import numpy as np
+            return int(np.count_nonzero(self.array()))
+        return len(self.cells) - self.cells.count(0)
+
+
+class RobotOccupancy():
+    """which robot stands on which cell, as a hash from cell to robot, on top of the obstacle grid
+
+    Robots that have it as their `occupancy` ask can_enter() before a move and
+    report moved() after one, both O(1), so no robot walks into an obstacle or
+    onto another robot however many robots there are. Robots that jump
+    (speed 2) only need the landing cell to be free."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.robots = {}  # y * width + x -> robot
+
+    def _cell(self, x, y):
+        return y * self.grid.width + x
+
+    def place(self, robot):
+        """put a robot on the map where it stands"""
+        cell = self._cell(robot.x, robot.y)
+        if cell in self.robots:
+            raise ValueError(f"({robot.x}, {robot.y}) already has a robot on it")
+        self.robots[cell] = robot
+
+    def remove(self, robot):
+        """take a robot off the map"""
+        del self.robots[self._cell(robot.x, robot.y)]
+
+    def clear(self):
+        self.robots.clear()
+
+    def robot_at(self, x, y):
+        """the robot on (x, y), or None"""
+        return self.robots.get(self._cell(x, y))
+
+    def is_free(self, x, y):
+        """True if (x, y) is on the map with no obstacle and no robot on it"""
+        return self.grid.is_free(x, y) and self._cell(x, y) not in self.robots
+
+    def can_enter(self, robot, x, y):
+        """may `robot` move to (x, y)?"""
+        return self.is_free(x, y)
+
+    def moved(self, robot, old_x, old_y):
+        """`robot` went from (old_x, old_y) to where it stands now"""
+        del self.robots[self._cell(old_x, old_y)]
+        self.robots[self._cell(robot.x, robot.y)] = robot
+
+    def __len__(self):
+        return len(self.robots)
@@ -0,0 +1,223 @@
+"""
+PATHFINDING: shortest paths around obstacles
+
+A distance field holds, for every cell, the number of steps to a goal when
+walking around obstacles (a breadth-first search from the goal outwards).
+A robot heading for that goal only has to step to the neighbouring cell
+with the smallest number, so any number of robots chasing the same goal
+share one search.
+
+Robots that move two cells at a time jump, so they get their own field per
+speed. DistanceFieldCache keeps one field per (goal, speed). Nothing is
+recomputed while the map stays the same; when an obstacle is added,
+removed or pushed, repair_field() fixes each field in place around the
+changed cells (like LPA* / D* Lite on a grid): the cells whose shortest
+path ran through a newly blocked cell are found and searched again from
+their neighbours, and the cells a freed cell makes closer are lowered.
+A push costs the size of the region whose distances change, not the map.
+"""
+
+import heapq
+from array import array
+from collections import deque
+
+# distance of a cell that cannot reach the goal
+UNREACHABLE = -1
+
+# (name, dx, dy) in the order ties are broken
+DIRECTIONS = (
+    ("up", 0, -1),
+    ("down", 0, 1),
+    ("left", -1, 0),
+    ("right", 1, 0),
+)
+
+
+def distance_field(grid, goal_x, goal_y, step=1):
+    """breadth-first search from the goal over the free cells of the grid, for a robot
+    that moves `step` cells at a time (it jumps, so only the landing cell has to be free)
+    returns a flat array (index y * width + x) of moves to the goal, UNREACHABLE where there is no path"""
+    width = grid.width
+    height = grid.height
+    cells = grid.cells
+    field = array("i", [UNREACHABLE]) * (width * height)
+    if not grid.is_free(goal_x, goal_y):
+        return field
+
+    start = goal_y * width + goal_x
+    row_step = step * width
+    size = width * height
+    field[start] = 0
+    queue = deque([start])
+    while queue:
+        i = queue.popleft()
+        next_distance = field[i] + 1
+        x = i % width
+        # left, right, up, down landing cells that are free and not visited yet
+        if x >= step and field[i - step] == UNREACHABLE and cells[i - step] == 0:
+            field[i - step] = next_distance
+            queue.append(i - step)
+        if x + step < width and field[i + step] == UNREACHABLE and cells[i + step] == 0:
+            field[i + step] = next_distance
+            queue.append(i + step)
+        if i >= row_step and field[i - row_step] == UNREACHABLE and cells[i - row_step] == 0:
+            field[i - row_step] = next_distance
+            queue.append(i - row_step)
+        if i + row_step < size and field[i + row_step] == UNREACHABLE and cells[i + row_step] == 0:
+            field[i + row_step] = next_distance
+            queue.append(i + row_step)
+    return field
+
+
+def neighbours(i, width, size, step):
+    """flat indices of the cells `step` cells left, right, up and down of cell i that are on the grid"""
+    found = []
+    x = i % width
+    row_step = step * width
+    if x >= step:
+        found.append(i - step)
+    if x + step < width:
+        found.append(i + step)
+    if i >= row_step:
+        found.append(i - row_step)
+    if i + row_step < size:
+        found.append(i + row_step)
+    return found
+
+
+def repair_field(field, grid, changed, step=1):
+    """fix a distance field (from distance_field, same goal and step) in place after the cells in
+    `changed` (flat indices) were blocked or freed; the goal cell must not be one of them
+    returns the number of cells searched again"""
+    width = grid.width
+    size = width * grid.height
+    cells = grid.cells
+
+    # 1. cells whose shortest path went through a newly blocked cell lose their distance.
+    # Going outwards level by level from the blocked cells, a cell one step further is lost
+    # unless another neighbour one step closer to the goal still holds it up.
+    lost = set()
+    frontier = []
+    freed = []
+    for i in changed:
+        if cells[i] != 0:
+            if field[i] != UNREACHABLE:
+                frontier.append((field[i], i))
+                field[i] = UNREACHABLE
+        else:
+            freed.append(i)
+    heapq.heapify(frontier)
+    while frontier:
+        distance, i = heapq.heappop(frontier)
+        for j in neighbours(i, width, size, step):
+            if field[j] != distance + 1 or j in lost:
+                continue
+            if any(field[k] == distance and k not in lost for k in neighbours(j, width, size, step)):
+                continue
+            lost.add(j)
+            heapq.heappush(frontier, (distance + 1, j))
+    for i in lost:
+        field[i] = UNREACHABLE
+
+    # 2. lost and freed cells start from their best neighbour that kept its distance,
+    # then a search spreads every distance that got smaller (the unit-cost Dijkstra of LPA*)
+    for i in list(lost) + freed:
+        best = min((field[k] for k in neighbours(i, width, size, step) if field[k] != UNREACHABLE), default=None)
+        if best is not None and (field[i] == UNREACHABLE or best + 1 < field[i]):
+            field[i] = best + 1
+            frontier.append((best + 1, i))
+    heapq.heapify(frontier)
+    searched = 0
+    while frontier:
+        distance, i = heapq.heappop(frontier)
+        if field[i] != distance:
+            continue  # lowered again after it was queued
+        searched += 1
+        for j in neighbours(i, width, size, step):
+            if cells[j] == 0 and (field[j] == UNREACHABLE or field[j] > distance + 1):
+                field[j] = distance + 1
+                heapq.heappush(frontier, (distance + 1, j))
+    return len(lost) + searched
+
+
+class DistanceFieldCache():
+    """one distance field per goal (and robot speed), shared by every robot,
+    repaired around the changed cells when the map changes"""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.fields = {}
+        self.version = grid.version
+        self.searches = 0  # number of breadth-first searches run so far
+        self.repaired = 0  # number of cells searched again by repairs
+
+    def update(self):
+        """bring the fields up to date with the grid
+        they are fixed in place, so a field handed out earlier stays right too"""
+        grid = self.grid
+        if grid.version == self.version:
+            return
+        changed = grid.changed_since(self.version)
+        self.version = grid.version
+        if changed is None:
+            # too many changes to follow one by one, start over
+            self.fields.clear()
+            return
+        for (goal_x, goal_y, step), field in list(self.fields.items()):
+            if goal_y * grid.width + goal_x in changed:
+                # an obstacle moved onto or off the goal itself
+                del self.fields[(goal_x, goal_y, step)]
+            else:
+                self.repaired += repair_field(field, grid, changed, step)
+
+    def field(self, goal_x, goal_y, step=1):
+        """the distance field for a goal, searched on first use"""
+        if self.grid.version != self.version:
+            # the map changed since these fields were built
+            self.update()
+        key = (goal_x, goal_y, step)
+        field = self.fields.get(key)
+        if field is None:
+            field = distance_field(self.grid, goal_x, goal_y, step)
+            self.fields[key] = field
+            self.searches += 1
+        return field
+
+    def distance(self, x, y, goal_x, goal_y):
+        """steps from (x, y) to the goal, UNREACHABLE if there is no path"""
+        if not self.grid.in_bounds(x, y):
+            return UNREACHABLE
+        return self.field(goal_x, goal_y)[y * self.grid.width + x]
+
+    def best_direction(self, x, y, speed, goal_x, goal_y, occupancy=None):
+        """which way ("up", "down", "left", "right") a robot moving `speed` cells
+        per step should go to get closer to the goal, or None if no move helps
+        with a RobotOccupancy, cells other robots stand on are left out too"""
+        grid = self.grid
+        if not grid.in_bounds(x, y):
+            return None
+        field = self.field(goal_x, goal_y, speed)
+        if speed != 1 and field[y * grid.width + x] == UNREACHABLE:
+            # jumping robots can't land on every cell; get as close as the walking path allows
+            field = self.field(goal_x, goal_y)
+        return self._downhill(field, x, y, speed, occupancy)
+
+    def _downhill(self, field, x, y, speed, occupancy=None):
+        """the direction whose landing cell has the smallest distance below the current one"""
+        grid = self.grid
+        width = grid.width
+        is_free = grid.is_free if occupancy is None else occupancy.is_free
+        best = None
+        best_distance = field[y * width + x]
+        for name, dx, dy in DIRECTIONS:
+            new_x = x + dx * speed
+            new_y = y + dy * speed
+            if not is_free(new_x, new_y):
+                continue
+            distance = field[new_y * width + new_x]
+            if distance == UNREACHABLE:
+                continue
+            if best_distance == UNREACHABLE or distance < best_distance:
+                best = name
+                best_distance = distance
+        return best
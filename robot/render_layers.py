@@ -0,0 +1,118 @@
+"""
+RENDER LAYERS: draw the map once, then only what moves
+
+StaticLayer paints the things that hardly ever change (grid, obstacles,
+goals, fixed text) into one surface and keeps it until it is invalidated,
+e.g. when an obstacle is pushed or a goal is collected.
+
+DirtyRects draws the moving things (robots, HUD text) on top of it. Each
+thing is added every frame with a key, its bounding rect and a "state"
+(anything that changes its look). Only the areas where something changed
+are repainted: background first, then every thing overlapping the area,
+clipped to it so nothing else on screen is touched. flush() returns those
+areas for pygame.display.update().
+"""
+
+import pygame
+
+
+class StaticLayer():
+    """a surface painted once by `draw(surface)` and reused every frame"""
+
+    def __init__(self, size, draw):
+        self.size = size
+        self.draw = draw
+        self.surface = None
+        self.version = None
+        self.builds = 0  # how many times the layer was painted
+
+    def invalidate(self):
+        """repaint the layer next time it is used"""
+        self.version = None
+        self.surface = None
+
+    def get(self, version=0):
+        """the layer surface, repainted if it was invalidated or `version` changed
+        returns (surface, rebuilt)"""
+        if self.surface is not None and version == self.version:
+            return self.surface, False
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size).convert()
+        self.draw(self.surface)
+        self.version = version
+        self.builds += 1
+        return self.surface, True
+
+
+def merge_rects(rects):
+    """join overlapping rects so no area is repainted twice"""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        i = 0
+        while i < len(merged):
+            if rect.colliderect(merged[i]):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    return merged
+
+
+class DirtyRects():
+    """remembers what was drawn where last frame and repaints only what changed"""
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.previous = {}  # key -> (rect, state) drawn last frame
+        self.sprites = []   # this frame: (key, rect, state, draw)
+        self.full = True
+        self.updated_pixels = 0  # area sent to the display last frame
+
+    def redraw_all(self):
+        """repaint the whole screen on the next flush (new background, window exposed...)"""
+        self.full = True
+
+    def add(self, key, rect, state, draw):
+        """something to show this frame: `draw()` paints it inside `rect`,
+        and it only needs repainting when `rect` or `state` differ from last frame"""
+        self.sprites.append((key, pygame.Rect(rect), state, draw))
+
+    def flush(self, background):
+        """paint this frame over `background` and return the rects that changed"""
+        sprites = self.sprites
+        self.sprites = []
+        current = {key: (rect, state) for key, rect, state, _ in sprites}
+
+        if self.full:
+            self.screen.blit(background, (0, 0))
+            for _, _, _, draw in sprites:
+                draw()
+            dirty = [self.screen.get_rect()]
+            self.full = False
+        else:
+            changed = []
+            for key, rect, state, _ in sprites:
+                old = self.previous.get(key)
+                if old is None:
+                    changed.append(rect)
+                elif old != (rect, state):
+                    changed.append(old[0])
+                    changed.append(rect)
+            for key, (rect, _) in self.previous.items():
+                if key not in current:
+                    changed.append(rect)  # gone this frame, uncover what was under it
+
+            dirty = merge_rects(changed)
+            for area in dirty:
+                self.screen.set_clip(area)
+                self.screen.blit(background, area, area)
+                for _, rect, _, draw in sprites:
+                    if rect.colliderect(area):
+                        draw()
+            self.screen.set_clip(None)
+
+        self.previous = current
+        self.updated_pixels = sum(rect.width * rect.height for rect in dirty)
+        return dirty
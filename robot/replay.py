@@ -0,0 +1,155 @@
+"""
+REPLAY: record the keys of a game and play them back without a window
+
+Start either game with --record to log every game key with the frame it
+was pressed in:
+
+    python day2_robot.py --record session.rlog
+
+The log is small: a short header, then 5 bytes per key press (frame number
+and key), then the number of frames played and the final game state.
+Replaying it feeds the same keys into the same engine on the same frames,
+headless and as fast as the CPU allows, and checks that the game ends in
+exactly the state the recording did (positions, battery, goals, moves):
+
+    python replay.py session.rlog
+    python replay.py session.rlog --repeat 100    # as a benchmark
+
+It exits with status 1 if the final state differs. A game started with
+--map stores the map file's path in the log and the replay loads it again.
+"""
+
+import argparse
+import json
+import struct
+import time
+
+MAGIC = b"RBOTLOG1"
+RECORD = struct.Struct("<IB")  # frame, index of the key in the header's key list
+END = 255                      # key index of the last record: its frame is the number of frames played
+LENGTH = struct.Struct("<I")
+
+
+def make_game(game, map_path=None):
+    """a fresh engine for "day1" or "day2" (on the map file, if given), and its list of keys"""
+    kwargs = {}
+    if map_path:
+        from maps import load_map
+        grid, goals = load_map(map_path)
+        kwargs = {"goals": goals, "grid": grid}
+    if game == "day1":
+        import day1_engine
+        return day1_engine.Simulation(**kwargs), day1_engine.KEYS
+    if game == "day2":
+        import day2_engine
+        day2_engine.VERBOSE = False
+        return day2_engine.Simulation(**kwargs), day2_engine.KEYS
+    raise ValueError(f"unknown game {game!r}")
+
+
+class InputRecorder():
+    """writes game keys to a log as they are pressed; with path=None it does nothing"""
+
+    def __init__(self, path, game, keys, map_path=None):
+        self.path = path
+        self.keys = {key: i for i, key in enumerate(keys)}
+        self.frames = 0
+        self.presses = 0
+        self.file = None
+        if path:
+            self.file = open(path, "wb")
+            header = json.dumps({"game": game, "keys": list(keys), "map": map_path}).encode()
+            self.file.write(MAGIC + LENGTH.pack(len(header)) + header)
+
+    def start_frame(self):
+        self.frames += 1
+
+    def key(self, name):
+        """a game key pressed in the current frame"""
+        if self.file is None:
+            return
+        self.file.write(RECORD.pack(self.frames - 1, self.keys[name]))
+        self.presses += 1
+
+    def close(self, state):
+        """finish the log with the number of frames played and the final state"""
+        if self.file is None:
+            return
+        data = json.dumps(state).encode()
+        self.file.write(RECORD.pack(self.frames, END) + LENGTH.pack(len(data)) + data)
+        self.file.close()
+        self.file = None
+
+
+def read_log(path):
+    """returns (header, [(frame, key), ...], frames, final_state)
+    header has the "game" and the "map" file it was played on (None for the built-in map)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a robot input log")
+    offset = len(MAGIC)
+    (length,) = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    header = json.loads(data[offset:offset + length])
+    offset += length
+
+    keys = header["keys"]
+    presses = []
+    while offset + RECORD.size <= len(data):
+        frame, index = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if index == END:
+            (length,) = LENGTH.unpack_from(data, offset)
+            offset += LENGTH.size
+            return header, presses, frame, json.loads(data[offset:offset + length])
+        presses.append((frame, keys[index]))
+    # the game didn't get to close the log (it crashed or was killed)
+    frames = presses[-1][0] + 1 if presses else 0
+    return header, presses, frames, None
+
+
+def replay(header, presses, frames):
+    """run the engine through the recorded frames; returns the engine"""
+    sim, _ = make_game(header["game"], header.get("map"))
+    next_press = 0
+    for frame in range(frames):
+        while next_press < len(presses) and presses[next_press][0] == frame:
+            sim.handle_key(presses[next_press][1])
+            next_press += 1
+        sim.step()
+        # day 1 ends the moment the last goal is collected
+        if getattr(sim, "game_won", False):
+            break
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="replay a recorded robot game headless")
+    parser.add_argument("log", help="file written with --record")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report the speed")
+    args = parser.parse_args()
+
+    header, presses, frames, expected = read_log(args.log)
+    game = header["game"]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        sim = replay(header, presses, frames)
+    seconds = time.perf_counter() - start
+
+    state = sim.state()
+    print(f"{game}: {frames} frames, {len(presses)} key presses")
+    print(f"replayed {args.repeat}x in {seconds:.3f}s ({frames * args.repeat / seconds:.0f} frames/sec)")
+    print(f"final state: {json.dumps(state)}")
+    if expected is None:
+        print("the log has no final state to compare with (the game did not exit cleanly)")
+        return 0
+    if state != expected:
+        print(f"MISMATCH, the recording ended with: {json.dumps(expected)}")
+        return 1
+    print("matches the recording")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
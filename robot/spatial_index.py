@@ -0,0 +1,81 @@
+"""
+SPATIAL INDEX: find the obstacles/goals near a cell without looking at all of them
+
+The map is cut into square buckets of bucket_size x bucket_size cells and
+every [x, y] item is filed in the bucket that holds its cell. A query for a
+window only opens the buckets that overlap the window, so a scout's scan
+costs the same on a 10x10 map as on a 1000x1000 one.
+
+Items are the same [x, y] lists the game already uses. When one is moved
+(StrongRobot.push_obstacle), call move(item, old_x, old_y) so it is refiled.
+"""
+
+
+class SpatialIndex():
+    """uniform grid of buckets holding [x, y] items"""
+
+    def __init__(self, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.buckets = {}  # (bucket_x, bucket_y) -> list of items
+        self.size = 0
+
+    @classmethod
+    def from_items(cls, items, bucket_size=8):
+        """index a list of [x, y] items"""
+        index = cls(bucket_size)
+        for item in items:
+            index.insert(item)
+        return index
+
+    def __len__(self):
+        return self.size
+
+    def _key(self, x, y):
+        return (x // self.bucket_size, y // self.bucket_size)
+
+    def insert(self, item):
+        """file an item under its current cell"""
+        self.buckets.setdefault(self._key(item[0], item[1]), []).append(item)
+        self.size += 1
+
+    def remove(self, item, x=None, y=None):
+        """take an item out; pass its old (x, y) if it has already been moved"""
+        if x is None:
+            x, y = item[0], item[1]
+        key = self._key(x, y)
+        bucket = self.buckets.get(key, [])
+        for i, other in enumerate(bucket):
+            if other is item:
+                # order inside a bucket doesn't matter, so swap with the last one
+                bucket[i] = bucket[-1]
+                bucket.pop()
+                if not bucket:
+                    del self.buckets[key]
+                self.size -= 1
+                return
+        raise ValueError(f"item {item} is not in the index at ({x}, {y})")
+
+    def move(self, item, old_x, old_y):
+        """the item was at (old_x, old_y) and now holds its new position"""
+        if self._key(old_x, old_y) != self._key(item[0], item[1]):
+            self.remove(item, old_x, old_y)
+            self.insert(item)
+
+    def query(self, min_x, min_y, max_x, max_y):
+        """every item with min_x <= x <= max_x and min_y <= y <= max_y"""
+        found = []
+        first_x, first_y = self._key(min_x, min_y)
+        last_x, last_y = self._key(max_x, max_y)
+        for bucket_y in range(first_y, last_y + 1):
+            for bucket_x in range(first_x, last_x + 1):
+                bucket = self.buckets.get((bucket_x, bucket_y))
+                if bucket is None:
+                    continue
+                for item in bucket:
+                    if min_x <= item[0] <= max_x and min_y <= item[1] <= max_y:
+                        found.append(item)
+        return found
+
+    def near(self, x, y, radius):
+        """every item at most `radius` cells away along each axis"""
+        return self.query(x - radius, y - radius, x + radius, y + radius)
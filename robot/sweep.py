@@ -0,0 +1,191 @@
+"""
+SWEEP: how do the robot types compare on many random maps?
+
+Generates seeded random maps (obstacles and goals, start corner kept
+free) and runs one episode per robot type on each: the robot follows the
+shortest path (a DistanceFieldCache shared by the four robots on that map)
+to each goal in turn, until it has collected them all, its battery is
+empty, no move gets it closer, or max_steps is reached.
+
+Maps are handed out in chunks to a ProcessPoolExecutor with one worker per
+core. Every episode is appended to a JSON lines file as soon as its chunk
+comes back, and the totals per robot type (success rate, moves, battery
+used) are printed at the end. Map N is always built from seed + N, so a
+sweep gives the same numbers however many workers it runs on.
+
+HOW TO RUN:
+    python sweep.py --maps 2000
+    python sweep.py --maps 2000 --size 20 --goals 5 --out sweep.jsonl
+    python sweep.py --maps 500 --compare      # also run on one core and print the speed-up
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import day2_engine
+from day2_engine import Robot, FastRobot, StrongRobot, ScoutRobot
+from occupancy import OccupancyGrid, RobotOccupancy
+from pathfinding import DistanceFieldCache
+
+ROBOT_CLASSES = {
+    "Robot": Robot,
+    "FastRobot": FastRobot,
+    "StrongRobot": StrongRobot,
+    "ScoutRobot": ScoutRobot,
+}
+
+
+def random_map(seed, size, density, goal_count):
+    """obstacles and goals of map `seed`: [x, y] lists on free cells, (0, 0) left free"""
+    rng = random.Random(seed)
+    cells = rng.sample(range(1, size * size), int(size * size * density) + goal_count)
+    obstacles = [[cell % size, cell // size] for cell in cells[goal_count:]]
+    goals = [[cell % size, cell // size] for cell in cells[:goal_count]]
+    return obstacles, goals
+
+
+def run_episode(kind, planner, goals, size, max_steps):
+    """one robot of type `kind` from (0, 0) through the goals in order; returns its record"""
+    robot = ROBOT_CLASSES[kind](kind, 0, 0)
+    robot.grid_size = size
+    # on a traffic layer like the robots of a Simulation, so it plays by the game's rules
+    robot.occupancy = RobotOccupancy(planner.grid)
+    robot.occupancy.place(robot)
+    collected = 0
+    steps = 0
+    while collected < len(goals) and steps < max_steps:
+        goal_x, goal_y = goals[collected]
+        if robot.is_at_goal(goal_x, goal_y):
+            collected += 1
+            continue
+        if not robot.move_towards_goal(goal_x, goal_y, planner):
+            break  # battery empty, or stuck
+        steps += 1
+    return {
+        "robot": kind,
+        "success": collected == len(goals),
+        "goals": collected,
+        "moves": robot.moves,
+        "battery_used": robot.max_battery - robot.battery,
+    }
+
+
+def run_chunk(seeds, size, density, goal_count, max_steps):
+    """every robot type on each map of the chunk; returns the episode records"""
+    day2_engine.VERBOSE = False
+    records = []
+    for seed in seeds:
+        obstacles, goals = random_map(seed, size, density, goal_count)
+        planner = DistanceFieldCache(OccupancyGrid.from_obstacles(obstacles, size, size))
+        for kind in ROBOT_CLASSES:
+            record = run_episode(kind, planner, goals, size, max_steps)
+            record["seed"] = seed
+            records.append(record)
+    return records
+
+
+class Totals():
+    """running sums per robot type"""
+
+    def __init__(self):
+        self.rows = {kind: {"episodes": 0, "successes": 0, "moves": 0, "battery_used": 0}
+                     for kind in ROBOT_CLASSES}
+
+    def add(self, record):
+        row = self.rows[record["robot"]]
+        row["episodes"] += 1
+        row["successes"] += record["success"]
+        row["moves"] += record["moves"]
+        row["battery_used"] += record["battery_used"]
+
+    def summary(self):
+        """success rate and mean moves / battery used per robot type"""
+        result = {}
+        for kind, row in self.rows.items():
+            episodes = row["episodes"] or 1
+            result[kind] = {
+                "episodes": row["episodes"],
+                "success_rate": row["successes"] / episodes,
+                "mean_moves": row["moves"] / episodes,
+                "mean_battery_used": row["battery_used"] / episodes,
+            }
+        return result
+
+
+def sweep(maps, size, density, goal_count, max_steps, seed=0, workers=None, chunk=None, out=None):
+    """run the sweep on `workers` processes (1 = in this process), streaming records to `out`
+    returns (Totals, seconds)"""
+    workers = workers or os.cpu_count()
+    if not chunk:
+        # a few big tasks per worker: few round trips, and still balanced if some maps are slower
+        chunk = max(1, maps // (4 * workers))
+    chunks = [range(start, min(start + chunk, maps)) for start in range(0, maps, chunk)]
+    chunks = [[seed + n for n in numbers] for numbers in chunks]
+    totals = Totals()
+    out_file = open(out, "w") if out else None
+    start = time.perf_counter()
+
+    def collect(records):
+        for record in records:
+            totals.add(record)
+            if out_file:
+                out_file.write(json.dumps(record) + "\n")
+
+    try:
+        if workers == 1:
+            for seeds in chunks:
+                collect(run_chunk(seeds, size, density, goal_count, max_steps))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # map() hands chunks out as workers free up and yields results in order
+                args = [(seeds, size, density, goal_count, max_steps) for seeds in chunks]
+                for records in pool.map(run_chunk, *zip(*args)):
+                    collect(records)
+    finally:
+        if out_file:
+            out_file.close()
+    return totals, time.perf_counter() - start
+
+
+def print_summary(totals):
+    print(f"{'robot':>12} {'episodes':>9} {'success':>8} {'moves':>8} {'battery used':>13}")
+    for kind, row in totals.summary().items():
+        print(f"{kind:>12} {row['episodes']:>9} {row['success_rate']:>7.1%} "
+              f"{row['mean_moves']:>8.1f} {row['mean_battery_used']:>13.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compare the robot types on random maps")
+    parser.add_argument("--maps", type=int, default=1000, help="number of random maps")
+    parser.add_argument("--size", type=int, default=10, help="maps are size x size cells")
+    parser.add_argument("--density", type=float, default=0.3, help="fraction of cells with an obstacle")
+    parser.add_argument("--goals", type=int, default=3, help="goals per map")
+    parser.add_argument("--max-steps", type=int, default=500, help="step limit per episode")
+    parser.add_argument("--seed", type=int, default=0, help="map N uses seed + N")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (1 = no pool)")
+    parser.add_argument("--chunk", type=int, help="maps per task sent to a worker (default: 4 tasks per worker)")
+    parser.add_argument("--out", default="sweep.jsonl", help="episode records, one JSON object per line")
+    parser.add_argument("--compare", action="store_true", help="also run on one core and print the speed-up")
+    args = parser.parse_args()
+
+    settings = (args.maps, args.size, args.density, args.goals, args.max_steps, args.seed)
+    totals, seconds = sweep(*settings, workers=args.workers, chunk=args.chunk, out=args.out)
+    episodes = args.maps * len(ROBOT_CLASSES)
+    print(f"{episodes} episodes on {args.maps} maps, {args.workers} workers: "
+          f"{seconds:.2f}s ({episodes / seconds:.0f} episodes/sec), records in {args.out}")
+    print_summary(totals)
+
+    if args.compare:
+        single, single_seconds = sweep(*settings, workers=1)
+        if single.summary() != totals.summary():
+            print("one core gave different totals!")
+        print(f"one core: {single_seconds:.2f}s, speed-up x{single_seconds / seconds:.2f} "
+              f"with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+CHECKS for the day 2 rules that are easy to break without noticing
+
+HOW TO RUN:
+    python -m pytest robot
+"""
+
+import day2_engine
+from day2_engine import Simulation, FastRobot, ScoutRobot, StrongRobot
+from occupancy import OccupancyGrid, RobotOccupancy
+from pathfinding import DistanceFieldCache
+
+day2_engine.VERBOSE = False
+
+
+def drive(robot, goal_x, goal_y, planner, max_steps=50):
+    """move_towards_goal until the robot is on the goal or stops; True if it got there"""
+    for _ in range(max_steps):
+        if robot.is_at_goal(goal_x, goal_y):
+            return True
+        if not robot.move_towards_goal(goal_x, goal_y, planner):
+            return False
+    return robot.is_at_goal(goal_x, goal_y)
+
+
+def test_jumping_robot_reaches_odd_goal_without_occupancy():
+    grid = OccupancyGrid(10, 10)
+    planner = DistanceFieldCache(grid)
+    for robot_class in (FastRobot, ScoutRobot):
+        robot = robot_class("JUMPER", 0, 0)
+        assert drive(robot, 3, 0, planner)
+        robot = robot_class("JUMPER", 0, 0)
+        assert drive(robot, 4, 5, planner)
+
+
+def test_jumping_robot_reaches_odd_goal_with_occupancy():
+    grid = OccupancyGrid(10, 10)
+    planner = DistanceFieldCache(grid)
+    for robot_class in (FastRobot, ScoutRobot):
+        robot = robot_class("JUMPER", 0, 0)
+        traffic = RobotOccupancy(grid)
+        robot.occupancy = traffic
+        traffic.place(robot)
+        assert drive(robot, 3, 0, planner)
+        assert traffic.robot_at(3, 0) is robot
+
+
+def test_jumping_robots_reach_odd_goal_in_simulation():
+    sim = Simulation(goals=[[3, 0]], obstacles=[], robots=[FastRobot("FAITH", 0, 0)])
+    sim.run(20)
+    assert sim.robots[0].get_position() == (3, 0)
+
+
+def test_push_onto_another_obstacle_is_refused():
+    strong = StrongRobot("OPTIMUS PRIME", 7, 5)
+    sim = Simulation(goals=[[0, 9]], obstacles=[[7, 6], [7, 7]], robots=[strong])
+    assert not sim.handle_key("p")
+    assert sim.obstacles == [[7, 6], [7, 7]]
+    assert sim.grid.cells[7 * 10 + 7] == 1 and sim.grid.count() == 2
+    # the robot on its own refuses too once it is on a traffic layer
+    assert not strong.push_obstacle([7, 6])
+
+
+def test_push_onto_goal_or_robot_is_refused():
+    sim = Simulation(goals=[[7, 7]], obstacles=[[7, 6]], robots=[StrongRobot("OPTIMUS PRIME", 7, 5)])
+    assert not sim.handle_key("p")
+    robots = [StrongRobot("OPTIMUS PRIME", 7, 5), FastRobot("FAITH", 7, 7)]
+    sim = Simulation(goals=[[0, 9]], obstacles=[[7, 6]], robots=robots)
+    assert not sim.handle_key("p")
+    assert sim.obstacles == [[7, 6]]
+
+
+def test_push_onto_free_cell():
+    sim = Simulation(goals=[[0, 9]], obstacles=[[7, 6]], robots=[StrongRobot("OPTIMUS PRIME", 7, 5)])
+    assert sim.handle_key("p")
+    assert sim.obstacles == [[7, 7]]
+    assert sim.grid.is_blocked(7, 7) and not sim.grid.is_blocked(7, 6)
@@ -0,0 +1,54 @@
+"""
+TEXT CACHE: render each label once, reuse it every frame
+
+font.render() is slow compared to blitting, and most labels ("Moves: 3",
+robot names, instructions) are the same from one frame to the next.
+TextCache keeps the rendered surfaces keyed by (font, text, color) and
+drops the least recently used one when it is full.
+
+hits/misses/evictions are counted so a profiler can see how well it works.
+"""
+
+from collections import OrderedDict
+
+
+class TextCache():
+    """bounded LRU cache of rendered text surfaces"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        """same as font.render(text, antialias, color), but only renders new strings"""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        """forget every surface (the counters keep going)"""
+        self.surfaces.clear()
+
+    def stats(self):
+        """counters for profiling"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
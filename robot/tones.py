@@ -0,0 +1,99 @@
+"""
+TONES: beeps made once, played without waiting
+
+Every tone is a sine wave built with NumPy in one go (no per-sample Python
+loop) and turned into a pygame Sound. The game's fixed tones are made when
+the ToneBank is created; any other frequency/duration is made on first use
+and kept in a small cache. Sound.play() returns straight away, so playing a
+tone never holds up the frame.
+
+If the mixer isn't running (no audio device) the bank stays silent.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+# the game's sounds: (frequency in Hz, duration in seconds)
+GOAL_TONE = (800, 0.1)      # high pitch when a goal is collected
+ERROR_TONE = (200, 0.1)     # low pitch when a move is blocked
+VICTORY_TONE = (1000, 0.3)  # all goals collected
+
+FADE_SECONDS = 0.005  # short fade in/out so tones don't click
+VOLUME = 0.5
+
+
+def make_wave(frequency, duration, sample_rate):
+    """a sine wave between -1 and 1 as a float array"""
+    n_samples = int(round(duration * sample_rate))
+    t = np.arange(n_samples) / sample_rate
+    wave = np.sin(2 * np.pi * frequency * t) * VOLUME
+    fade = min(n_samples // 2, int(FADE_SECONDS * sample_rate))
+    if fade > 0:
+        ramp = np.linspace(0.0, 1.0, fade)
+        wave[:fade] *= ramp
+        wave[-fade:] *= ramp[::-1]
+    return wave
+
+
+def to_samples(wave, size, channels):
+    """convert a -1..1 wave to the mixer's sample format (size is pygame's format, e.g. -16)"""
+    if size == -16:
+        samples = (wave * 32767).astype(np.int16)
+    elif size == 16:
+        samples = ((wave + 1) * 32767.5).astype(np.uint16)
+    elif size == -8:
+        samples = (wave * 127).astype(np.int8)
+    elif size == 8:
+        samples = ((wave + 1) * 127.5).astype(np.uint8)
+    elif size == -32:
+        samples = (wave * 2147483647).astype(np.int32)
+    else:
+        samples = wave.astype(np.float32)
+    if channels > 1:
+        samples = np.ascontiguousarray(np.repeat(samples[:, None], channels, axis=1))
+    return samples
+
+
+class ToneBank():
+    """ready-made Sounds for the game tones plus an LRU cache for any other tone"""
+
+    def __init__(self, max_cached=32):
+        self.max_cached = max_cached
+        self.sounds = OrderedDict()
+        self.fixed = {}
+        self.mixer = pygame.mixer.get_init()  # (sample_rate, size, channels) or None
+        if self.mixer is not None:
+            for tone in (GOAL_TONE, ERROR_TONE, VICTORY_TONE):
+                self.fixed[tone] = self._make(*tone)
+
+    def _make(self, frequency, duration):
+        sample_rate, size, channels = self.mixer
+        samples = to_samples(make_wave(frequency, duration, sample_rate), size, channels)
+        return pygame.sndarray.make_sound(samples)
+
+    def sound(self, frequency, duration):
+        """the Sound for a tone, made on first use; None without a mixer"""
+        if self.mixer is None:
+            return None
+        key = (frequency, duration)
+        sound = self.fixed.get(key)
+        if sound is not None:
+            return sound
+        sound = self.sounds.get(key)
+        if sound is None:
+            sound = self._make(frequency, duration)
+            self.sounds[key] = sound
+            if len(self.sounds) > self.max_cached:
+                self.sounds.popitem(last=False)
+        else:
+            self.sounds.move_to_end(key)
+        return sound
+
+    def play(self, frequency, duration):
+        """start playing a tone and return at once"""
+        sound = self.sound(frequency, duration)
+        if sound is not None:
+            sound.play()
+        return sound
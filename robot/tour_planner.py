@@ -0,0 +1,273 @@
+"""
+TOUR PLANNER: the shortest way to collect every goal
+
+Day 1 is won by visiting all the goals before the battery runs out, and
+the order matters: the same three goals can cost 40 moves or 60. The
+planner works in two steps:
+
+1. The distance matrix: the number of moves between the start and every
+   goal, and between every pair of goals, walking around obstacles. Each
+   row is one distance field (see pathfinding.py), so N goals cost N + 1
+   breadth-first searches, and the matrix is kept until the map changes.
+
+2. The visiting order with the fewest moves. Up to EXACT_GOALS goals this
+   is dynamic programming over subsets (Held-Karp): the cheapest way to
+   have visited each set of goals ending at each goal. Above that it is
+   branch-and-bound, started from a nearest-neighbour tour improved with
+   2-opt, with a time limit; if the limit is hit the best tour found so far
+   is returned and marked as not proven optimal.
+
+    planner = TourPlanner(DistanceFieldCache(grid))
+    tour = planner.plan((x, y), goals)
+    tour["order"], tour["moves"], tour["optimal"], tour["unreachable"]
+"""
+
+import time
+
+from pathfinding import UNREACHABLE
+
+# goal counts up to this are solved exactly with Held-Karp (2^n * n^2 work)
+EXACT_GOALS = 10
+
+# seconds branch-and-bound may search before settling for the best tour so far
+TIME_LIMIT = 0.3
+
+INFINITY = float("inf")
+
+
+def distance_matrix(cache, points):
+    """moves between every pair of points, INFINITY where there is no path
+    the field from each point is searched once (and shared through the cache)"""
+    width = cache.grid.width
+    cells = [y * width + x for x, y in points]
+    matrix = []
+    for x, y in points:
+        field = cache.field(x, y)
+        row = []
+        for cell in cells:
+            distance = field[cell]
+            row.append(INFINITY if distance == UNREACHABLE else distance)
+        matrix.append(row)
+    return matrix
+
+
+def path_length(dist, order):
+    """moves to walk from point 0 through the points in order"""
+    total = 0
+    previous = 0
+    for point in order:
+        total += dist[previous][point]
+        previous = point
+    return total
+
+
+def held_karp(dist):
+    """the cheapest order to visit points 1..n starting from point 0 (no return)
+    returns (moves, order)"""
+    n = len(dist) - 1
+    if n == 0:
+        return 0, []
+    full = (1 << n) - 1
+    # cost[mask][j]: fewest moves to visit the goals in mask, ending at goal j
+    cost = [[INFINITY] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+    for j in range(n):
+        cost[1 << j][j] = dist[0][j + 1]
+
+    for mask in range(1, full + 1):
+        row = cost[mask]
+        for j in range(n):
+            here = row[j]
+            if here == INFINITY:
+                continue
+            from_j = dist[j + 1]
+            for k in range(n):
+                bit = 1 << k
+                if mask & bit:
+                    continue
+                total = here + from_j[k + 1]
+                if total < cost[mask | bit][k]:
+                    cost[mask | bit][k] = total
+                    parent[mask | bit][k] = j
+
+    best = min(range(n), key=lambda j: cost[full][j])
+    moves = cost[full][best]
+    order = []
+    mask = full
+    while best != -1:
+        order.append(best + 1)
+        best, mask = parent[mask][best], mask & ~(1 << best)
+    order.reverse()
+    return moves, order
+
+
+def nearest_neighbour(dist):
+    """greedy tour: always walk to the closest goal not visited yet"""
+    left = set(range(1, len(dist)))
+    order = []
+    current = 0
+    while left:
+        current = min(left, key=lambda point: (dist[current][point], point))
+        order.append(current)
+        left.remove(current)
+    return order
+
+
+def two_opt(dist, order):
+    """reverse stretches of the tour while that makes it shorter"""
+    order = list(order)
+    improved = True
+    while improved:
+        improved = False
+        path = [0] + order
+        for i in range(1, len(path) - 1):
+            for j in range(i + 1, len(path)):
+                # reversing path[i..j] swaps edges (i-1, i) and (j, j+1) for (i-1, j) and (i, j+1)
+                before = dist[path[i - 1]][path[i]]
+                after = dist[path[i - 1]][path[j]]
+                if j + 1 < len(path):
+                    before += dist[path[j]][path[j + 1]]
+                    after += dist[path[i]][path[j + 1]]
+                if after < before:
+                    path[i:j + 1] = reversed(path[i:j + 1])
+                    improved = True
+        order = path[1:]
+    return order
+
+
+def spanning_tree(dist, points):
+    """weight of the minimum spanning tree over points (Prim's algorithm)"""
+    if len(points) < 2:
+        return 0
+    reach = {point: dist[points[0]][point] for point in points[1:]}
+    total = 0
+    while reach:
+        point = min(reach, key=reach.get)
+        total += reach.pop(point)
+        row = dist[point]
+        for other in reach:
+            if row[other] < reach[other]:
+                reach[other] = row[other]
+    return total
+
+
+def branch_and_bound(dist, time_limit=TIME_LIMIT):
+    """depth-first search over visiting orders, cutting every branch that can't
+    beat the best tour found so far; returns (moves, order, optimal)
+    the rest of a tour costs at least the edge to the nearest unvisited goal plus
+    a spanning tree of the unvisited goals, so that is the bound"""
+    n = len(dist) - 1
+    order = two_opt(dist, nearest_neighbour(dist))
+    best = [path_length(dist, order), order]
+    if best[0] == INFINITY:
+        return best[0], best[1], True
+
+    # neighbours of each point, nearest first, so good tours are found early
+    nearest = [sorted(range(1, n + 1), key=lambda j: dist[i][j]) for i in range(n + 1)]
+    trees = {}  # bitmask of unvisited goals -> spanning tree weight
+    deadline = time.perf_counter() + time_limit
+    visited = [False] * (n + 1)
+    path = []
+    state = {"nodes": 0, "timed_out": False}
+
+    def bound(current, unvisited):
+        tree = trees.get(unvisited)
+        if tree is None:
+            points = [point for point in range(1, n + 1) if unvisited >> point & 1]
+            tree = trees[unvisited] = spanning_tree(dist, points)
+        row = dist[current]
+        return tree + min(row[point] for point in range(1, n + 1) if unvisited >> point & 1)
+
+    def search(current, moves, unvisited):
+        state["nodes"] += 1
+        if state["nodes"] & 255 == 0 and time.perf_counter() > deadline:
+            state["timed_out"] = True
+        if state["timed_out"]:
+            return
+        if not unvisited:
+            if moves < best[0]:
+                best[0] = moves
+                best[1] = list(path)
+            return
+        if moves + bound(current, unvisited) >= best[0]:
+            return
+        for point in nearest[current]:
+            if visited[point]:
+                continue
+            total = moves + dist[current][point]
+            if total >= best[0]:
+                break
+            visited[point] = True
+            path.append(point)
+            search(point, total, unvisited & ~(1 << point))
+            path.pop()
+            visited[point] = False
+
+    search(0, 0, (1 << (n + 1)) - 2)
+    return best[0], best[1], not state["timed_out"]
+
+
+def solve(dist, time_limit=TIME_LIMIT):
+    """the cheapest order to visit points 1..n from point 0; returns (moves, order, optimal)"""
+    if len(dist) - 1 <= EXACT_GOALS:
+        moves, order = held_karp(dist)
+        return moves, order, True
+    return branch_and_bound(dist, time_limit)
+
+
+class TourPlanner():
+    """plans the order to collect goals in, reusing the distance matrix
+    while the map and the goals stay the same"""
+
+    def __init__(self, cache, time_limit=TIME_LIMIT):
+        self.cache = cache
+        self.time_limit = time_limit
+        self.key = None
+        self.matrix = None
+        self.tour = None
+        self.matrices = 0  # distance matrices built so far
+
+    def distances(self, start, goals):
+        """the distance matrix of [start] + goals, rebuilt only if the points or the map changed"""
+        key = (self.cache.grid.version, tuple(start), tuple(tuple(goal) for goal in goals))
+        if key != self.key:
+            self.matrix = distance_matrix(self.cache, [tuple(start)] + [tuple(goal) for goal in goals])
+            self.key = key
+            self.tour = None
+            self.matrices += 1
+        return self.matrix
+
+    def plan(self, start, goals):
+        """the order to collect the goals in from start, fewest moves first
+        returns a dict: order (goal positions), moves, optimal, and the unreachable goals left out"""
+        dist = self.distances(start, goals)
+        if self.tour is not None:
+            return self.tour
+        reachable = [i for i in range(1, len(dist)) if dist[0][i] != INFINITY]
+        unreachable = [list(goals[i - 1]) for i in range(1, len(dist)) if dist[0][i] == INFINITY]
+        sub = [[dist[i][j] for j in [0] + reachable] for i in [0] + reachable]
+        moves, order, optimal = solve(sub, self.time_limit)
+        self.tour = {
+            "order": [list(goals[reachable[i - 1] - 1]) for i in order],
+            "moves": moves,
+            "optimal": optimal,
+            "unreachable": unreachable,
+        }
+        return self.tour
+
+
+def battery_needed(moves, drain_per_move):
+    return moves * drain_per_move
+
+
+def describe(tour, battery, drain_per_move):
+    """one line about a tour and whether the battery lasts, for the console"""
+    needed = battery_needed(tour["moves"], drain_per_move)
+    stops = " -> ".join(f"({x}, {y})" for x, y in tour["order"])
+    text = f"Tour: {stops or 'nothing to collect'} | {tour['moves']} moves, needs {needed}% battery, have {battery}%"
+    text += " - enough" if needed <= battery else " - NOT enough battery"
+    if not tour["optimal"]:
+        text += " (best found, not proven shortest)"
+    if tour["unreachable"]:
+        text += f" | unreachable: {tour['unreachable']}"
+    return text